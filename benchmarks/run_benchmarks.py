@@ -0,0 +1,278 @@
+import sys
+import os
+import json
+import time
+import platform
+import argparse
+import tempfile
+import datetime
+import statistics
+
+# Add project root to path so we can import source
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from source.ca_core import CACore
+from source.sss import ShamirSecretSharing, CURVE_ORDER
+from source.centralized_manager import CentralizedManager
+from source.distributed_manager import DistributedManager
+from source.verification import Verifier
+from source.cert_archive import CertArchive
+from source.simulation_engine import (
+    SimulationConfig, RealCentralizedSystem, RealDistributedSystem, run_experiment,
+)
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+# Flag a benchmark when its median is this much slower than the baseline
+DEFAULT_THRESHOLD = 0.20
+
+def measure(fn, repeat=5, number=1):
+    """
+    Runs fn `number` times per sample, `repeat` samples.
+    Returns seconds per call (min/median/mean over the samples).
+    """
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number)
+    return {
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+        "repeat": repeat,
+        "number": number,
+    }
+
+def micro_benchmarks(quick=False):
+    results = {}
+    number = 5 if quick else 50
+
+    secret = CACore.private_key_to_int(CACore.generate_private_key())
+    for n, k in ((5, 3), (16, 6), (64, 22)):
+        shares = ShamirSecretSharing.split(secret, n, k)
+        results[f"sss.split[n={n},k={k}]"] = measure(
+            lambda: ShamirSecretSharing.split(secret, n, k, CURVE_ORDER), number=number)
+        results[f"sss.combine[n={n},k={k}]"] = measure(
+            lambda: ShamirSecretSharing.combine(shares[:k]), number=number)
+
+    secrets = [CACore.private_key_to_int(CACore.generate_private_key()) for _ in range(16)]
+    for n, k in ((16, 6), (64, 22)):
+        results[f"sss.split_loop[n={n},k={k},secrets=16]"] = measure(
+            lambda: [ShamirSecretSharing.split(s, n, k, CURVE_ORDER) for s in secrets], number=number)
+        results[f"sss.split_many[n={n},k={k},secrets=16]"] = measure(
+            lambda: ShamirSecretSharing.split_many(secrets, n, k, CURVE_ORDER), number=number)
+
+    ca_key = CACore.generate_private_key()
+    ca_cert = CACore.create_self_signed_cert(ca_key)
+    user_key = CACore.generate_private_key()
+    csr = CACore.create_csr(user_key, "Bench User")
+
+    results["ca.generate_private_key"] = measure(CACore.generate_private_key, number=number)
+    results["ca.create_csr"] = measure(lambda: CACore.create_csr(user_key, "Bench User"), number=number)
+    results["ca.sign_csr"] = measure(lambda: CACore.sign_csr(ca_cert, ca_key, csr), number=number)
+
+    user_cert = CACore.sign_csr(ca_cert, ca_key, csr)
+    results["ca.verify_cert"] = measure(lambda: CACore.verify_cert(user_cert, ca_cert), number=number)
+    pems = [CACore.serialize_cert(CACore.sign_csr(ca_cert, ca_key, csr)) for _ in range(64)]
+    for workers in (0, 4):
+        verifier = Verifier(workers=workers)
+        verifier.trust(ca_cert)
+        results[f"verifier.verify_many[certs=64,workers={workers}]"] = measure(
+            lambda: verifier.verify_many(pems), number=max(1, number // 10))
+        verifier.close()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        central = CentralizedManager(storage_dir=os.path.join(tmp, "central"))
+        central.initialize_ca()
+        out = os.path.join(tmp, "central", "user.pem")
+        results["centralized.issue_certificate"] = measure(
+            lambda: central.issue_certificate(csr, out), number=number)
+
+        der = CACore.serialize_cert_der(user_cert)
+        pem_dir = os.path.join(tmp, "pem")
+        os.makedirs(pem_dir)
+        for i in range(256):
+            CACore.save_to_file(os.path.join(pem_dir, f"user_{i}.pem"), CACore.serialize_cert(user_cert))
+        archive = CertArchive(os.path.join(tmp, "archive", "certs"))
+        archive.append_many((i, der) for i in range(256))
+        results["pem.load_file"] = measure(
+            lambda: CACore.load_cert_from_file(os.path.join(pem_dir, "user_17.pem")), number=number)
+        results["archive.get_load_der"] = measure(
+            lambda: CACore.load_cert_der(archive.get(17)), number=number)
+        results["pem.scan[certs=256]"] = measure(
+            lambda: [CACore.load_cert_from_file(os.path.join(pem_dir, f"user_{i}.pem")) for i in range(256)],
+            number=max(1, number // 10))
+        results["archive.scan[certs=256]"] = measure(
+            lambda: [CACore.load_cert_der(v) for _, v in archive.scan()], number=max(1, number // 10))
+        archive.close()
+
+        for n, k in ((6, 2), (30, 10)):
+            dist = DistributedManager(storage_dir=os.path.join(tmp, f"dist_{n}"), n=n, k=k)
+            dist.initialize_ca()
+            out = os.path.join(tmp, f"dist_{n}", "user.pem")
+            quorum = list(range(1, k + 1))
+            results[f"distributed.sign_request[n={n},k={k}]"] = measure(
+                lambda: dist.sign_request(csr, quorum, out), number=number)
+
+    return results
+
+def macro_benchmarks(quick=False):
+    results = {}
+    repeat = 2 if quick else 3
+    sizes = ((6, 60),) if quick else ((6, 60), (12, 240))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for M, total_certs in sizes:
+            config = SimulationConfig(M=M, total_certs=total_certs)
+            config.base_dir = tmp
+            central = RealCentralizedSystem(config, f"bench_c_{M}")
+            dist = RealDistributedSystem(config, f"bench_d_{M}")
+            results[f"centralized.update_all[M={M},certs={total_certs}]"] = measure(
+                central.update_all, repeat=repeat)
+            results[f"distributed.update_all[M={M},certs={total_certs}]"] = measure(
+                dist.update_all, repeat=repeat)
+            central.close()
+            dist.close()
+
+            # As many disjoint quorums as the nodes allow
+            config = SimulationConfig(M=M, total_certs=total_certs, quorum_policy="round_robin")
+            config.dist_quorums = config.M // config.K
+            config.base_dir = tmp
+            dist = RealDistributedSystem(config, f"bench_dq_{M}")
+            results[f"distributed.update_all.quorums[M={M},certs={total_certs},quorums={config.dist_quorums}]"] = measure(
+                dist.update_all, repeat=repeat)
+            dist.close()
+
+            # Serial batches above vs. the threaded issuance pipeline
+            config = SimulationConfig(M=M, total_certs=total_certs, issuance_workers=2)
+            config.base_dir = tmp
+            central = RealCentralizedSystem(config, f"bench_cp_{M}")
+            results[f"centralized.update_all.pipeline[M={M},certs={total_certs},workers=2]"] = measure(
+                central.update_all, repeat=repeat)
+            central.close()
+
+        points = ((6, 60, 3),) if quick else ((6, 60, 5), (12, 120, 5))
+        for M, total_certs, total_periods in points:
+            config = SimulationConfig(M=M, total_certs=total_certs, total_periods=total_periods, seed=1)
+            config.base_dir = tmp
+            results[f"run_experiment.crypto[M={M},certs={total_certs},periods={total_periods}]"] = measure(
+                lambda: run_experiment(config, run_id_suffix="bench"), repeat=repeat)
+
+        attack_periods = 10 ** 5 if quick else 10 ** 6
+        config = SimulationConfig(mode="montecarlo", attack_periods=attack_periods, seed=1)
+        results[f"run_experiment.montecarlo[periods={attack_periods}]"] = measure(
+            lambda: run_experiment(config), repeat=repeat)
+
+        # Rare attacks over a long horizon: the event engine only pays per attack
+        for engine in ("vectorized", "event"):
+            config = SimulationConfig(mode="montecarlo", p=1e-5, attack_periods=attack_periods * 10,
+                                      attack_engine=engine, seed=1)
+            results[f"run_experiment.montecarlo.{engine}[p=1e-5,periods={attack_periods * 10}]"] = measure(
+                lambda: run_experiment(config), repeat=repeat)
+
+        # Same rare-attack point, distributed times drawn at the tilted rate
+        config = SimulationConfig(mode="montecarlo", p=1e-5, attack_periods=attack_periods // 10,
+                                  attack_sampling="importance", seed=1)
+        results[f"run_experiment.montecarlo.importance[p=1e-5,periods={attack_periods // 10}]"] = measure(
+            lambda: run_experiment(config), repeat=repeat)
+
+    return results
+
+def run(args):
+    results = {}
+    if args.suite in ("micro", "all"):
+        results.update(micro_benchmarks(args.quick))
+    if args.suite in ("macro", "all"):
+        results.update(macro_benchmarks(args.quick))
+
+    report = {
+        "meta": {
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "suite": args.suite,
+            "quick": args.quick,
+        },
+        "results": results,
+    }
+
+    out = args.out
+    if args.save_baseline:
+        if not os.path.exists(BASELINE_DIR):
+            os.makedirs(BASELINE_DIR)
+        out = os.path.join(BASELINE_DIR, f"{args.save_baseline}.json")
+    if out:
+        with open(out, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"Wrote {len(results)} benchmarks to {out}")
+
+    print_table(results)
+
+def compare_reports(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """
+    Returns one row per benchmark present in both reports:
+    (name, baseline median, current median, ratio, regressed).
+    """
+    rows = []
+    for name, base in sorted(baseline["results"].items()):
+        cur = current["results"].get(name)
+        if cur is None:
+            continue
+        ratio = cur["median"] / base["median"] if base["median"] else float("inf")
+        rows.append((name, base["median"], cur["median"], ratio, ratio > 1.0 + threshold))
+    return rows
+
+def compare(args):
+    baseline_path = args.baseline
+    if not os.path.exists(baseline_path):
+        baseline_path = os.path.join(BASELINE_DIR, f"{args.baseline}.json")
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    rows = compare_reports(baseline, current, args.threshold)
+    header = f"{'Benchmark':<60} | {'Baseline':>10} | {'Current':>10} | {'Ratio':>6}"
+    print(header)
+    print("-" * len(header))
+    regressions = 0
+    for name, base, cur, ratio, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{name:<60} | {base * 1e3:>8.3f}ms | {cur * 1e3:>8.3f}ms | {ratio:>6.2f}{flag}")
+        regressions += regressed
+    print(f"\n{regressions} regression(s) beyond {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+def print_table(results):
+    header = f"{'Benchmark':<60} | {'Median':>10} | {'Min':>10}"
+    print(header)
+    print("-" * len(header))
+    for name, r in sorted(results.items()):
+        print(f"{name:<60} | {r['median'] * 1e3:>8.3f}ms | {r['min'] * 1e3:>8.3f}ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="PKI/DPKI platform benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_run = sub.add_parser("run", help="Run the benchmark suite")
+    p_run.add_argument("--suite", choices=("micro", "macro", "all"), default="all")
+    p_run.add_argument("--quick", action="store_true", help="Fewer iterations and smaller sizes")
+    p_run.add_argument("--out", help="Write the JSON report to this file")
+    p_run.add_argument("--save-baseline", metavar="NAME", help=f"Store the report as {BASELINE_DIR}/NAME.json")
+
+    p_cmp = sub.add_parser("compare", help="Compare a report against a stored baseline")
+    p_cmp.add_argument("baseline", help="Baseline JSON path or name under baselines/")
+    p_cmp.add_argument("current", help="Report JSON produced by 'run --out'")
+    p_cmp.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                       help="Allowed relative slowdown of the median before flagging")
+
+    args = parser.parse_args()
+    if args.command == "run":
+        run(args)
+    else:
+        sys.exit(compare(args))
+
+if __name__ == "__main__":
+    main()
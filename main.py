@@ -1,11 +1,17 @@
 import sys
 import os
-import shutil
 
 # Add current directory to path so we can import source
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from source.simulation_engine import SimulationConfig, run_experiment
+from source.simulation_engine import SimulationConfig, cross_check, SIMULATION_MODES
+from source.parallel import run_sweep
+from source.storage import FileSystemStorage, STORAGE_BACKENDS
+from source.analytical_model import DIST_ROTATIONS, REVOCATION_MODES
+from source.centralized_manager import CA_HIERARCHIES
+from source.cert_archive import CERT_FORMATS
+from source.attack_engine import ATTACK_SAMPLINGS
+from source.quorum import QUORUM_POLICIES
 
 def get_float(prompt, default=None):
     p = f"{prompt} [{default}]: " if default is not None else f"{prompt}: "
@@ -29,6 +35,16 @@ def get_int(prompt, default=None):
         except ValueError:
             print("Invalid integer.")
 
+def get_optional_int(prompt):
+    while True:
+        val = input(f"{prompt} [random]: ")
+        if not val:
+            return None
+        try:
+            return int(val)
+        except ValueError:
+            print("Invalid integer.")
+
 def main():
     print("==========================================================")
     print("   PKI/DPKI Simulation Engineering Platform")
@@ -41,6 +57,8 @@ def main():
     def_V2 = 0.1
     def_p = 0.001
     def_M = 6
+    def_total_certs = 60
+    def_attack_periods = 100
     
     print("\nPlease configure base parameters:")
     T = get_float("Period T (s)", def_T)
@@ -48,6 +66,61 @@ def main():
     V2 = get_float("Update Cost V2", def_V2)
     p = get_float("Attack Rate p (1/s)", def_p)
     M = get_int("Number of Nodes M", def_M)
+    total_certs = get_int("User certificates (whole population)", def_total_certs)
+    attack_periods = get_int("Attack Periods (Monte Carlo samples)", def_attack_periods)
+    
+    modes = "/".join(SIMULATION_MODES + ("crosscheck",))
+    mode = input(f"Simulation mode ({modes}) [crypto]: ").strip() or "crypto"
+    if mode not in SIMULATION_MODES + ("crosscheck",):
+        print("Invalid mode. Exiting.")
+        return
+    
+    workers = get_int("Worker processes", 1)
+    replicas = get_int("Independent replicas per point", 1)
+    seed = get_optional_int("Random seed")
+    instrument = input("Collect per-stage timings? (y/N): ").strip().lower() == "y"
+    profile = instrument and input("Dump cProfile stats per run? (y/N): ").strip().lower() == "y"
+    storage = input(f"Storage backend ({'/'.join(STORAGE_BACKENDS)}) [filesystem]: ").strip() or "filesystem"
+    if storage not in STORAGE_BACKENDS:
+        print("Invalid storage backend. Exiting.")
+        return
+    dist_rotation = input(f"Distributed rotation ({'/'.join(DIST_ROTATIONS)}) [rekey]: ").strip() or "rekey"
+    if dist_rotation not in DIST_ROTATIONS:
+        print("Invalid distributed rotation. Exiting.")
+        return
+    rekey_every = get_int("Periods per distributed root key", 10) if dist_rotation == "refresh" else 1
+    quorum_policy = input(f"Signing quorum policy ({'/'.join(QUORUM_POLICIES)}) [fixed]: ").strip() or "fixed"
+    if quorum_policy not in QUORUM_POLICIES:
+        print("Invalid quorum policy. Exiting.")
+        return
+    dist_quorums = get_int("Concurrent signing quorums", 1) if quorum_policy != "fixed" else 1
+    ca_hierarchy = input(f"Centralized CA hierarchy ({'/'.join(CA_HIERARCHIES)}) [flat]: ").strip() or "flat"
+    if ca_hierarchy not in CA_HIERARCHIES:
+        print("Invalid CA hierarchy. Exiting.")
+        return
+    cert_renew_every = get_int("Periods between user cert renewals", 1) if ca_hierarchy == "intermediate" else 1
+    verify_replicas = input("Verify every stored cert after each update? (y/N): ").strip().lower() == "y"
+    measure_io = mode != "model" and input("Measure the I/O each system performs? (y/N): ").strip().lower() == "y"
+    issuance_workers = get_int("Issuance pipeline threads per stage (0 = serial)", 0) if mode != "model" else 0
+    revocation = input(f"Revocation on compromise ({'/'.join(REVOCATION_MODES)}) [none]: ").strip() or "none"
+    if revocation not in REVOCATION_MODES:
+        print("Invalid revocation mode. Exiting.")
+        return
+    detection_delay = get_float("Detection delay (fraction of a period)", 0.1) if revocation != "none" else 0.1
+    cert_format = input(f"Issued cert layout ({'/'.join(CERT_FORMATS)}) [pem]: ").strip() or "pem"
+    if cert_format not in CERT_FORMATS:
+        print("Invalid cert layout. Exiting.")
+        return
+    result_cache = None
+    if seed is not None and input("Reuse cached results of earlier runs? (y/N): ").strip().lower() == "y":
+        # Outside base_dir, which is wiped before every sweep
+        result_cache = "result_cache.sqlite"
+    attack_sampling = "plain"
+    if mode != "model":
+        attack_sampling = input(f"Distributed attack sampling ({'/'.join(ATTACK_SAMPLINGS)}) [plain]: ").strip() or "plain"
+        if attack_sampling not in ATTACK_SAMPLINGS:
+            print("Invalid attack sampling. Exiting.")
+            return
     
     print("\n----------------------------------------------------------")
     print("Select variable to sweep (multi-group experiment):")
@@ -92,11 +165,13 @@ def main():
     if os.path.exists(base_dir):
         print(f"\nCleaning up history records in '{base_dir}'...")
         try:
-            shutil.rmtree(base_dir)
+            FileSystemStorage().clear(base_dir)
         except Exception as e:
             print(f"Warning: Failed to clean {base_dir}: {e}")
         
-    results = []
+    configs = []
+    suffixes = []
+    checks = []
     print(f"\nRunning experiments for {len(values)} values...")
     
     for val in values:
@@ -108,10 +183,10 @@ def main():
         curr_M = val if sweep_var == 'M' else M
         
         if sweep_var:
-            print(f"Running for {sweep_var}={val} ...")
+            print(f"Queued {sweep_var}={val} ...")
             suffix = f"{sweep_var}_{val}"
         else:
-            print(f"Running single experiment...")
+            print(f"Queued single experiment...")
             suffix = "single"
         
         config = SimulationConfig(
@@ -120,12 +195,42 @@ def main():
             p=curr_p,
             V1=curr_V1,
             V2=curr_V2,
-            total_certs=60, # Keep fixed as per previous logic
-            total_periods=100 # Keep fixed
+            total_certs=total_certs,
+            total_periods=100, # Keep fixed
+            attack_periods=attack_periods,
+            mode="crypto" if mode == "crosscheck" else mode,
+            storage=storage,
+            dist_rotation=dist_rotation,
+            rekey_every=rekey_every,
+            quorum_policy=quorum_policy,
+            dist_quorums=dist_quorums,
+            ca_hierarchy=ca_hierarchy,
+            cert_renew_every=cert_renew_every,
+            verify_replicas=verify_replicas,
+            measure_io=measure_io,
+            issuance_workers=issuance_workers,
+            revocation=revocation,
+            detection_delay=detection_delay,
+            cert_format=cert_format,
+            attack_sampling=attack_sampling,
+            result_cache=result_cache,
+            instrument=instrument,
+            profile=profile
         )
         
-        res = run_experiment(config, run_id_suffix=suffix)
-        results.append(res)
+        configs.append(config)
+        suffixes.append(suffix)
+    
+    if mode == "crosscheck":
+        results = []
+        for config, suffix in zip(configs, suffixes):
+            config.seed = seed
+            check = cross_check(config, run_id_suffix=suffix)
+            checks.append(check)
+            results.append(check["results"]["crypto"])
+    else:
+        results = run_sweep(configs, suffixes, workers=workers, base_seed=seed, replicas=replicas,
+                            split_architectures=(workers > 1 and mode == "crypto"))
         
     # Display Table
     print("\n==========================================================")
@@ -154,6 +259,97 @@ def main():
         print(f"{val_str:<10} | {r['C_Risk']:<12.4f} | {r['C_Total']:<12.4f} || {r['D_Risk']:<12.4f} | {r['D_Total']:<12.4f}")
         
     print("==========================================================")
+    
+    if mode != "model":
+        print_confidence(results, sweep_var)
+
+    if checks:
+        print_cross_check(checks, results, sweep_var)
+    
+    if measure_io and mode != "montecarlo":
+        print_io(results, sweep_var)
+
+    if issuance_workers and mode != "montecarlo":
+        print_issuance(results, sweep_var)
+
+    if instrument:
+        print_timings(results, sweep_var)
+
+def print_confidence(results, sweep_var):
+    print("\n 95% confidence intervals of the sampled risk")
+    print("==========================================================")
+    header = f"{'Point':<10} | {'Cent. J_Risk CI':<27} || {'Dist. J_Risk CI':<27} | {'IS ESS':>10}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        point = str(r[sweep_var]) if sweep_var else "Single"
+        c_lo, c_hi = r["C_Risk_CI"]
+        d_lo, d_hi = r["D_Risk_CI"]
+        ess = f"{r['D_IS_ESS']:>10.0f}" if "D_IS_ESS" in r else f"{'-':>10}"
+        print(f"{point:<10} | {c_lo:>12.4f} - {c_hi:<12.4f} || {d_lo:>12.4f} - {d_hi:<12.4f} | {ess}")
+    print("==========================================================")
+
+def print_io(results, sweep_var):
+    print("\n Measured I/O vs. modeled sync volume (whole run)")
+    print("==========================================================")
+    header = (f"{'Point':<10} | {'Arch':<12} | {'Modeled':>9} | {'Replicas':>9} | {'CRL ent.':>9} | "
+              f"{'Messages':>9} | {'Files':>7} | {'KiB':>9} | {'Syncs':>6}")
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        point = str(r[sweep_var]) if sweep_var else "Single"
+        for arch, io in r.get("io", {}).items():
+            print(f"{point:<10} | {arch:<12} | {io['modeled_replicas']:>9.0f} | {io['cert_replicas']:>9} | "
+                  f"{io['modeled_crl_entries']:>9} | {io['node_messages']:>9} | {io['files_written']:>7} | {io['bytes_written'] / 1024:>9.1f} | "
+                  f"{io['syncs']:>6}")
+    print("==========================================================")
+
+def print_issuance(results, sweep_var):
+    print("\n Issuance pipeline throughput (whole run)")
+    print("==========================================================")
+    header = f"{'Point':<10} | {'Arch':<12} | {'Certs':>9} | {'Certs/s':>9} | {'Sign busy (s)':>13} | {'Sign blocked (s)':>16}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        point = str(r[sweep_var]) if sweep_var else "Single"
+        for arch, arch_stats in r.get("update_stats", {}).items():
+            issuance = arch_stats.get("issuance")
+            if issuance is None:
+                continue
+            sign = issuance["stages"]["sign"]
+            print(f"{point:<10} | {arch:<12} | {issuance['certs']:>9} | {issuance['certs_per_sec']:>9.1f} | "
+                  f"{sign['busy']:>13.3f} | {sign['blocked']:>16.3f}")
+    print("==========================================================")
+
+def print_timings(results, sweep_var):
+    print("\n Per-stage timings (wall / CPU seconds)")
+    print("==========================================================")
+    header = f"{'Point':<10} | {'Scope':<12} | {'Stage':<10} | {'Count':>6} | {'Wall':>9} | {'Mean':>9} | {'p95':>9} | {'CPU':>9}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        point = str(r[sweep_var]) if sweep_var else "Single"
+        for scope, stages in r.get("timings", {}).items():
+            for stage, t in stages.items():
+                print(f"{point:<10} | {scope:<12} | {stage:<10} | {t['count']:>6} | {t['wall_total']:>9.4f} | "
+                      f"{t['wall']['mean']:>9.5f} | {t['wall']['p95']:>9.5f} | {t['cpu_total']:>9.4f}")
+        profile_paths = {s["profile_path"] for s in r.get("update_stats", {}).values() if "profile_path" in s}
+        for path in sorted(profile_paths):
+            print(f"{point:<10} | cProfile dump: {path}")
+    print("==========================================================")
+
+def print_cross_check(checks, results, sweep_var):
+    print("\n Discrepancy vs. analytical model (relative, z-score)")
+    print("==========================================================")
+    header = f"{'Point':<10} | {'Mode':<10} | {'C_Risk rel':<10} | {'C_Risk z':<8} || {'D_Risk rel':<10} | {'D_Risk z':<8}"
+    print(header)
+    print("-" * len(header))
+    for check, r in zip(checks, results):
+        point = str(r[sweep_var]) if sweep_var else "Single"
+        for mode, d in check["discrepancy"].items():
+            c, dd = d["C_Risk"], d["D_Risk"]
+            print(f"{point:<10} | {mode:<10} | {c['rel']:<10.4f} | {c.get('z', 0.0):<8.2f} || {dd['rel']:<10.4f} | {dd.get('z', 0.0):<8.2f}")
+    print("==========================================================")
 
 if __name__ == "__main__":
     main()
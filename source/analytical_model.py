@@ -0,0 +1,339 @@
+import math
+
+# Simpson intervals used to integrate the K-th order statistic CDF over [0, 1]
+INTEGRATION_STEPS = 1000
+
+# What the distributed CA does each period:
+# "rekey"   -> new root key, every cert re-issued and re-replicated (legacy)
+# "refresh" -> proactive share refresh; the root key is only replaced every
+#              rekey_every periods
+DIST_ROTATIONS = ("rekey", "refresh")
+
+# What happens to certs exposed by a detected compromise:
+# "none"  -> nothing, they stay exposed until rotation (legacy)
+# "full"  -> revoked; every publication is a full CRL
+# "delta" -> revoked; a full CRL every crl_full_every publications and
+#            delta CRLs against it in between
+REVOCATION_MODES = ("none", "full", "delta")
+
+# Renewal windows per batch-means block of centralized leakage
+LEAKAGE_BLOCK_WINDOWS = 4
+
+def cert_renewal_interval(config):
+    """
+    Periods between two centralized user cert renewals. With a flat root
+    every rotation re-issues everything; under an intermediate hierarchy
+    user certs are renewed every cert_renew_every periods.
+    """
+    if config.ca_hierarchy == "flat":
+        return 1
+    if config.cert_renew_every < 1:
+        raise ValueError(f"cert_renew_every must be >= 1, got {config.cert_renew_every}")
+    return config.cert_renew_every
+
+def centralized_leakage_block(config):
+    """
+    Periods per batch-means block of the centralized leakage. A fallen key
+    stays trusted for up to a renewal window from wherever it fell, so the
+    blocks span several windows to keep neighbouring blocks nearly
+    independent. Off-lockstep rotations (event engine) let even a one
+    period window cross into the next period.
+    """
+    window = cert_renewal_interval(config)
+    if window == 1 and config.rotation_schedule == "lockstep":
+        return 1
+    return LEAKAGE_BLOCK_WINDOWS * window
+
+def is_renewal_period(config, t):
+    """
+    Whether 1-based period t re-issues the centralized user certs.
+    """
+    return (t - 1) % cert_renewal_interval(config) == 0
+
+def centralized_period_cost(config, t):
+    """
+    Weighted update cost of centralized period t: the certs actually
+    re-signed, i.e. one intermediate per node (if any) plus the user certs
+    renewed in that period.
+    """
+    signed = config.M if config.ca_hierarchy == "intermediate" else 0
+    if is_renewal_period(config, t):
+        # Each node re-issues only its own certs
+        signed += config.certs_per_node * config.M
+    return config.V2 * signed
+
+def centralized_update_cost(config):
+    """
+    Weighted update cost of one centralized rotation period, averaged over
+    a renewal interval.
+    """
+    interval = cert_renewal_interval(config)
+    return math.fsum(centralized_period_cost(config, t) for t in range(1, interval + 1)) / interval
+
+def centralized_total_update_cost(config, periods):
+    """
+    Exact weighted update cost of periods 1..periods.
+    """
+    return math.fsum(centralized_period_cost(config, t) for t in range(1, periods + 1))
+
+def centralized_cert_replicas(config, periods):
+    """
+    User cert copies charged over periods 1..periods: each node's certs,
+    once per renewal period.
+    """
+    renewals = sum(1 for t in range(1, periods + 1) if is_renewal_period(config, t))
+    return renewals * config.certs_per_node * config.M
+
+def rekey_interval(config):
+    """
+    Periods between two distributed root keys (1 when rekeying every period).
+    """
+    if config.dist_rotation not in DIST_ROTATIONS:
+        raise ValueError(f"Unknown distributed rotation: {config.dist_rotation}")
+    if config.dist_rotation == "rekey":
+        return 1
+    if config.rekey_every < 1:
+        raise ValueError(f"rekey_every must be >= 1, got {config.rekey_every}")
+    return config.rekey_every
+
+def is_rekey_period(config, t):
+    """
+    Whether 1-based period t replaces the distributed root key.
+    """
+    return (t - 1) % rekey_interval(config) == 0
+
+def distributed_rekey_cost(config):
+    """
+    Weighted update cost of one distributed rekey period.
+    Every node stores ALL certs (full replication).
+    """
+    raw_update_ops = config.total_certs * config.M
+    return config.V2 * raw_update_ops
+
+def distributed_cert_replicas(config, periods):
+    """
+    User cert copies charged over periods 1..periods: every cert on every
+    node, once per rekey.
+    """
+    rekeys = sum(1 for t in range(1, periods + 1) if is_rekey_period(config, t))
+    return rekeys * config.total_certs * config.M
+
+def share_refresh_cost(config):
+    """
+    Weighted update cost of one proactive share refresh: every node sends
+    a zero-sharing sub-share to each of the other M - 1 nodes.
+    """
+    return config.share_msg_cost * config.M * (config.M - 1)
+
+def distributed_update_cost(config):
+    """
+    Weighted update cost of one distributed period, averaged over a rekey
+    interval.
+    """
+    interval = rekey_interval(config)
+    return (distributed_rekey_cost(config) + (interval - 1) * share_refresh_cost(config)) / interval
+
+def distributed_total_update_cost(config, periods):
+    """
+    Exact weighted update cost of periods 1..periods.
+    """
+    rekeys = sum(1 for t in range(1, periods + 1) if is_rekey_period(config, t))
+    return rekeys * distributed_rekey_cost(config) + (periods - rekeys) * share_refresh_cost(config)
+
+def node_compromise_prob(poisson_lambda, t=1.0):
+    """
+    Probability that a node sees at least one attack within [0, t].
+    """
+    return -math.expm1(-poisson_lambda * t)
+
+def expected_node_exposure(poisson_lambda):
+    """
+    E[(1 - t)^+] for the first arrival t ~ Exp(lambda) on the unit period.
+    """
+    if poisson_lambda <= 0:
+        return 0.0
+    return 1.0 - node_compromise_prob(poisson_lambda) / poisson_lambda
+
+def expected_window_exposure(poisson_lambda, window):
+    """
+    Mean per-period exposure of one node whose signing key is replaced every
+    period but stays trusted for `window` periods. The node is exposed while
+    the current key or any of the previous window - 1 keys has fallen.
+    """
+    if poisson_lambda <= 0:
+        return 0.0
+    survive_earlier = math.exp(-poisson_lambda * (window - 1))
+    return 1.0 - survive_earlier * node_compromise_prob(poisson_lambda) / poisson_lambda
+
+def binomial_tail(n, k, q):
+    """
+    P(X >= k) for X ~ Binomial(n, q).
+    """
+    if k <= 0:
+        return 1.0
+    if k > n:
+        return 0.0
+    return math.fsum(math.comb(n, j) * q ** j * (1.0 - q) ** (n - j) for j in range(k, n + 1))
+
+def kth_compromise_cdf(poisson_lambda, M, K, t):
+    """
+    P(tau_K <= t): the K-th distinct node has fallen by time t. Each node's
+    first arrival is independent, so this is a binomial tail over M nodes.
+    """
+    return binomial_tail(M, K, node_compromise_prob(poisson_lambda, t))
+
+def simpson(f, steps=INTEGRATION_STEPS):
+    """
+    integral_0^1 f(t) dt by composite Simpson.
+    """
+    if steps % 2:
+        steps += 1
+    h = 1.0 / steps
+    terms = []
+    for i in range(steps + 1):
+        w = 1 if i in (0, steps) else (4 if i % 2 else 2)
+        terms.append(w * f(i * h))
+    return math.fsum(terms) * h / 3.0
+
+def expected_system_exposure(poisson_lambda, M, K, steps=INTEGRATION_STEPS):
+    """
+    E[(1 - tau_K)^+] = integral_0^1 P(tau_K <= t) dt.
+    """
+    if poisson_lambda <= 0 or K > M:
+        return 0.0
+    return simpson(lambda t: kth_compromise_cdf(poisson_lambda, M, K, t), steps)
+
+def revocation_delay(config):
+    """
+    Fraction of a period between a compromise and the revocation of what it
+    exposed, or None when nothing is revoked.
+    """
+    if config.revocation not in REVOCATION_MODES:
+        raise ValueError(f"Unknown revocation mode: {config.revocation}")
+    if config.revocation == "none":
+        return None
+    if not 0.0 <= config.detection_delay <= 1.0:
+        raise ValueError(f"detection_delay must be within [0, 1], got {config.detection_delay}")
+    return config.detection_delay
+
+def expected_revoked_exposure(compromise_cdf, delay, carries, steps=INTEGRATION_STEPS):
+    """
+    Mean exposure within one period when every compromise is revoked
+    `delay` (<= 1) after it happens. compromise_cdf(t) is the probability
+    of a compromise by time t of a period. Exposed at s if this period's
+    compromise fell in [s - delay, s] or, when carries is set, the previous
+    period's fell after 1 + s - delay.
+    """
+    def exposed(s):
+        own = compromise_cdf(s) - compromise_cdf(max(0.0, s - delay))
+        spill = compromise_cdf(1.0) - compromise_cdf(min(1.0, 1.0 + s - delay)) if carries else 0.0
+        return 1.0 - (1.0 - own) * (1.0 - spill)
+    return simpson(exposed, steps)
+
+def expected_epoch_exposure(poisson_lambda, M, K, interval):
+    """
+    Mean per-period exposure when one root key lives for `interval` periods.
+    Refreshed shares reset the attacker every period, but once K nodes fall
+    in period i the key stays exposed for the remaining interval - 1 - i
+    periods as well.
+    """
+    exposure = expected_system_exposure(poisson_lambda, M, K)
+    if interval <= 1:
+        return exposure
+    q = kth_compromise_cdf(poisson_lambda, M, K, 1.0)
+    terms = [(1.0 - q) ** i * (exposure + q * (interval - 1 - i)) for i in range(interval)]
+    return math.fsum(terms) / interval
+
+def expected_period_leakage(config):
+    """
+    Expected (centralized, distributed) leakage of one period, in
+    cert * normalized-period units.
+    """
+    poisson_lambda = config.p * config.T
+    delay = revocation_delay(config)
+    if delay is not None:
+        # Revocation cuts every exposure short, so only the previous
+        # period's compromise can still reach into this one
+        window = cert_renewal_interval(config)
+        interval = rekey_interval(config)
+        c_exposure = expected_revoked_exposure(lambda t: node_compromise_prob(poisson_lambda, t),
+                                               delay, window > 1)
+        d_cdf = lambda t: kth_compromise_cdf(poisson_lambda, config.M, config.K, t)
+        d_exposure = (expected_revoked_exposure(d_cdf, delay, False)
+                      + (interval - 1) * expected_revoked_exposure(d_cdf, delay, True)) / interval
+        return (config.M * config.certs_per_node * c_exposure, config.total_certs * d_exposure)
+
+    c_leak = config.M * config.certs_per_node * expected_window_exposure(poisson_lambda,
+                                                                         cert_renewal_interval(config))
+    d_leak = config.total_certs * expected_epoch_exposure(poisson_lambda, config.M, config.K,
+                                                          rekey_interval(config))
+    return c_leak, d_leak
+
+def tilted_attack_rate(config):
+    """
+    Per-period attack rate the distributed nodes are sampled at under
+    importance sampling: config.is_rate, or by default the rate at which K
+    of the M nodes fall within the periods one leakage estimate depends on
+    (never below the real rate).
+    """
+    poisson_lambda = config.p * config.T
+    if config.is_rate is not None:
+        return config.is_rate
+    # Without revocation a whole rekey epoch is weighted together
+    span = rekey_interval(config) if revocation_delay(config) is None else 1
+    target = min(0.9, config.K / config.M)
+    return max(poisson_lambda, -math.log1p(-target) / span)
+
+def revocation_rates(config):
+    """
+    Expected (centralized, distributed) certs revoked per period.
+    """
+    poisson_lambda = config.p * config.T
+    c_rate = config.M * node_compromise_prob(poisson_lambda) * config.certs_per_node
+    d_rate = kth_compromise_cdf(poisson_lambda, config.M, config.K, 1.0) * config.total_certs
+    return c_rate, d_rate
+
+def expected_crl_entries(config, t, rate):
+    """
+    Expected entries on the CRL published in 1-based period t when `rate`
+    certs are revoked per period and kept listed for crl_retention periods.
+    """
+    since_full = (t - 1) % config.crl_full_every if config.revocation == "delta" else 0
+    if since_full == 0:
+        return rate * min(t, config.crl_retention)
+    return rate * min(since_full, config.crl_retention)
+
+def revocation_total_cost(config, rate, periods):
+    """
+    Weighted cost of distributing every period's CRL to all M nodes over
+    periods 1..periods, charged per CRL entry delivered.
+    """
+    if revocation_delay(config) is None:
+        return 0.0
+    entries = math.fsum(expected_crl_entries(config, t, rate) for t in range(1, periods + 1))
+    return config.crl_entry_cost * config.M * entries
+
+def evaluate(config):
+    """
+    Closed-form expected unit costs, in the same shape as run_experiment.
+    """
+    c_leak, d_leak = expected_period_leakage(config)
+
+    unit_update_central = centralized_update_cost(config) / config.T
+    unit_update_dist = distributed_update_cost(config) / config.T
+    if revocation_delay(config) is not None:
+        c_rate, d_rate = revocation_rates(config)
+        total_time = config.total_periods * config.T
+        unit_update_central += revocation_total_cost(config, c_rate, config.total_periods) / total_time
+        unit_update_dist += revocation_total_cost(config, d_rate, config.total_periods) / total_time
+
+    unit_risk_central = config.V1 * c_leak
+    unit_risk_dist = config.V1 * d_leak
+
+    return {
+        "C_Risk": unit_risk_central,
+        "C_Total": unit_update_central + unit_risk_central,
+        "D_Risk": unit_risk_dist,
+        "D_Total": unit_update_dist + unit_risk_dist,
+        "D_Compromise_Prob": kth_compromise_cdf(config.p * config.T, config.M, config.K, 1.0),
+    }
@@ -0,0 +1,241 @@
+import json
+import time
+import random
+import asyncio
+from .distributed_manager import SigningSession
+
+# How the coordinator reaches the M share-holding nodes:
+# "direct"    -> no network, the manager reads every share itself (legacy)
+# "inprocess" -> asyncio node services called through an in-process transport
+# "socket"    -> asyncio node services behind local TCP sockets
+TRANSPORTS = ("direct", "inprocess", "socket")
+
+def percentiles(values, points=(50, 95, 99)):
+    """
+    Nearest-rank percentiles plus mean/max of a list of samples.
+    """
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+    res = {"count": len(ordered), "mean": sum(ordered) / len(ordered), "max": ordered[-1]}
+    for p in points:
+        idx = min(len(ordered) - 1, max(0, int(round(p / 100.0 * len(ordered))) - 1))
+        res[f"p{p}"] = ordered[idx]
+    return res
+
+class LinkModel:
+    """
+    Per-link one-way latency (seconds) with uniform jitter, and a
+    probability that a request is silently dropped.
+    """
+    def __init__(self, latency=0.0, jitter=0.0, drop=0.0, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.drop = drop
+        self.rng = random.Random(seed)
+
+    def sample_delay(self):
+        return max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter))
+
+    def sample_drop(self):
+        return self.drop > 0 and self.rng.random() < self.drop
+
+class NodeService:
+    """
+    One share-holding node. Answers share requests from its own share only.
+    """
+    def __init__(self, node_id, manager):
+        self.node_id = node_id
+        self.manager = manager
+        self.requests = 0
+
+    async def handle(self, message):
+        self.requests += 1
+        if message.get("type") != "share":
+            return {"id": self.node_id, "error": "unknown request"}
+        shares = self.manager.collect_shares([self.node_id])
+        if not shares:
+            return {"id": self.node_id, "error": "no share"}
+        return {"id": shares[0][0], "value": shares[0][1]}
+
+class InProcessTransport:
+    def __init__(self, nodes, link):
+        self.nodes = {node.node_id: node for node in nodes}
+        self.link = link
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def _send(self, node_id, message):
+        return await self.nodes[node_id].handle(message)
+
+    async def request(self, node_id, message):
+        if self.link.sample_drop():
+            # Never answered; the coordinator's timeout decides what happens
+            await asyncio.Event().wait()
+        await asyncio.sleep(self.link.sample_delay())
+        response = await self._send(node_id, message)
+        await asyncio.sleep(self.link.sample_delay())
+        return response
+
+class LocalSocketTransport(InProcessTransport):
+    """
+    Every node listens on its own 127.0.0.1 port; requests and responses are
+    newline-delimited JSON.
+    """
+    def __init__(self, nodes, link):
+        super().__init__(nodes, link)
+        self.servers = {}
+        self.ports = {}
+
+    async def start(self):
+        for node_id, node in self.nodes.items():
+            server = await asyncio.start_server(self._handler(node), "127.0.0.1", 0)
+            self.servers[node_id] = server
+            self.ports[node_id] = server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        for server in self.servers.values():
+            server.close()
+            await server.wait_closed()
+        self.servers = {}
+
+    def _handler(self, node):
+        async def handle(reader, writer):
+            line = await reader.readline()
+            response = await node.handle(json.loads(line))
+            writer.write(json.dumps(response).encode() + b"\n")
+            await writer.drain()
+            writer.close()
+        return handle
+
+    async def _send(self, node_id, message):
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.ports[node_id])
+        try:
+            writer.write(json.dumps(message).encode() + b"\n")
+            await writer.drain()
+            return json.loads(await reader.readline())
+        finally:
+            writer.close()
+
+class Coordinator:
+    """
+    Fans share requests out to the quorum concurrently and falls back to the
+    remaining nodes when some of them time out or fail.
+    """
+    def __init__(self, transport, k, timeout=1.0, retries=1):
+        self.transport = transport
+        self.k = k
+        self.timeout = timeout
+        self.retries = retries
+
+        self.request_latencies = []
+        self.collect_latencies = []
+        # Per-node latency of the last collect_shares call
+        self.node_latencies = {}
+        self.requests = 0
+        self.timeouts = 0
+        self.failures = 0
+
+    async def _request_share(self, node_id):
+        for attempt in range(self.retries + 1):
+            self.requests += 1
+            start = time.perf_counter()
+            try:
+                response = await asyncio.wait_for(
+                    self.transport.request(node_id, {"type": "share"}), self.timeout)
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                continue
+            latency = time.perf_counter() - start
+            self.request_latencies.append(latency)
+            self.node_latencies[node_id] = latency
+            if "error" in response:
+                self.failures += 1
+                return None
+            return (response["id"], response["value"])
+        return None
+
+    async def collect_shares(self, preferred, candidates):
+        """
+        Asks the preferred nodes first, then the other candidates, until k
+        shares arrive. Returns the shares collected (possibly fewer than k).
+        """
+        start = time.perf_counter()
+        shares = []
+        self.node_latencies = {}
+        backups = [nid for nid in candidates if nid not in preferred]
+        wave = list(preferred)
+        while wave and len(shares) < self.k:
+            pending = [asyncio.ensure_future(self._request_share(nid)) for nid in wave]
+            for next_done in asyncio.as_completed(pending):
+                share = await next_done
+                if share is not None:
+                    shares.append(share)
+                if len(shares) >= self.k:
+                    break
+            for f in pending:
+                f.cancel()
+            missing = self.k - len(shares)
+            wave, backups = backups[:missing], backups[missing:]
+        self.collect_latencies.append(time.perf_counter() - start)
+        return shares[:self.k]
+
+    def stats(self):
+        return {
+            "requests": self.requests,
+            "timeouts": self.timeouts,
+            "failures": self.failures,
+            "request_latency": percentiles(self.request_latencies),
+            "collect_latency": percentiles(self.collect_latencies),
+        }
+
+class AsyncCluster:
+    """
+    Runs the M nodes of a DistributedManager as asyncio services on a
+    private event loop and opens signing sessions from shares gathered
+    over the transport.
+    """
+    def __init__(self, manager, transport="inprocess", link=None, timeout=1.0, retries=1):
+        if transport not in TRANSPORTS or transport == "direct":
+            raise ValueError(f"Unknown cluster transport: {transport}")
+        self.manager = manager
+        self.link = link if link is not None else LinkModel()
+        self.nodes = [NodeService(nid, manager) for nid in range(1, manager.n + 1)]
+        transport_cls = LocalSocketTransport if transport == "socket" else InProcessTransport
+        self.transport = transport_cls(self.nodes, self.link)
+        self.coordinator = Coordinator(self.transport, manager.k, timeout=timeout, retries=retries)
+
+        self.loop = asyncio.new_event_loop()
+        self.loop.run_until_complete(self.transport.start())
+
+    def open_session(self, node_ids):
+        """
+        Network counterpart of DistributedManager.open_session.
+        Returns None if fewer than k shares could be collected.
+        """
+        start = time.perf_counter()
+        candidates = [node.node_id for node in self.nodes]
+        shares = self.loop.run_until_complete(self.coordinator.collect_shares(node_ids, candidates))
+        collect_time = time.perf_counter() - start
+        if len(shares) < self.manager.k:
+            return None
+        session = SigningSession(self.manager, [s[0] for s in shares], shares=shares,
+                                 collect_time=collect_time, node_latencies=self.coordinator.node_latencies)
+        if not session.ready:
+            return None
+        return session
+
+    def stats(self):
+        res = self.coordinator.stats()
+        res["node_requests"] = {node.node_id: node.requests for node in self.nodes}
+        return res
+
+    def close(self):
+        if self.loop.is_closed():
+            return
+        self.loop.run_until_complete(self.transport.stop())
+        self.loop.close()
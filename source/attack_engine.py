@@ -0,0 +1,480 @@
+import math
+import random
+import numpy as np
+from .instrumentation import NullInstrumentation
+from .event_engine import EventAttackEngine
+from .analytical_model import (
+    rekey_interval, cert_renewal_interval, centralized_leakage_block, revocation_delay, tilted_attack_rate,
+)
+
+# Periods simulated per NumPy batch. Bounds memory at roughly
+# CHUNK_PERIODS * M * 8 bytes regardless of the total number of periods.
+CHUNK_PERIODS = 65536
+
+# How distributed attack times are sampled:
+# "plain"      -> at the real attack rate
+# "importance" -> at a tilted (higher) rate, each period weighted by its
+#                 likelihood ratio so the leakage estimate stays unbiased
+ATTACK_SAMPLINGS = ("plain", "importance")
+
+# Two-sided 95% normal quantile for the reported confidence intervals
+CI_Z = 1.959964
+
+def first_compromise_times(rng, poisson_lambda, periods, nodes):
+    """
+    Time of the first Poisson arrival for every (period, node) pair on the
+    normalized [0, 1] period. Values > 1 mean the node survived the period.
+    """
+    if poisson_lambda <= 0:
+        return np.full((periods, nodes), np.inf)
+    return rng.exponential(1.0 / poisson_lambda, size=(periods, nodes))
+
+def window_leakage(first_times, certs_per_node, window, history=None):
+    """
+    Per-period centralized leakage when each period's signing key stays
+    trusted for `window` periods: a node is fully exposed while any of its
+    previous window - 1 keys has fallen. history holds the compromise flags
+    of the periods just before first_times (oldest first).
+    Returns (leakage, history for the next call).
+    """
+    if window <= 1:
+        return centralized_leakage(first_times, certs_per_node), history
+    periods, nodes = first_times.shape
+    if history is None:
+        history = np.zeros((window - 1, nodes), dtype=bool)
+    flags = np.concatenate([history, first_times <= 1.0])
+    counts = np.concatenate([np.zeros((1, nodes), dtype=np.int64), np.cumsum(flags, axis=0)])
+    earlier = counts[window - 1:window - 1 + periods] - counts[:periods]
+    exposure = np.where(earlier > 0, 1.0, np.clip(1.0 - first_times, 0.0, None))
+    return exposure.sum(axis=1) * certs_per_node, flags[-(window - 1):]
+
+def tilted_log_weights(first_times, poisson_lambda, tilted_lambda):
+    """
+    Per-period log likelihood ratio of first compromise times drawn at
+    tilted_lambda instead of poisson_lambda. Times past the period end are
+    censored, so only whether and when each node first fell matters.
+    """
+    log_ratio = np.log(poisson_lambda / tilted_lambda)
+    shift = poisson_lambda - tilted_lambda
+    inside = first_times <= 1.0
+    per_node = np.where(inside, log_ratio - shift * np.where(inside, first_times, 0.0), -shift)
+    return per_node.sum(axis=1)
+
+def dependent_log_weights(log_weights, interval, delay):
+    """
+    Log weight of each period's leakage estimate: the likelihood ratio of
+    every period that leakage depends on. Without revocation that is the
+    epoch so far; with it, this period and (inside an epoch) the previous
+    one. log_weights must start on an epoch boundary.
+    """
+    periods = len(log_weights)
+    if delay is not None:
+        prev = np.concatenate([[0.0], log_weights[:-1]])
+        return log_weights + np.where(np.arange(periods) % interval != 0, prev, 0.0)
+    grid = np.zeros(-(-periods // interval) * interval)
+    grid[:periods] = log_weights
+    return np.cumsum(grid.reshape(-1, interval), axis=1).reshape(-1)[:periods]
+
+def kth_compromise_times(first_times, k):
+    """
+    K-th order statistic of the per-node first compromise times, i.e. the
+    moment the K-th distinct node falls. Later arrivals on an already
+    compromised node never add a new node, so only first arrivals matter.
+    """
+    periods, nodes = first_times.shape
+    if k > nodes:
+        return np.full(periods, np.inf)
+    if k <= 0:
+        return np.zeros(periods)
+    return np.partition(first_times, k - 1, axis=1)[:, k - 1]
+
+def centralized_leakage(first_times, certs_per_node):
+    """
+    Per-period leakage: every compromised node exposes its own certs for
+    the remainder of the period.
+    """
+    exposure = np.clip(1.0 - first_times, 0.0, None)
+    return exposure.sum(axis=1) * certs_per_node
+
+def distributed_leakage(kth_times, total_certs):
+    """
+    Per-period leakage: once K nodes fall, all certs are exposed for the
+    remainder of the period.
+    """
+    return np.clip(1.0 - kth_times, 0.0, None) * total_certs
+
+def epoch_leakage(kth_times, total_certs, interval):
+    """
+    Per-period leakage when the root key is only replaced every `interval`
+    periods: once K nodes fall, all certs stay exposed until the end of the
+    key's epoch. kth_times must start on an epoch boundary.
+    """
+    if interval <= 1:
+        return distributed_leakage(kth_times, total_certs)
+    periods = len(kth_times)
+    grid = np.full(-(-periods // interval) * interval, np.inf)
+    grid[:periods] = kth_times
+    grid = grid.reshape(-1, interval)
+    compromised = grid <= 1.0
+    earlier = np.cumsum(compromised, axis=1) - compromised
+    exposure = np.where(earlier > 0, 1.0, np.clip(1.0 - grid, 0.0, None))
+    return exposure.reshape(-1)[:periods] * total_certs
+
+def revoked_exposure(times, prev_times, delay, carries):
+    """
+    Exposure within each period when every compromise is revoked `delay`
+    (<= 1) after it happens: the union of [t, t + delay] for this period's
+    compromise and whatever part of the previous period's interval spills
+    over (only where carries is set). Works elementwise on NumPy arrays.
+    """
+    spill = np.where(carries & (prev_times <= 1.0), np.clip(prev_times + delay - 1.0, 0.0, None), 0.0)
+    own_end = np.minimum(1.0, times + delay)
+    own = np.clip(own_end - times, 0.0, None)
+    overlap = np.clip(np.minimum(spill, own_end) - times, 0.0, None)
+    return spill + own - np.where(times <= 1.0, overlap, 0.0)
+
+def require_lockstep(config, engine):
+    # Only the event engine models off-lockstep rotations
+    if config.rotation_schedule != "lockstep":
+        raise ValueError(f"{engine} attack engine does not support rotation schedule: {config.rotation_schedule}")
+
+class VectorizedAttackEngine:
+    """
+    Batched attack phase. Draws every arrival time for a chunk of periods at
+    once and reduces them to leakage sums with NumPy.
+    """
+    def __init__(self, config, seed=None, chunk_periods=CHUNK_PERIODS, instrument=None):
+        require_lockstep(config, "Vectorized")
+        self.config = config
+        # One stream per architecture, so chunking never changes which
+        # draws a period gets
+        self.c_rng, self.d_rng = [np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(2)]
+        self.chunk_periods = chunk_periods
+        self.instrument = instrument if instrument is not None else NullInstrumentation()
+
+    def run(self, periods):
+        config = self.config
+        poisson_lambda = config.p * config.T
+
+        stats = {
+            "periods": periods,
+            "c_leakage": 0.0,
+            "d_leakage": 0.0,
+            "c_leakage_sq": 0.0,
+            "d_leakage_sq": 0.0,
+            "c_compromised_nodes": 0,
+            "d_compromised_periods": 0,
+        }
+        importance = use_importance_sampling(config)
+        d_lambda = tilted_attack_rate(config) if importance else poisson_lambda
+        if importance:
+            stats["d_weight_sum"] = 0.0
+            stats["d_weight_sq"] = 0.0
+
+        # Chunks hold whole rekey epochs so they can be reduced independently
+        interval = rekey_interval(config)
+        # Epochs are independent, periods inside one are not
+        stats["d_leakage_block"] = interval
+        # Centralized leakage is correlated across a renewal window
+        window = cert_renewal_interval(config)
+        c_block = centralized_leakage_block(config)
+        stats["c_leakage_block"] = c_block
+        # Chunks also hold whole centralized blocks
+        step = math.lcm(interval, c_block)
+        chunk_periods = max(step, self.chunk_periods // step * step)
+        c_history = None
+        delay = revocation_delay(config)
+        c_prev = np.full((1, config.M), np.inf)
+
+        done = 0
+        while done < periods:
+            n = min(chunk_periods, periods - done)
+            self.instrument.next_period()
+
+            with self.instrument.stage("draw"):
+                c_times = first_compromise_times(self.c_rng, poisson_lambda, n, config.M)
+                d_times = first_compromise_times(self.d_rng, d_lambda, n, config.M)
+
+            with self.instrument.stage("reduce"):
+                if delay is None:
+                    c_leak, c_history = window_leakage(c_times, config.certs_per_node, window, c_history)
+                else:
+                    prev = np.concatenate([c_prev, c_times[:-1]])
+                    c_leak = revoked_exposure(c_times, prev, delay, window > 1).sum(axis=1) * config.certs_per_node
+                    c_prev = c_times[-1:]
+                stats["c_leakage"] += float(c_leak.sum())
+                stats["c_leakage_sq"] += float(np.square(block_sums(c_leak, c_block)).sum())
+                stats["c_compromised_nodes"] += int(np.count_nonzero(c_times <= 1.0))
+
+                d_kth = kth_compromise_times(d_times, config.K)
+                if delay is None:
+                    d_leak = epoch_leakage(d_kth, config.total_certs, interval)
+                else:
+                    # Chunks start on an epoch boundary, so nothing carries in
+                    prev = np.concatenate([[np.inf], d_kth[:-1]])
+                    carries = np.arange(n) % interval != 0
+                    d_leak = revoked_exposure(d_kth, prev, delay, carries) * config.total_certs
+                if importance:
+                    log_w = tilted_log_weights(d_times, poisson_lambda, d_lambda)
+                    weights = np.exp(dependent_log_weights(log_w, interval, delay))
+                    d_leak = d_leak * weights
+                    stats["d_weight_sum"] += float(weights.sum())
+                    stats["d_weight_sq"] += float(np.square(weights).sum())
+                stats["d_leakage"] += float(d_leak.sum())
+                stats["d_leakage_sq"] += float(np.square(block_sums(d_leak, interval)).sum())
+                stats["d_compromised_periods"] += int(np.count_nonzero(d_kth <= 1.0))
+
+            done += n
+
+        return stats
+
+class PythonAttackEngine:
+    """
+    Reference per-event implementation, one expovariate draw at a time.
+    """
+    def __init__(self, config, seed=None, instrument=None):
+        require_lockstep(config, "Python")
+        self.config = config
+        self.rng = random.Random(seed)
+        self.instrument = instrument if instrument is not None else NullInstrumentation()
+        # Root key of the current epoch already recovered by the attacker
+        self.root_exposed = False
+        # Centralized node -> last period one of its fallen keys is trusted
+        self.exposed_until = {}
+        self.period = 0
+        # Previous period's compromise times, for revocation spill-over
+        self.prev_first = {}
+        self.prev_kth = None
+        # Importance sampling log weights: epoch so far and previous period
+        self.epoch_log_weight = 0.0
+        self.prev_log_weight = 0.0
+        # Distributed leakage of the current epoch, squared per epoch
+        self.epoch_leakage = 0.0
+        # Centralized leakage of the current batch-means block, squared per block
+        self.block_leakage = 0.0
+
+    def run(self, periods):
+        config = self.config
+        poisson_lambda = config.p * config.T
+
+        stats = {
+            "periods": periods,
+            "c_leakage": 0.0,
+            "d_leakage": 0.0,
+            "c_leakage_sq": 0.0,
+            "d_leakage_sq": 0.0,
+            "c_compromised_nodes": 0,
+            "d_compromised_periods": 0,
+        }
+        if poisson_lambda <= 0:
+            return stats
+        d_lambda = poisson_lambda
+        if use_importance_sampling(config):
+            d_lambda = tilted_attack_rate(config)
+            stats["d_weight_sum"] = 0.0
+            stats["d_weight_sq"] = 0.0
+
+        interval = rekey_interval(config)
+        stats["d_leakage_block"] = interval
+        c_block = centralized_leakage_block(config)
+        stats["c_leakage_block"] = c_block
+        for t in range(periods):
+            self.period = t
+            if t % c_block == 0:
+                stats["c_leakage_sq"] += self.block_leakage ** 2
+                self.block_leakage = 0.0
+            if t % interval == 0:
+                # New root key: whatever was recovered before is worthless
+                self.root_exposed = False
+                self.epoch_log_weight = 0.0
+                self.prev_log_weight = 0.0
+                stats["d_leakage_sq"] += self.epoch_leakage ** 2
+                self.epoch_leakage = 0.0
+            self.instrument.next_period()
+            with self.instrument.stage("period"):
+                self._run_period(stats, poisson_lambda, d_lambda)
+        stats["d_leakage_sq"] += self.epoch_leakage ** 2
+        self.epoch_leakage = 0.0
+        stats["c_leakage_sq"] += self.block_leakage ** 2
+        self.block_leakage = 0.0
+
+        return stats
+
+    def _run_period(self, stats, poisson_lambda, d_lambda):
+        config = self.config
+        # Centralized
+        c_compromised_nodes = set()
+        c_period_leakage = 0.0
+        window = cert_renewal_interval(config)
+        delay = revocation_delay(config)
+
+        for node_id in range(config.M):
+            if delay is None and self.exposed_until.get(node_id, -1) >= self.period:
+                # An earlier key of this node is still trusted
+                c_period_leakage += config.certs_per_node
+            first_arrival = None
+            time_cursor = 0.0
+            while True:
+                inter_arrival = self.rng.expovariate(poisson_lambda)
+                time_cursor += inter_arrival
+                if time_cursor > 1.0:
+                    break
+                if node_id not in c_compromised_nodes:
+                    c_compromised_nodes.add(node_id)
+                    first_arrival = time_cursor
+                    if delay is None and self.exposed_until.get(node_id, -1) < self.period:
+                        leakage_duration = 1.0 - time_cursor
+                        c_period_leakage += (leakage_duration * config.certs_per_node)
+                    self.exposed_until[node_id] = self.period + window - 1
+
+            if delay is not None:
+                exposure = self._revoked_exposure(first_arrival, self.prev_first.get(node_id), delay, window > 1)
+                c_period_leakage += exposure * config.certs_per_node
+                self.prev_first[node_id] = first_arrival
+
+        stats["c_leakage"] += c_period_leakage
+        self.block_leakage += c_period_leakage
+        stats["c_compromised_nodes"] += len(c_compromised_nodes)
+
+        # Distributed (nodes are 1..M, matching the share indices)
+        d_compromised_nodes = set()
+        system_compromised_at = None
+        attack_events = []
+        # Likelihood ratio of this period's draws (0 unless sampling is tilted)
+        log_weight = 0.0
+
+        for node_id in range(1, config.M + 1):
+            time_cursor = 0.0
+            first_arrival = None
+            while True:
+                inter_arrival = self.rng.expovariate(d_lambda)
+                time_cursor += inter_arrival
+                if time_cursor > 1.0:
+                    break
+                if first_arrival is None:
+                    first_arrival = time_cursor
+                attack_events.append((time_cursor, node_id))
+            if d_lambda != poisson_lambda:
+                log_weight += self._tilted_log_weight(first_arrival, poisson_lambda, d_lambda)
+
+        attack_events.sort()
+
+        for at_time, node_id in attack_events:
+            d_compromised_nodes.add(node_id)
+            if len(d_compromised_nodes) >= config.K:
+                system_compromised_at = at_time
+                break
+
+        d_period_leakage = 0.0
+        if delay is not None:
+            carries = self.period % rekey_interval(config) != 0
+            exposure = self._revoked_exposure(system_compromised_at, self.prev_kth, delay, carries)
+            d_period_leakage = exposure * config.total_certs
+            self.prev_kth = system_compromised_at
+            weight = math.exp(log_weight + (self.prev_log_weight if carries else 0.0))
+        else:
+            if self.root_exposed:
+                # Key recovered earlier in this epoch, exposed all period long
+                d_period_leakage = float(config.total_certs)
+            elif system_compromised_at is not None:
+                d_period_leakage = (1.0 - system_compromised_at) * config.total_certs
+                self.root_exposed = True
+            weight = math.exp(self.epoch_log_weight + log_weight)
+        self.epoch_log_weight += log_weight
+        self.prev_log_weight = log_weight
+
+        d_period_leakage *= weight
+        stats["d_leakage"] += d_period_leakage
+        self.epoch_leakage += d_period_leakage
+        if "d_weight_sum" in stats:
+            stats["d_weight_sum"] += weight
+            stats["d_weight_sq"] += weight ** 2
+
+        if system_compromised_at is not None:
+            stats["d_compromised_periods"] += 1
+
+        return stats
+
+    @staticmethod
+    def _tilted_log_weight(first_arrival, poisson_lambda, tilted_lambda):
+        """
+        Scalar counterpart of tilted_log_weights for one node.
+        """
+        if first_arrival is None:
+            return tilted_lambda - poisson_lambda
+        return math.log(poisson_lambda / tilted_lambda) - (poisson_lambda - tilted_lambda) * first_arrival
+
+    @staticmethod
+    def _revoked_exposure(compromised_at, prev_compromised_at, delay, carries):
+        """
+        Length of the union of [t, t + delay] intervals falling into this
+        period, from this period's compromise and (if carries) the
+        previous one's. None means no compromise.
+        """
+        intervals = []
+        if carries and prev_compromised_at is not None:
+            intervals.append((0.0, prev_compromised_at + delay - 1.0))
+        if compromised_at is not None:
+            intervals.append((compromised_at, min(1.0, compromised_at + delay)))
+
+        covered = 0.0
+        reached = 0.0
+        for start, end in sorted(intervals):
+            start = max(start, reached)
+            if end > start:
+                covered += end - start
+                reached = end
+        return covered
+
+ATTACK_ENGINES = {
+    "vectorized": VectorizedAttackEngine,
+    "python": PythonAttackEngine,
+    "event": EventAttackEngine,
+}
+
+def make_attack_engine(config, seed=None, instrument=None):
+    if config.attack_engine not in ATTACK_ENGINES:
+        raise ValueError(f"Unknown attack engine: {config.attack_engine}")
+    return ATTACK_ENGINES[config.attack_engine](config, seed=seed, instrument=instrument)
+
+def use_importance_sampling(config):
+    """
+    Whether the distributed attack times are drawn at a tilted rate.
+    """
+    if config.attack_sampling not in ATTACK_SAMPLINGS:
+        raise ValueError(f"Unknown attack sampling: {config.attack_sampling}")
+    return config.attack_sampling == "importance" and config.p * config.T > 0
+
+def leakage_std_error(stats, key):
+    """
+    Standard error of the per-period mean of stats[key] ("c_leakage" or
+    "d_leakage") from the accumulated sum and sum of squares. The squares
+    may be taken over blocks of stats[key + "_block"] periods (batch means),
+    which keeps the error honest when periods inside a block are correlated.
+    """
+    block = stats.get(key + "_block", 1)
+    n = -(-stats["periods"] // block)
+    if n < 2:
+        return 0.0
+    mean = stats[key] / n
+    var = max(stats[key + "_sq"] / n - mean * mean, 0.0) * n / (n - 1)
+    return (var / n) ** 0.5 / block
+
+def block_sums(values, block):
+    """
+    Sums of consecutive blocks of `block` values (the last may be partial).
+    """
+    padded = np.zeros(-(-len(values) // block) * block)
+    padded[:len(values)] = values
+    return padded.reshape(-1, block).sum(axis=1)
+
+def confidence_interval(mean, std_error, z=CI_Z):
+    return [mean - z * std_error, mean + z * std_error]
+
+def effective_sample_size(stats):
+    """
+    Kish effective sample size of the importance weights (None if unweighted).
+    """
+    if not stats.get("d_weight_sq"):
+        return None
+    return stats["d_weight_sum"] ** 2 / stats["d_weight_sq"]
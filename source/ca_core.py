@@ -3,6 +3,7 @@ from cryptography.x509.oid import NameOID
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.asymmetric import ec
 from cryptography.hazmat.primitives import serialization
+from cryptography.exceptions import InvalidSignature
 import datetime
 
 CURVE = ec.SECP256R1()
@@ -50,6 +51,35 @@ class CACore:
         
         return cert
 
+    @staticmethod
+    def create_intermediate_cert(root_cert, root_private_key, private_key, common_name="Issuing CA", days=90):
+        """
+        CA cert for private_key signed by the root; may only issue end-entity certs.
+        """
+        subject = x509.Name([
+            x509.NameAttribute(NameOID.COUNTRY_NAME, u"US"),
+            x509.NameAttribute(NameOID.ORGANIZATION_NAME, u"Engineering Project"),
+            x509.NameAttribute(NameOID.COMMON_NAME, common_name),
+        ])
+
+        cert = x509.CertificateBuilder().subject_name(
+            subject
+        ).issuer_name(
+            root_cert.subject
+        ).public_key(
+            private_key.public_key()
+        ).serial_number(
+            x509.random_serial_number()
+        ).not_valid_before(
+            datetime.datetime.now(datetime.timezone.utc)
+        ).not_valid_after(
+            datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(days=days)
+        ).add_extension(
+            x509.BasicConstraints(ca=True, path_length=0), critical=True,
+        ).sign(root_private_key, hashes.SHA256())
+
+        return cert
+
     @staticmethod
     def create_csr(private_key, common_name):
         csr = x509.CertificateSigningRequestBuilder().subject_name(x509.Name([
@@ -58,6 +88,14 @@ class CACore:
         ])).sign(private_key, hashes.SHA256())
         return csr
 
+    @staticmethod
+    def serialize_csr(csr):
+        return csr.public_bytes(serialization.Encoding.PEM)
+
+    @staticmethod
+    def load_csr(pem_data):
+        return x509.load_pem_x509_csr(pem_data)
+
     @staticmethod
     def sign_csr(ca_cert, ca_private_key, csr):
         cert = x509.CertificateBuilder().subject_name(
@@ -78,19 +116,94 @@ class CACore:
         
         return cert
 
+    @staticmethod
+    def create_crl(issuer_cert, issuer_private_key, revoked_serials, crl_number, delta_of=None):
+        """
+        CRL listing revoked_serials. With delta_of set it is a delta CRL
+        against the full CRL carrying that CRL number.
+        """
+        now = datetime.datetime.now(datetime.timezone.utc)
+        builder = x509.CertificateRevocationListBuilder().issuer_name(
+            issuer_cert.subject
+        ).last_update(
+            now
+        ).next_update(
+            now + datetime.timedelta(days=1)
+        ).add_extension(
+            x509.CRLNumber(crl_number), critical=False,
+        )
+        if delta_of is not None:
+            builder = builder.add_extension(x509.DeltaCRLIndicator(delta_of), critical=True)
+        for serial in revoked_serials:
+            builder = builder.add_revoked_certificate(
+                x509.RevokedCertificateBuilder().serial_number(serial).revocation_date(now).build()
+            )
+        return builder.sign(issuer_private_key, hashes.SHA256())
+
+    @staticmethod
+    def serialize_crl(crl):
+        return crl.public_bytes(serialization.Encoding.PEM)
+
+    @staticmethod
+    def load_crl(pem_data):
+        return x509.load_pem_x509_crl(pem_data)
+
     @staticmethod
     def serialize_cert(cert):
         return cert.public_bytes(serialization.Encoding.PEM)
 
+    @staticmethod
+    def serialize_cert_der(cert):
+        return cert.public_bytes(serialization.Encoding.DER)
+
+    @staticmethod
+    def load_cert_der(der_data):
+        return x509.load_der_x509_certificate(bytes(der_data))
+
     @staticmethod
     def save_to_file(path, data):
         with open(path, 'wb') as f:
             f.write(data)
 
+    @staticmethod
+    def load_cert(pem_data):
+        return x509.load_pem_x509_certificate(pem_data)
+
     @staticmethod
     def load_cert_from_file(path):
         with open(path, 'rb') as f:
-            return x509.load_pem_x509_certificate(f.read())
+            return CACore.load_cert(f.read())
+
+    @staticmethod
+    def verify_cert(cert, issuer_cert, issuer_public_key=None, now=None):
+        """
+        Checks that cert was issued by issuer_cert: issuer name, CA flag,
+        ECDSA signature and validity window of both. Pass issuer_public_key
+        to skip re-extracting it from issuer_cert.
+        Returns True/False.
+        """
+        if cert.issuer != issuer_cert.subject:
+            return False
+        try:
+            constraints = issuer_cert.extensions.get_extension_for_class(x509.BasicConstraints).value
+        except x509.ExtensionNotFound:
+            return False
+        if not constraints.ca:
+            return False
+
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        for c in (cert, issuer_cert):
+            if not (c.not_valid_before_utc <= now <= c.not_valid_after_utc):
+                return False
+
+        if issuer_public_key is None:
+            issuer_public_key = issuer_cert.public_key()
+        try:
+            issuer_public_key.verify(cert.signature, cert.tbs_certificate_bytes,
+                                     ec.ECDSA(cert.signature_hash_algorithm))
+        except InvalidSignature:
+            return False
+        return True
 
     @staticmethod
     def private_key_to_int(private_key):
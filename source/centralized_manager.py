@@ -1,29 +1,132 @@
 import os
 from .ca_core import CACore
+from .storage import FileSystemStorage
+
+# When the CA key/cert are written to storage after a rotation:
+# "write_through" -> immediately in initialize_ca
+# "lazy"          -> only on flush()
+PERSIST_POLICIES = ("write_through", "lazy")
+
+# What a rotation replaces:
+# "flat"         -> the self-signed root that issues user certs (legacy)
+# "intermediate" -> an issuing intermediate signed by a fixed offline root
+CA_HIERARCHIES = ("flat", "intermediate")
 
 class CentralizedManager:
-    def __init__(self, storage_dir="centralized_storage"):
+    def __init__(self, storage_dir="centralized_storage", persist="write_through", storage=None,
+                 hierarchy="flat"):
+        if persist not in PERSIST_POLICIES:
+            raise ValueError(f"Unknown persist policy: {persist}")
+        if hierarchy not in CA_HIERARCHIES:
+            raise ValueError(f"Unknown CA hierarchy: {hierarchy}")
         self.storage_dir = storage_dir
-        self.key_path = os.path.join(storage_dir, "root_key.pem")
-        self.cert_path = os.path.join(storage_dir, "root_cert.pem")
-        
-        if not os.path.exists(storage_dir):
-            os.makedirs(storage_dir)
+        self.hierarchy = hierarchy
+        # key_path/cert_path always hold the pair that signs user certs
+        if hierarchy == "flat":
+            self.key_path = os.path.join(storage_dir, "root_key.pem")
+            self.cert_path = os.path.join(storage_dir, "root_cert.pem")
+        else:
+            self.key_path = os.path.join(storage_dir, "issuing_key.pem")
+            self.cert_path = os.path.join(storage_dir, "issuing_cert.pem")
+            self.root_key_path = os.path.join(storage_dir, "offline_root_key.pem")
+            self.root_cert_path = os.path.join(storage_dir, "offline_root_cert.pem")
+        self.persist = persist
+        self.storage = storage if storage is not None else FileSystemStorage()
+
+        # Loaded CA key/cert, kept in memory between issuances
+        self._ca_key = None
+        self._ca_cert = None
+        self._dirty = False
+        # Offline root of the intermediate hierarchy, created on first rotation
+        self._root_key = None
+        self._root_cert = None
+
+        self.storage.makedirs(storage_dir)
 
     def initialize_ca(self):
+        """
+        Rotates the issuing key. Returns the number of CA certs signed by
+        another key (0 for a self-signed flat root, 1 for an intermediate).
+        """
         private_key = CACore.generate_private_key()
-        cert = CACore.create_self_signed_cert(private_key, common_name="Centralized Root CA")
-        
-        CACore.save_to_file(self.key_path, CACore.serialize_private_key(private_key))
-        CACore.save_to_file(self.cert_path, CACore.serialize_cert(cert))
+        if self.hierarchy == "flat":
+            cert = CACore.create_self_signed_cert(private_key, common_name="Centralized Root CA")
+            signed = 0
+        else:
+            root_key, root_cert = self.load_root()
+            cert = CACore.create_intermediate_cert(root_cert, root_key, private_key,
+                                                   common_name="Centralized Issuing CA")
+            signed = 1
+
+        # Rotation replaces the cached pair
+        self._ca_key = private_key
+        self._ca_cert = cert
+        self._dirty = True
+
+        if self.persist == "write_through":
+            self.flush()
+        return signed
+
+    def load_root(self):
+        """
+        Offline root of the intermediate hierarchy. Generated and stored once,
+        only ever used to sign intermediates.
+        """
+        if self._root_key is None:
+            if self.storage.exists(self.root_key_path):
+                self._root_key = CACore.load_private_key(self.storage.read(self.root_key_path))
+                self._root_cert = CACore.load_cert(self.storage.read(self.root_cert_path))
+            else:
+                self._root_key = CACore.generate_private_key()
+                self._root_cert = CACore.create_self_signed_cert(self._root_key,
+                                                                 common_name="Centralized Offline Root CA")
+                self.storage.write(self.root_key_path, CACore.serialize_private_key(self._root_key))
+                self.storage.write(self.root_cert_path, CACore.serialize_cert(self._root_cert))
+        return self._root_key, self._root_cert
+
+    def flush(self):
+        """
+        Writes the cached CA key/cert to storage if they have not been yet.
+        """
+        if not self._dirty:
+            return
+        self.storage.write(self.key_path, CACore.serialize_private_key(self._ca_key))
+        self.storage.write(self.cert_path, CACore.serialize_cert(self._ca_cert))
+        self._dirty = False
+
+    def load_ca(self):
+        if self._ca_key is None or self._ca_cert is None:
+            self._ca_key = CACore.load_private_key(self.storage.read(self.key_path))
+            self._ca_cert = CACore.load_cert(self.storage.read(self.cert_path))
+        return self._ca_key, self._ca_cert
 
     def issue_certificate(self, csr, output_path):
-        with open(self.key_path, 'rb') as f:
-            ca_key = CACore.load_private_key(f.read())
-        with open(self.cert_path, 'rb') as f:
-            ca_cert = CACore.load_cert_from_file(self.cert_path)
-            
+        ca_key, ca_cert = self.load_ca()
+
         user_cert = CACore.sign_csr(ca_cert, ca_key, csr)
-        
-        CACore.save_to_file(output_path, CACore.serialize_cert(user_cert))
+
+        self.storage.write(output_path, CACore.serialize_cert(user_cert))
         return user_cert
+
+    def issue_certificates(self, csrs, output_paths=None):
+        """
+        Signs many CSRs against one loaded CA key. Without output_paths the
+        certs are only returned, leaving persistence to the caller.
+        Returns the issued certs in input order.
+        """
+        ca_key, ca_cert = self.load_ca()
+
+        user_certs = []
+        for i, csr in enumerate(csrs):
+            user_cert = CACore.sign_csr(ca_cert, ca_key, csr)
+            if output_paths is not None:
+                self.storage.write(output_paths[i], CACore.serialize_cert(user_cert))
+            user_certs.append(user_cert)
+        return user_certs
+
+    def issue_crl(self, revoked_serials, crl_number, delta_of=None):
+        """
+        CRL signed by the current issuing key.
+        """
+        ca_key, ca_cert = self.load_ca()
+        return CACore.create_crl(ca_cert, ca_key, revoked_serials, crl_number, delta_of=delta_of)
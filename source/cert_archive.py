@@ -0,0 +1,128 @@
+import os
+import mmap
+import struct
+
+# Cert storage layout, see SimulationConfig.cert_format:
+# "pem"         -> one PEM file per cert through the storage backend (legacy)
+# "der_archive" -> one packed DER archive per node, always on the filesystem
+CERT_FORMATS = ("pem", "der_archive")
+
+# Index record: cert id, offset into the data file, DER length
+INDEX_RECORD = struct.Struct("<QQI")
+
+class CertArchive:
+    """
+    Append-only packed cert archive. DER certs are stored back to back in
+    <path>.der and every append adds one fixed-width record to <path>.idx.
+    Both files are read through mmap, so lookups return memoryviews into
+    the mapping instead of copies. A cert id appended again (e.g. after a
+    rotation) resolves to its newest record.
+
+    on_write(path, **counts), if given, is told about every file append
+    (see io_accounting.AccountingStorage.record).
+    """
+    def __init__(self, path, on_write=None):
+        self.path = path
+        self.on_write = on_write
+        self.data_path = path + ".der"
+        self.index_path = path + ".idx"
+        parent = os.path.dirname(path)
+        if parent and not os.path.exists(parent):
+            os.makedirs(parent, exist_ok=True)
+
+        self._data = open(self.data_path, "ab")
+        self._index = open(self.index_path, "ab")
+        self._map = None
+        self._mapped = 0
+        # cert id -> (offset, length) of its newest record
+        self._latest = {}
+        self.records = 0
+        self.size = self._data.tell()
+        self._load_index()
+
+    def _load_index(self):
+        if os.path.getsize(self.index_path) == 0:
+            return
+        with open(self.index_path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as index:
+                for cert_id, offset, length in INDEX_RECORD.iter_unpack(index):
+                    self._latest[cert_id] = (offset, length)
+                    self.records += 1
+
+    def append(self, cert_id, der):
+        self.append_many([(cert_id, der)])
+
+    def append_many(self, items):
+        """
+        Appends (cert id, DER bytes) pairs with one write per file.
+        """
+        chunks = []
+        records = []
+        offset = self.size
+        for cert_id, der in items:
+            chunks.append(der)
+            records.append(INDEX_RECORD.pack(cert_id, offset, len(der)))
+            self._latest[cert_id] = (offset, len(der))
+            offset += len(der)
+        data = b"".join(chunks)
+        index = b"".join(records)
+        self._data.write(data)
+        self._index.write(index)
+        if self.on_write is not None:
+            created = int(self.records == 0)
+            self.on_write(self.data_path, bytes_written=len(data), files_written=1, files_created=created,
+                          cert_replicas=len(records))
+            self.on_write(self.index_path, bytes_written=len(index), files_written=1, files_created=created)
+        self.records += len(records)
+        self.size = offset
+
+    def _view(self, offset, length):
+        if offset + length > self._mapped:
+            # The data file grew since it was mapped
+            self._data.flush()
+            self._index.flush()
+            self._release()
+            with open(self.data_path, "rb") as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._mapped = len(self._map)
+        return memoryview(self._map)[offset:offset + length]
+
+    def get(self, cert_id):
+        """
+        Newest DER of cert_id as a memoryview into the archive.
+        """
+        offset, length = self._latest[cert_id]
+        return self._view(offset, length)
+
+    def ids(self):
+        return list(self._latest)
+
+    def scan(self):
+        """
+        Yields (cert id, DER memoryview) for the newest record of every cert.
+        """
+        for cert_id, (offset, length) in self._latest.items():
+            yield cert_id, self._view(offset, length)
+
+    def stats(self):
+        return {
+            "records": self.records,
+            "certs": len(self._latest),
+            "data_bytes": self.size,
+            "index_bytes": self.records * INDEX_RECORD.size,
+        }
+
+    def _release(self):
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                # Views handed out earlier still use it; freed along with them
+                pass
+            self._map = None
+            self._mapped = 0
+
+    def close(self):
+        self._release()
+        self._data.close()
+        self._index.close()
@@ -0,0 +1,118 @@
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from .ca_core import CACore
+
+# "fresh"     -> new subscriber key and CSR for every issuance
+# "reuse_key" -> one key/CSR per subscriber, reused across rotations
+# "corpus"    -> CSRs loaded from an on-disk corpus, built on first use
+REUSE_POLICIES = ("fresh", "reuse_key", "corpus")
+
+def _generate(common_name):
+    user_key = CACore.generate_private_key()
+    return CACore.create_csr(user_key, common_name)
+
+def build_corpus(corpus_dir, names):
+    """
+    Writes one CSR per subscriber name to corpus_dir as <name>.csr.pem.
+    """
+    if not os.path.exists(corpus_dir):
+        os.makedirs(corpus_dir)
+    for name in names:
+        csr = _generate(name)
+        CACore.save_to_file(os.path.join(corpus_dir, f"{name}.csr.pem"), CACore.serialize_csr(csr))
+
+class CSRPool:
+    """
+    Supplies subscriber CSRs to the CAs under test so that issuance measures
+    CA signing only. With workers > 0, fresh CSRs are generated ahead of
+    time by background threads via prefetch().
+    """
+    def __init__(self, policy="fresh", workers=0, corpus_dir=None):
+        if policy not in REUSE_POLICIES:
+            raise ValueError(f"Unknown CSR reuse policy: {policy}")
+        if policy == "corpus" and corpus_dir is None:
+            raise ValueError("The corpus policy needs a corpus_dir")
+        self.policy = policy
+        self.corpus_dir = corpus_dir
+
+        self._executor = ThreadPoolExecutor(max_workers=workers) if workers > 0 else None
+        self._pending = {}
+        self._cache = {}
+        self._lock = threading.Lock()
+
+        self.prefetched = 0
+        self.generated = 0
+        self.loaded = 0
+        self.reused = 0
+
+    def prefetch(self, names):
+        """
+        Queues background generation of one fresh CSR per name.
+        Only meaningful for the fresh policy with workers > 0.
+        """
+        if self._executor is None or self.policy != "fresh":
+            return
+        with self._lock:
+            for name in names:
+                future = self._executor.submit(_generate, name)
+                self._pending.setdefault(name, deque()).append(future)
+
+    def get(self, name):
+        if self.policy == "fresh":
+            with self._lock:
+                queue = self._pending.get(name)
+                future = queue.popleft() if queue else None
+                if future is not None:
+                    self.prefetched += 1
+                else:
+                    self.generated += 1
+            if future is not None:
+                return future.result()
+            return _generate(name)
+
+        # Counters are bumped under the lock, get() may run on many threads
+        with self._lock:
+            csr = self._cache.get(name)
+            if csr is not None:
+                self.reused += 1
+        if csr is not None:
+            return csr
+
+        built = False
+        if self.policy == "corpus":
+            path = os.path.join(self.corpus_dir, f"{name}.csr.pem")
+            if not os.path.exists(path):
+                # Missing entries are added, later runs load them
+                build_corpus(self.corpus_dir, [name])
+                built = True
+            with open(path, 'rb') as f:
+                csr = CACore.load_csr(f.read())
+        else:
+            csr = _generate(name)
+
+        with self._lock:
+            if self.policy == "corpus" and not built:
+                self.loaded += 1
+            else:
+                self.generated += 1
+            self._cache[name] = csr
+        return csr
+
+    def get_many(self, names):
+        return [self.get(name) for name in names]
+
+    def stats(self):
+        return {
+            "policy": self.policy,
+            "prefetched": self.prefetched,
+            "generated": self.generated,
+            "loaded": self.loaded,
+            "reused": self.reused,
+        }
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
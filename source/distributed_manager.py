@@ -1,71 +1,226 @@
 import os
 import json
+import time
+from collections import deque
 from .ca_core import CACore
-from .sss import ShamirSecretSharing
+from .sss import ShamirSecretSharing, CURVE_ORDER
+from .storage import FileSystemStorage
+
+class SigningSession:
+    """
+    Collects the quorum's shares and reconstructs the signing key once, then
+    signs any number of CSRs against it. Use as a context manager so the
+    recovered key is dropped when the session ends.
+
+    shares may be passed in when they were gathered elsewhere (e.g. over the
+    network); collect_time is then added to the session setup time and
+    node_latencies should hold the time each node took to answer.
+    """
+    def __init__(self, manager, node_ids, shares=None, collect_time=0.0, node_latencies=None):
+        self.manager = manager
+        self.node_ids = list(node_ids)
+        self.ca_key = None
+        self.ca_cert = None
+        self.node_latencies = dict(node_latencies or {})
+
+        self.setup_time = 0.0
+        self.batch_latencies = []
+        self.certs_signed = 0
+
+        start = time.perf_counter()
+        if shares is None:
+            collected_shares = manager.collect_shares(self.node_ids, latencies=self.node_latencies)
+        else:
+            collected_shares = shares
+        if len(collected_shares) >= manager.k:
+            recovered_int = ShamirSecretSharing.combine(collected_shares)
+            self.ca_key = CACore.int_to_private_key(recovered_int)
+            self.ca_cert = CACore.load_cert(manager.storage.read(manager.cert_path))
+            del recovered_int
+        self.setup_time = collect_time + time.perf_counter() - start
+
+    @property
+    def ready(self):
+        return self.ca_key is not None
+
+    def sign(self, csr, output_path):
+        return self.sign_batch([csr], [output_path])[0]
+
+    def sign_batch(self, csrs, output_paths=None):
+        """
+        Signs every CSR with the reconstructed key. Without output_paths the
+        certs are only returned, leaving persistence to the caller.
+        Returns the issued certs in input order.
+        """
+        if not self.ready:
+            raise RuntimeError("Signing session has no quorum")
+
+        start = time.perf_counter()
+        user_certs = []
+        for csr in csrs:
+            user_certs.append(CACore.sign_csr(self.ca_cert, self.ca_key, csr))
+        if output_paths is not None:
+            for user_cert, output_path in zip(user_certs, output_paths):
+                self.manager.storage.write(output_path, CACore.serialize_cert(user_cert))
+        self.record_batch(len(user_certs), time.perf_counter() - start)
+        return user_certs
+
+    def record_batch(self, certs, elapsed):
+        """
+        Books a batch signed outside sign_batch (e.g. by an issuance
+        pipeline using ca_key directly).
+        """
+        self.batch_latencies.append(elapsed)
+        self.certs_signed += certs
+
+    def sign_crl(self, revoked_serials, crl_number, delta_of=None):
+        """
+        CRL signed with the reconstructed threshold key.
+        """
+        if not self.ready:
+            raise RuntimeError("Signing session has no quorum")
+        return CACore.create_crl(self.ca_cert, self.ca_key, revoked_serials, crl_number, delta_of=delta_of)
+
+    def stats(self):
+        batch_time = sum(self.batch_latencies)
+        return {
+            "setup_time": self.setup_time,
+            "batches": len(self.batch_latencies),
+            "certs": self.certs_signed,
+            "batch_time": batch_time,
+            "per_batch_latency": batch_time / len(self.batch_latencies) if self.batch_latencies else 0.0,
+            "per_cert_latency": batch_time / self.certs_signed if self.certs_signed else 0.0,
+        }
+
+    def close(self):
+        # Securely delete key from memory
+        self.ca_key = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
 
 class DistributedManager:
-    def __init__(self, storage_dir="distributed_storage", n=5, k=3):
+    def __init__(self, storage_dir="distributed_storage", n=5, k=3, storage=None):
         self.storage_dir = storage_dir
         self.n = n
         self.k = k
         self.cert_path = os.path.join(storage_dir, "distributed_root_cert.pem")
-        
-        if not os.path.exists(storage_dir):
-            os.makedirs(storage_dir)
+        self.storage = storage if storage is not None else FileSystemStorage()
+        # Pre-generated future epochs: (root cert, per-node shares)
+        self._epochs = deque()
+
+        self.storage.makedirs(storage_dir)
+
+    def prepare_epochs(self, count):
+        """
+        Generates the root keys of the next `count` rotations and splits
+        them all in one batched pass. Only the self-signed certs and shares
+        are kept; the keys are dropped right away.
+        """
+        keys = [CACore.generate_private_key() for _ in range(count)]
+        certs = [CACore.create_self_signed_cert(key, common_name="Distributed Threshold CA") for key in keys]
+        matrix = ShamirSecretSharing.split_many([CACore.private_key_to_int(key) for key in keys], self.n, self.k)
+        for j, cert in enumerate(certs):
+            self._epochs.append((cert, matrix.shares_for(j)))
+
+        # Securely delete keys from memory
+        del keys
+        del matrix
+
+    def prepared_epochs(self):
+        return len(self._epochs)
 
     def initialize_ca(self):
+        if self._epochs:
+            cert, shares = self._epochs.popleft()
+            self._install_epoch(cert, shares)
+            return
+
         private_key = CACore.generate_private_key()
         secret_int = CACore.private_key_to_int(private_key)
-        
+
         cert = CACore.create_self_signed_cert(private_key, common_name="Distributed Threshold CA")
-        CACore.save_to_file(self.cert_path, CACore.serialize_cert(cert))
-        
         shares = ShamirSecretSharing.split(secret_int, self.n, self.k)
-        
-        for idx, share_val in shares:
-            node_dir = os.path.join(self.storage_dir, f"node_{idx}")
-            if not os.path.exists(node_dir):
-                os.makedirs(node_dir)
-            
-            share_file = os.path.join(node_dir, "share.json")
-            with open(share_file, 'w') as f:
-                json.dump({"id": idx, "value": share_val}, f)
-            
+        self._install_epoch(cert, shares)
+
         # Securely delete key from memory
         del private_key
         del secret_int
 
+    def _install_epoch(self, cert, shares):
+        self.storage.write(self.cert_path, CACore.serialize_cert(cert))
+        with self.storage.transaction():
+            for idx, share_val in shares:
+                self.write_share(idx, share_val)
+
+    def refresh_shares(self):
+        """
+        Proactive refresh: every node deals a random sharing of zero and each
+        node adds the sub-shares it receives to its own share. The root key
+        and its cert stay the same, but shares taken before the refresh no
+        longer combine with shares taken after it.
+        Returns the number of sub-share messages exchanged between nodes.
+        """
+        shares = self.collect_shares(range(1, self.n + 1))
+        zero_sharings = ShamirSecretSharing.split_many([0] * len(shares), self.n, self.k)
+
+        with self.storage.transaction():
+            for node_id, share_val in shares:
+                delta = sum(zero_sharings.node_row(node_id))
+                self.write_share(node_id, (share_val + delta) % CURVE_ORDER)
+
+        return len(shares) * (len(shares) - 1)
+
+    def share_path(self, node_id):
+        return os.path.join(self.storage_dir, f"node_{node_id}", "share.json")
+
+    def write_share(self, node_id, share_val):
+        payload = json.dumps({"id": node_id, "value": share_val})
+        self.storage.write(self.share_path(node_id), payload.encode())
+
+    def collect_shares(self, node_ids, latencies=None):
+        """
+        Reads the shares held by the given nodes, skipping nodes without one.
+        If latencies is a dict, each node's read time is stored in it.
+        """
+        collected_shares = []
+        for nid in node_ids:
+            start = time.perf_counter()
+            share_path = self.share_path(nid)
+            if not self.storage.exists(share_path):
+                continue
+
+            data = json.loads(self.storage.read(share_path))
+            collected_shares.append((data['id'], data['value']))
+            if latencies is not None:
+                latencies[nid] = time.perf_counter() - start
+        return collected_shares
+
+    def open_session(self, node_ids):
+        """
+        Starts a signing session for the quorum node_ids.
+        Returns None if fewer than k of them hold a share.
+        """
+        if len(node_ids) < self.k:
+            return None
+        session = SigningSession(self, node_ids)
+        if not session.ready:
+            return None
+        return session
+
     def sign_request(self, csr, node_ids, output_path):
         """
         Attempts to sign a CSR using shares from the specified nodes.
         Returns True if successful, False otherwise.
         """
-        if len(node_ids) < self.k:
+        session = self.open_session(node_ids)
+        if session is None:
             return False
 
-        collected_shares = []
-        for nid in node_ids:
-            share_path = os.path.join(self.storage_dir, f"node_{nid}", "share.json")
-            if not os.path.exists(share_path):
-                continue
-                
-            with open(share_path, 'r') as f:
-                data = json.load(f)
-                collected_shares.append((data['id'], data['value']))
-        
-        if len(collected_shares) < self.k:
-             return False
-             
-        recovered_int = ShamirSecretSharing.combine(collected_shares)
-        recovered_key = CACore.int_to_private_key(recovered_int)
-        
-        with open(self.cert_path, 'rb') as f:
-            ca_cert = CACore.load_cert_from_file(self.cert_path)
-            
-        user_cert = CACore.sign_csr(ca_cert, recovered_key, csr)
-        CACore.save_to_file(output_path, CACore.serialize_cert(user_cert))
-        
-        del recovered_int
-        del recovered_key
-        
+        with session:
+            session.sign(csr, output_path)
+
         return True
@@ -0,0 +1,242 @@
+import math
+import heapq
+import random
+from .instrumentation import NullInstrumentation
+from .analytical_model import rekey_interval, cert_renewal_interval, centralized_leakage_block, revocation_delay
+
+# When the centralized nodes rotate, in periods:
+# "lockstep"  -> every node at every integer time (the period model)
+# "staggered" -> node i at every integer + i / M
+# "jittered"  -> every node near every integer, +/- rotation_jitter
+ROTATION_SCHEDULES = ("lockstep", "staggered", "jittered")
+
+class EventScheduler:
+    """
+    Min-heap of (time, seq, kind, args) events. Handlers registered per
+    kind are called in time order; ties run in scheduling order.
+    """
+    def __init__(self):
+        self._heap = []
+        self._seq = 0
+        self.handlers = {}
+        self.now = 0.0
+        self.processed = 0
+
+    def on(self, kind, handler):
+        self.handlers[kind] = handler
+
+    def schedule(self, time, kind, *args):
+        heapq.heappush(self._heap, (time, self._seq, kind, args))
+        self._seq += 1
+
+    def run(self, until):
+        """
+        Processes every event before `until`. Later events stay queued.
+        """
+        while self._heap and self._heap[0][0] < until:
+            time, _, kind, args = heapq.heappop(self._heap)
+            self.now = time
+            self.handlers[kind](*args)
+            self.processed += 1
+        self.now = until
+
+class RotationSchedule:
+    """
+    Key rotation times of the centralized nodes. Rotation k of node i is
+    derived on demand, so idle nodes cost nothing.
+    """
+    def __init__(self, kind, nodes, jitter=0.0, seed=None):
+        if kind not in ROTATION_SCHEDULES:
+            raise ValueError(f"Unknown rotation schedule: {kind}")
+        if kind == "jittered" and not 0.0 <= jitter < 0.5:
+            raise ValueError(f"rotation_jitter must be within [0, 0.5), got {jitter}")
+        self.kind = kind
+        self.nodes = nodes
+        self.jitter = jitter
+        self.seed = seed
+
+    def rotation_time(self, node, k):
+        if self.kind == "staggered":
+            return k + node / self.nodes
+        if self.kind == "jittered":
+            rng = random.Random(f"{self.seed}:{node}:{k}")
+            return k + rng.uniform(-self.jitter, self.jitter)
+        return float(k)
+
+    def next_rotation(self, node, t):
+        """
+        First rotation of node strictly after t.
+        """
+        k = math.floor(t) - 1
+        while self.rotation_time(node, k) <= t:
+            k += 1
+        return self.rotation_time(node, k)
+
+class ExposureTracker:
+    """
+    Union of open exposure intervals of one node (or the distributed root),
+    booked per integer period so per-period leakage stays available.
+    """
+    def __init__(self, weight, per_period):
+        self.weight = weight
+        self.per_period = per_period
+        self.live = 0
+        self.since = 0.0
+
+    def open(self, t):
+        if self.live == 0:
+            self.since = t
+        self.live += 1
+
+    def close(self, t):
+        self.live -= 1
+        if self.live == 0:
+            self.book(self.since, t)
+
+    def flush(self, t):
+        # Exposure still open at the horizon ends there
+        if self.live:
+            self.book(self.since, t)
+            self.live = 0
+
+    def book(self, start, end):
+        while start < end:
+            period = math.floor(start)
+            stop = min(end, period + 1)
+            self.per_period[period] = self.per_period.get(period, 0.0) + (stop - start) * self.weight
+            start = stop
+
+class EventAttackEngine:
+    """
+    Continuous-time attack phase driven by an EventScheduler. Attacks on
+    every node are Poisson arrivals; only keys that actually fall get
+    rotate/expire/repair events, so the run time grows with the number of
+    attacks instead of the number of periods. The distributed CA keeps
+    lockstep share epochs (shares only combine within one epoch).
+    """
+    def __init__(self, config, seed=None, instrument=None):
+        if config.attack_sampling != "plain":
+            raise ValueError(f"Event attack engine does not support attack sampling: {config.attack_sampling}")
+        self.config = config
+        self.rng = random.Random(seed)
+        self.instrument = instrument if instrument is not None else NullInstrumentation()
+        self.schedule = RotationSchedule(config.rotation_schedule, config.M,
+                                         jitter=config.rotation_jitter, seed=seed)
+
+    def run(self, periods):
+        config = self.config
+        self.poisson_lambda = config.p * config.T
+        self.window = cert_renewal_interval(config)
+        self.interval = rekey_interval(config)
+        self.delay = revocation_delay(config)
+
+        self.c_leak = {}
+        self.d_leak = {}
+        self.c_nodes = [ExposureTracker(config.certs_per_node, self.c_leak) for _ in range(config.M)]
+        self.c_fallen = [False] * config.M
+        self.d_root = ExposureTracker(config.total_certs, self.d_leak)
+        self.d_epoch = None
+        self.d_fallen_nodes = set()
+        self.c_compromised_nodes = 0
+        self.d_compromised_periods = 0
+
+        self.events = EventScheduler()
+        self.events.on("c_attack", self._c_attack)
+        self.events.on("c_rotate", self._c_rotate)
+        # A fallen key stops exposing certs when it expires or is revoked
+        for kind in ("c_expire", "c_repair"):
+            self.events.on(kind, lambda node: self.c_nodes[node].close(self.events.now))
+        self.events.on("d_attack", self._d_attack)
+        for kind in ("d_expire", "d_repair"):
+            self.events.on(kind, lambda: self.d_root.close(self.events.now))
+
+        if self.poisson_lambda > 0:
+            for node in range(config.M):
+                self.events.schedule(self.rng.expovariate(self.poisson_lambda), "c_attack", node)
+                self.events.schedule(self.rng.expovariate(self.poisson_lambda), "d_attack", node)
+
+        self.instrument.next_period()
+        with self.instrument.stage("events"):
+            self.events.run(periods)
+            for tracker in self.c_nodes + [self.d_root]:
+                tracker.flush(periods)
+
+        c_values = list(self.c_leak.values())
+        d_values = list(self.d_leak.values())
+        # Epochs are independent, periods inside one are not; centralized
+        # leakage is correlated across a renewal window
+        c_block = centralized_leakage_block(config)
+        c_blocks = self._block_sums(self.c_leak, c_block)
+        d_epochs = self._block_sums(self.d_leak, self.interval)
+        return {
+            "periods": periods,
+            "c_leakage": math.fsum(c_values),
+            "d_leakage": math.fsum(d_values),
+            "c_leakage_sq": math.fsum(v * v for v in c_blocks),
+            "d_leakage_sq": math.fsum(v * v for v in d_epochs),
+            "c_leakage_block": c_block,
+            "d_leakage_block": self.interval,
+            "c_compromised_nodes": self.c_compromised_nodes,
+            "d_compromised_periods": self.d_compromised_periods,
+            "events": self.events.processed,
+        }
+
+    @staticmethod
+    def _block_sums(per_period, block):
+        sums = {}
+        for period, value in per_period.items():
+            sums[period // block] = sums.get(period // block, 0.0) + value
+        return sums.values()
+
+    def _close_event(self, t, expiry):
+        """
+        (time, kind) of the event ending an exposure that began at t.
+        """
+        if self.delay is not None and t + self.delay < expiry:
+            return t + self.delay, "repair"
+        return expiry, "expire"
+
+    def _c_attack(self, node):
+        t = self.events.now
+        self.events.schedule(t + self.rng.expovariate(self.poisson_lambda), "c_attack", node)
+        if self.c_fallen[node]:
+            return
+        self.c_fallen[node] = True
+        self.c_compromised_nodes += 1
+
+        # The fallen key retires at the next rotation but stays trusted
+        # until window - 1 rotations later (or until it is revoked)
+        retire = self.schedule.next_rotation(node, t)
+        expiry = retire
+        for _ in range(self.window - 1):
+            expiry = self.schedule.next_rotation(node, expiry)
+        close_at, kind = self._close_event(t, expiry)
+
+        self.c_nodes[node].open(t)
+        self.events.schedule(retire, "c_rotate", node)
+        self.events.schedule(close_at, "c_" + kind, node)
+
+    def _c_rotate(self, node):
+        self.c_fallen[node] = False
+
+    def _d_attack(self, node):
+        t = self.events.now
+        self.events.schedule(t + self.rng.expovariate(self.poisson_lambda), "d_attack", node)
+
+        # Shares are re-randomized every period, older shares are useless
+        epoch = math.floor(t)
+        if epoch != self.d_epoch:
+            self.d_epoch = epoch
+            self.d_fallen_nodes = set()
+        if node in self.d_fallen_nodes:
+            return
+        self.d_fallen_nodes.add(node)
+        if len(self.d_fallen_nodes) != self.config.K:
+            return
+        self.d_compromised_periods += 1
+
+        # Recovered root stays exposed until the next rekey (or revocation)
+        rekey = (epoch // self.interval + 1) * self.interval
+        close_at, kind = self._close_event(t, rekey)
+        self.d_root.open(t)
+        self.events.schedule(close_at, "d_" + kind)
@@ -0,0 +1,235 @@
+import os
+import csv
+import copy
+import json
+import inspect
+import itertools
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import numpy as np
+from .simulation_engine import SimulationConfig, run_experiment, make_run_id
+from .parallel import aggregate_replicas, task_seed
+from .result_cache import content_seed
+from .storage import FileSystemStorage
+
+# Result stream layouts:
+# "jsonl" -> one full result dict per line
+# "csv"   -> one row per point, scalar columns only (nested stats dropped)
+GRID_FORMATS = ("jsonl", "csv")
+
+# Scalar result columns written after the grid parameters in CSV streams
+CSV_COLUMNS = ("mode", "seed", "replicas", "C_Risk", "C_Total", "D_Risk", "D_Total",
+               "C_Risk_SE", "D_Risk_SE", "D_IS_ESS")
+
+# Pool jobs kept in flight per worker, bounds memory for huge grids
+JOBS_PER_WORKER = 2
+
+def config_parameters():
+    """
+    Names a grid may set: SimulationConfig keyword arguments plus base_dir.
+    """
+    return [name for name in inspect.signature(SimulationConfig).parameters] + ["base_dir"]
+
+class GridSpec:
+    """
+    Cartesian product of parameter axes over a base SimulationConfig.
+    Points are enumerated lazily in a fixed order, so a point's index (and
+    therefore its seed) never depends on how far an earlier run got.
+    """
+    def __init__(self, axes, base=None, replicas=1, seed=None):
+        known = config_parameters()
+        for name in list(axes) + list(base or {}):
+            if name not in known:
+                raise ValueError(f"Unknown grid parameter: {name}")
+        self.axes = {name: list(values) for name, values in axes.items()}
+        self.base = dict(base or {})
+        self.replicas = max(1, replicas)
+        # Without a seed a fresh one is drawn, resumed points then use new seeds
+        self.seed = seed if seed is not None else int(np.random.SeedSequence().entropy % 2 ** 63)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Reads a JSON spec: {"axes": {name: [values]}, "base": {name: value},
+        "replicas": n, "seed": s}.
+        """
+        with open(path) as f:
+            spec = json.load(f)
+        return cls(spec["axes"], base=spec.get("base"), replicas=spec.get("replicas", 1),
+                   seed=spec.get("seed"))
+
+    def size(self):
+        size = 1
+        for values in self.axes.values():
+            size *= len(values)
+        return size
+
+    def points(self):
+        """
+        Yields (index, params) for every grid point.
+        """
+        names = list(self.axes)
+        for index, values in enumerate(itertools.product(*(self.axes[n] for n in names))):
+            yield index, dict(zip(names, values))
+
+    @staticmethod
+    def point_key(params):
+        return json.dumps(params, sort_keys=True)
+
+    def config_for(self, index, params):
+        kwargs = dict(self.base)
+        kwargs.update(params)
+        base_dir = kwargs.pop("base_dir", None)
+        config = SimulationConfig(**kwargs)
+        if base_dir is not None:
+            config.base_dir = base_dir
+        if config.seed is None and config.result_cache is not None:
+            config.seed = content_seed(self.seed, config)
+        elif config.seed is None:
+            config.seed = task_seed(self.seed, index)
+        return config
+
+class ResultStream:
+    """
+    Append-only JSONL/CSV file of finished grid points. Every row is flushed
+    as soon as it is written; only the keys of finished points are kept.
+    """
+    def __init__(self, path, fmt=None, axes=()):
+        fmt = fmt or ("csv" if path.endswith(".csv") else "jsonl")
+        if fmt not in GRID_FORMATS:
+            raise ValueError(f"Unknown grid output format: {fmt}")
+        self.path = path
+        self.fmt = fmt
+        self.columns = ["point", "index"] + list(axes) + [c for c in CSV_COLUMNS if c not in axes]
+        self._file = None
+        self._writer = None
+
+    def completed(self):
+        """
+        Keys of the points already in the file. A partial last line left by
+        an interrupted run is cut off first.
+        """
+        if not os.path.exists(self.path):
+            return set()
+        self._drop_partial_line()
+        keys = set()
+        with open(self.path, newline="") as f:
+            if self.fmt == "csv":
+                for row in csv.DictReader(f):
+                    keys.add(row["point"])
+            else:
+                for line in f:
+                    if line.strip():
+                        keys.add(json.loads(line)["point"])
+        return keys
+
+    def _drop_partial_line(self):
+        with open(self.path, "rb+") as f:
+            size = f.seek(0, os.SEEK_END)
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return
+            # Walk back block by block to the last complete line
+            end = size
+            while end > 0:
+                start = max(0, end - 65536)
+                f.seek(start)
+                newline = f.read(end - start).rfind(b"\n")
+                if newline >= 0:
+                    f.truncate(start + newline + 1)
+                    return
+                end = start
+            f.truncate(0)
+
+    def open(self, truncate=False):
+        new_file = truncate or not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        parent = os.path.dirname(self.path)
+        if parent and not os.path.exists(parent):
+            os.makedirs(parent)
+        self._file = open(self.path, "w" if truncate else "a", newline="")
+        if self.fmt == "csv":
+            self._writer = csv.DictWriter(self._file, fieldnames=self.columns, extrasaction="ignore")
+            if new_file:
+                self._writer.writeheader()
+
+    def write(self, row):
+        if self.fmt == "csv":
+            self._writer.writerow(row)
+        else:
+            self._file.write(json.dumps(row, sort_keys=True, default=str) + "\n")
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+def run_grid_point(config, suffix, replicas=1, keep_runs=False):
+    """
+    Runs one grid point (and its replicas) in the calling process.
+    """
+    results = []
+    replica_seeds = [config.seed] if replicas == 1 else [task_seed(config.seed, r) for r in range(replicas)]
+    for r, seed in enumerate(replica_seeds):
+        replica_config = copy.copy(config)
+        replica_config.seed = seed
+        run_suffix = suffix if replicas == 1 else f"{suffix}_r{r}"
+        results.append(run_experiment(replica_config, run_id_suffix=run_suffix))
+        if not keep_runs and config.mode == "crypto":
+            FileSystemStorage().clear(os.path.join(config.base_dir, f"run_{make_run_id(config, run_suffix)}"))
+    res = results[0] if replicas == 1 else aggregate_replicas(results)
+    res["seed"] = config.seed
+    return res
+
+def run_grid(spec, out_path, fmt=None, workers=1, resume=True, keep_runs=False, on_result=None):
+    """
+    Runs every grid point not yet in out_path and appends each result as it
+    finishes (in completion order when workers > 1). on_result(row) is
+    called after each write. Returns the number of points run.
+    """
+    stream = ResultStream(out_path, fmt, axes=list(spec.axes))
+    done = stream.completed() if resume else set()
+    stream.open(truncate=not resume)
+
+    def pending():
+        for index, params in spec.points():
+            key = GridSpec.point_key(params)
+            if key not in done:
+                yield index, params, key
+
+    def emit(index, params, key, res):
+        row = dict(res)
+        row.update(params)
+        row["point"] = key
+        row["index"] = index
+        stream.write(row)
+        if on_result is not None:
+            on_result(row)
+
+    count = 0
+    try:
+        if workers <= 1:
+            for index, params, key in pending():
+                config = spec.config_for(index, params)
+                emit(index, params, key, run_grid_point(config, f"g{index}", spec.replicas, keep_runs))
+                count += 1
+            return count
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            in_flight = {}
+            points = pending()
+            while True:
+                for index, params, key in itertools.islice(points, workers * JOBS_PER_WORKER - len(in_flight)):
+                    config = spec.config_for(index, params)
+                    future = pool.submit(run_grid_point, config, f"g{index}", spec.replicas, keep_runs)
+                    in_flight[future] = (index, params, key)
+                if not in_flight:
+                    return count
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    index, params, key = in_flight.pop(future)
+                    emit(index, params, key, future.result())
+                    count += 1
+    finally:
+        stream.close()
@@ -0,0 +1,118 @@
+import os
+import time
+import math
+import cProfile
+from contextlib import contextmanager, nullcontext
+from .async_cluster import percentiles
+
+def log2_histogram(values):
+    """
+    Counts per power-of-two bucket of seconds, labelled by the bucket's
+    upper bound in microseconds.
+    """
+    hist = {}
+    for v in values:
+        us = max(v * 1e6, 1.0)
+        upper = 2 ** math.ceil(math.log2(us))
+        label = f"<={upper}us"
+        hist[label] = hist.get(label, 0) + 1
+    return dict(sorted(hist.items(), key=lambda kv: int(kv[0][2:-2])))
+
+class Instrumentation:
+    """
+    Wall/CPU timers around the stages of one architecture's update loop or
+    the attack phase. Hooks are called as hook(scope, stage, period, wall,
+    cpu) after every timed stage. CPU time is process-wide, so it includes
+    background threads (e.g. CSR prefetch).
+    """
+    def __init__(self, scope, hooks=None):
+        self.scope = scope
+        self.hooks = list(hooks or [])
+        self.period = 0
+        self.samples = {}
+        self.per_period = {}
+
+    def add_hook(self, hook):
+        self.hooks.append(hook)
+
+    def next_period(self):
+        self.period += 1
+
+    @contextmanager
+    def stage(self, name):
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            self.record(name, wall, cpu)
+
+    def record(self, name, wall, cpu):
+        self.samples.setdefault(name, []).append((wall, cpu))
+        periods = self.per_period.setdefault(name, {})
+        periods[self.period] = periods.get(self.period, 0.0) + wall
+        for hook in self.hooks:
+            hook(self.scope, name, self.period, wall, cpu)
+
+    def summary(self):
+        res = {}
+        for name, samples in self.samples.items():
+            walls = [s[0] for s in samples]
+            cpus = [s[1] for s in samples]
+            res[name] = {
+                "count": len(samples),
+                "wall_total": sum(walls),
+                "cpu_total": sum(cpus),
+                "wall": percentiles(walls),
+                "cpu": percentiles(cpus),
+                "wall_hist": log2_histogram(walls),
+                "per_period_wall": [self.per_period[name][p] for p in sorted(self.per_period[name])],
+            }
+        return res
+
+class NullInstrumentation:
+    """
+    Default no-op surface so untimed runs pay nothing.
+    """
+    scope = None
+
+    def add_hook(self, hook):
+        pass
+
+    def next_period(self):
+        pass
+
+    def stage(self, name):
+        return nullcontext()
+
+    def record(self, name, wall, cpu):
+        pass
+
+    def summary(self):
+        return {}
+
+def make_instrumentation(config, scope):
+    if config.instrument:
+        return Instrumentation(scope, hooks=config.instrument_hooks)
+    return NullInstrumentation()
+
+@contextmanager
+def profiled(path):
+    """
+    Runs the block under cProfile and dumps pstats to path (None: disabled).
+    """
+    if path is None:
+        yield
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        parent = os.path.dirname(path)
+        if parent and not os.path.exists(parent):
+            os.makedirs(parent)
+        profiler.dump_stats(path)
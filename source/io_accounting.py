@@ -0,0 +1,160 @@
+import os
+import re
+import threading
+from contextlib import contextmanager
+from .storage import Storage
+
+# Counters kept per node, per file kind and per period
+# (cert_replicas: user certs physically placed on a node, by write or link)
+IO_COUNTERS = ("bytes_written", "bytes_read", "files_written", "files_created", "files_deleted",
+               "links", "syncs", "node_messages", "cert_replicas")
+
+NODE_DIR = re.compile(r"^node_(\d+)$")
+
+# Pseudo key that backend commits (transaction ends, close) are booked under
+COMMIT_KEY = "commit"
+
+def node_label(key):
+    """
+    "node_<id>" of the node directory key lives in, or "shared" (CA files
+    of the distributed system, blobs, run-level files).
+    """
+    for part in reversed(os.path.normpath(key).split(os.sep)):
+        if NODE_DIR.match(part):
+            return part
+    return "shared"
+
+def file_kind(key):
+    name = os.path.basename(key)
+    if name.startswith("user_"):
+        return "cert"
+    if name.startswith("share"):
+        return "share"
+    if "crl" in name:
+        return "crl"
+    if name.startswith("manifest"):
+        return "manifest"
+    if name.endswith((".der", ".idx")):
+        return "archive"
+    if os.sep + "blobs" + os.sep in key:
+        return "blob"
+    if key == COMMIT_KEY:
+        return "commit"
+    return "ca"
+
+class AccountingStorage(Storage):
+    """
+    Wraps a storage backend and counts what actually reaches it: bytes and
+    files written, created and deleted, links, durable syncs (the backend's
+    fsyncs or commits) and messages delivered to node directories. Every
+    operation is booked against the key's node, its file kind and the
+    current period.
+    """
+    def __init__(self, inner):
+        self.inner = inner
+        self.period = 0
+        self.per_node = {}
+        self.per_kind = {}
+        self.per_period = {}
+        self._syncs = inner.syncs
+        self._lock = threading.Lock()
+
+    @property
+    def supports_links(self):
+        return self.inner.supports_links
+
+    def begin_period(self, period):
+        self.period = period
+
+    def record(self, key, **counts):
+        """
+        Books counts (IO_COUNTERS names) for key. Writes that bypass the
+        storage backend (e.g. cert archives) report themselves here.
+        """
+        label = node_label(key)
+        kind = file_kind(key)
+        placed = counts.get("files_written", 0) + counts.get("links", 0)
+        if label != "shared" and placed:
+            counts["node_messages"] = counts.get("node_messages", 0) + 1
+        if kind == "cert":
+            counts["cert_replicas"] = counts.get("cert_replicas", 0) + placed
+        with self._lock:
+            syncs = self.inner.syncs - self._syncs
+            self._syncs = self.inner.syncs
+            if syncs:
+                counts["syncs"] = counts.get("syncs", 0) + syncs
+            if not any(counts.values()):
+                return
+            for table, slot in ((self.per_node, label), (self.per_kind, kind),
+                                (self.per_period, self.period)):
+                row = table.get(slot)
+                if row is None:
+                    row = table[slot] = dict.fromkeys(IO_COUNTERS, 0)
+                for name, value in counts.items():
+                    row[name] += value
+
+    def write(self, key, data):
+        created = not self.inner.exists(key)
+        self.inner.write(key, data)
+        self.record(key, bytes_written=len(data), files_written=1, files_created=int(created))
+
+    def read(self, key):
+        data = self.inner.read(key)
+        self.record(key, bytes_read=len(data))
+        return data
+
+    def exists(self, key):
+        return self.inner.exists(key)
+
+    def delete(self, key):
+        if self.inner.exists(key):
+            self.inner.delete(key)
+            self.record(key, files_deleted=1)
+
+    def list(self, prefix):
+        return self.inner.list(prefix)
+
+    def clear(self, prefix):
+        for key in list(self.inner.list(prefix)):
+            self.record(key, files_deleted=1)
+        self.inner.clear(prefix)
+
+    def makedirs(self, path):
+        self.inner.makedirs(path)
+
+    def link(self, src, dst):
+        created = not self.inner.exists(dst)
+        linked = self.inner.link(src, dst)
+        if linked:
+            self.record(dst, links=1, files_created=int(created))
+        else:
+            size = len(self.inner.read(dst))
+            self.record(dst, bytes_written=size, files_written=1, files_created=int(created))
+        return linked
+
+    @contextmanager
+    def transaction(self):
+        with self.inner.transaction():
+            yield self
+        # Commits of batched backends happen here, not inside one write
+        self.record(COMMIT_KEY)
+
+    def close(self):
+        self.inner.close()
+        self.record(COMMIT_KEY)
+
+    def stats(self):
+        total = dict.fromkeys(IO_COUNTERS, 0)
+        for row in self.per_period.values():
+            for name, value in row.items():
+                total[name] += value
+        return {
+            "total": total,
+            "per_node": dict(sorted(self.per_node.items())),
+            "per_kind": dict(sorted(self.per_kind.items())),
+            # Period 0 is system setup, before the first update
+            "per_period": [dict(period=p, **self.per_period[p]) for p in sorted(self.per_period)],
+        }
+
+def wrap_storage(storage, enabled):
+    return AccountingStorage(storage) if enabled else storage
@@ -0,0 +1,169 @@
+import time
+import queue
+import threading
+
+# End of stream, passed down every stage queue
+_DONE = object()
+
+# Seconds a blocked queue operation waits before rechecking for failures
+_POLL = 0.1
+
+class PipelineStage:
+    def __init__(self, name, workers):
+        self.name = name
+        self.workers = max(1, workers)
+        self.busy = 0.0
+        self.blocked = 0.0
+        self.items = 0
+        self.max_depth = 0
+        self._lock = threading.Lock()
+
+    def book(self, busy, blocked, depth):
+        with self._lock:
+            self.busy += busy
+            self.blocked += blocked
+            self.items += 1
+            self.max_depth = max(self.max_depth, depth)
+
+    def stats(self):
+        return {
+            "workers": self.workers,
+            "items": self.items,
+            "busy": self.busy,
+            "blocked": self.blocked,
+            "max_queue_depth": self.max_depth,
+        }
+
+class IssuancePipeline:
+    """
+    Bulk issuance as three stages joined by bounded queues:
+    supply(cert_id, name) -> CSR and sign(cert_id, csr) -> cert on worker
+    threads, then persist(cert_id, cert) on the calling thread (so storage
+    transactions and replication state stay single-threaded). A full queue
+    blocks the stage feeding it, so at most queue_size items wait between
+    two stages whatever the population size. The threads only overlap
+    work on a multi-core host where key generation and signing dominate;
+    on one core they add switching and queue overhead, so the simulation
+    issues serially unless issuance_workers > 0.
+    """
+    def __init__(self, supply_workers=1, sign_workers=1, queue_size=256):
+        self.stages = [
+            PipelineStage("supply", supply_workers),
+            PipelineStage("sign", sign_workers),
+            PipelineStage("persist", 1),
+        ]
+        self.queue_size = queue_size
+        self.runs = 0
+        self.certs = 0
+        self.elapsed = 0.0
+
+    def run(self, items, supply, sign, persist):
+        """
+        Pushes every (cert id, name) item through the stages and returns
+        once the last cert is persisted. Re-raises the first stage failure.
+        Returns the number of certs issued.
+        """
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        stop = threading.Event()
+        errors = []
+        threads = [threading.Thread(target=self._feed, args=(items, queues[0], stop), daemon=True)]
+        for s, fn in enumerate((supply, sign)):
+            stage = self.stages[s]
+            remaining = [stage.workers]
+            for _ in range(stage.workers):
+                threads.append(threading.Thread(
+                    target=self._work, args=(stage, fn, queues[s], queues[s + 1], remaining, stop, errors),
+                    daemon=True))
+
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        issued = 0
+        try:
+            issued = self._persist(persist, queues[-1], stop)
+        except Exception as e:
+            errors.append(e)
+            stop.set()
+        for t in threads:
+            t.join()
+
+        self.elapsed += time.perf_counter() - start
+        self.runs += 1
+        self.certs += issued
+        if errors:
+            raise errors[0]
+        return issued
+
+    def _feed(self, items, outbox, stop):
+        for item in items:
+            if not self._put(outbox, item, stop):
+                return
+        self._put(outbox, _DONE, stop)
+
+    def _work(self, stage, fn, inbox, outbox, remaining, stop, errors):
+        while True:
+            item = self._get(inbox, stop)
+            if item is None:
+                return
+            if item is _DONE:
+                # Siblings still need to see it; the last one passes it on
+                inbox.put(_DONE)
+                with stage._lock:
+                    remaining[0] -= 1
+                    last = remaining[0] == 0
+                if last:
+                    self._put(outbox, _DONE, stop)
+                return
+            cert_id, value = item
+            busy_start = time.perf_counter()
+            try:
+                result = fn(cert_id, value)
+            except Exception as e:
+                errors.append(e)
+                stop.set()
+                return
+            blocked_start = time.perf_counter()
+            if not self._put(outbox, (cert_id, result), stop):
+                return
+            stage.book(blocked_start - busy_start, time.perf_counter() - blocked_start, inbox.qsize())
+
+    def _persist(self, persist, inbox, stop):
+        stage = self.stages[-1]
+        issued = 0
+        while True:
+            item = self._get(inbox, stop)
+            if item is None or item is _DONE:
+                return issued
+            busy_start = time.perf_counter()
+            persist(*item)
+            stage.book(time.perf_counter() - busy_start, 0.0, inbox.qsize())
+            issued += 1
+
+    @staticmethod
+    def _put(q, item, stop):
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=_POLL)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    @staticmethod
+    def _get(q, stop):
+        while not stop.is_set():
+            try:
+                return q.get(timeout=_POLL)
+            except queue.Empty:
+                pass
+        return None
+
+    def stats(self):
+        return {
+            "runs": self.runs,
+            "certs": self.certs,
+            "elapsed": self.elapsed,
+            "certs_per_sec": self.certs / self.elapsed if self.elapsed else 0.0,
+            "queue_size": self.queue_size,
+            "stages": {stage.name: stage.stats() for stage in self.stages},
+        }
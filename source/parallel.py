@@ -0,0 +1,158 @@
+import os
+import copy
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from .simulation_engine import (
+    ARCHITECTURES, make_run_id, run_experiment, run_update_phase,
+    run_attack_phase, summarize_experiment, result_cache_slot,
+)
+from .attack_engine import confidence_interval
+from .result_cache import content_seed
+
+# Metrics averaged across replicas of the same sweep point
+REPLICA_METRICS = ("C_Risk", "C_Total", "D_Risk", "D_Total")
+
+def spawn_seeds(base_seed, count):
+    """
+    Independent, reproducible integer seeds for count tasks. The seed of a
+    task depends only on base_seed and its index, never on the worker that
+    happens to run it.
+    """
+    children = np.random.SeedSequence(base_seed).spawn(count)
+    return [int(child.generate_state(1, dtype=np.uint64)[0]) for child in children]
+
+def task_seed(base_seed, index):
+    """
+    Seed of task `index`, equal to spawn_seeds(base_seed, n)[index] for any
+    n > index, without spawning the seeds before it.
+    """
+    child = np.random.SeedSequence(base_seed, spawn_key=(index,))
+    return int(child.generate_state(1, dtype=np.uint64)[0])
+
+def _run_point(config, run_id_suffix):
+    return run_experiment(config, run_id_suffix=run_id_suffix)
+
+def _run_update(config, run_id, arch):
+    return run_update_phase(config, run_id, architectures=(arch,))
+
+def aggregate_replicas(replica_results):
+    """
+    Mean of each metric across replicas, with the replica standard error.
+    The risk SE becomes the SE of that mean, sqrt(sum se^2) / n, and the
+    CI is rebuilt from it; the ESS of the pooled samples is the sum.
+    """
+    res = dict(replica_results[0])
+    n = len(replica_results)
+    res["replicas"] = n
+    for metric in REPLICA_METRICS:
+        vals = [r[metric] for r in replica_results]
+        mean = sum(vals) / n
+        res[metric] = mean
+        if n > 1:
+            var = sum((v - mean) ** 2 for v in vals) / (n - 1)
+            res[metric + "_Replica_SE"] = (var / n) ** 0.5
+        if metric + "_SE" in res:
+            res[metric + "_SE"] = sum(r[metric + "_SE"] ** 2 for r in replica_results) ** 0.5 / n
+            res[metric + "_CI"] = confidence_interval(mean, res[metric + "_SE"])
+    if "D_IS_ESS" in res:
+        res["D_IS_ESS"] = sum(r["D_IS_ESS"] for r in replica_results)
+    return res
+
+class ParallelSweepExecutor:
+    """
+    Spreads sweep points (and optionally replicas and the two architectures)
+    across a process pool. Each task gets its own run directory and seed;
+    results come back in sweep order.
+    """
+    def __init__(self, workers=None, base_seed=None, replicas=1, split_architectures=False):
+        self.workers = workers or os.cpu_count()
+        self.base_seed = base_seed
+        self.replicas = max(1, replicas)
+        self.split_architectures = split_architectures
+
+    def _tasks(self, configs, suffixes):
+        """
+        Expands sweep points into (point index, config, suffix) replica tasks.
+        """
+        seeds = spawn_seeds(self.base_seed, len(configs) * self.replicas)
+        tasks = []
+        for i, (config, suffix) in enumerate(zip(configs, suffixes)):
+            for r in range(self.replicas):
+                task_config = copy.copy(config)
+                if config.seed is None and config.result_cache is not None and self.base_seed is not None:
+                    # Position-independent seed, overlapping sweeps share cache entries
+                    task_config.seed = content_seed(self.base_seed, config, r)
+                elif config.seed is None:
+                    task_config.seed = seeds[i * self.replicas + r]
+                elif self.replicas > 1:
+                    task_config.seed = spawn_seeds(config.seed, self.replicas)[r]
+                task_suffix = suffix if self.replicas == 1 else f"{suffix}_r{r}"
+                tasks.append((i, task_config, task_suffix))
+        return tasks
+
+    def run(self, configs, suffixes=None):
+        if suffixes is None:
+            suffixes = [str(i) for i in range(len(configs))]
+        tasks = self._tasks(configs, suffixes)
+
+        if self.workers <= 1:
+            results = [_run_point(config, suffix) for _, config, suffix in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                if self.split_architectures:
+                    results = self._run_split(pool, tasks)
+                else:
+                    futures = [pool.submit(_run_point, config, suffix) for _, config, suffix in tasks]
+                    results = [f.result() for f in futures]
+
+        grouped = [[] for _ in configs]
+        for (i, _, _), res in zip(tasks, results):
+            grouped[i].append(res)
+        return [group[0] if len(group) == 1 else aggregate_replicas(group) for group in grouped]
+
+    def _run_split(self, pool, tasks):
+        """
+        Submits the centralized and distributed update loops of each task as
+        separate jobs; the cheap attack phase runs in the parent meanwhile.
+        Cached points are answered by the parent without submitting a job.
+        """
+        pending = []
+        for _, config, suffix in tasks:
+            if config.mode != "crypto":
+                pending.append((config, pool.submit(_run_point, config, suffix), None, None))
+                continue
+            cache, key = result_cache_slot(config)
+            cached = cache.get(key) if cache is not None else None
+            if cached is not None:
+                cached["cached"] = True
+                pending.append((config, None, None, cached))
+                continue
+            run_id = make_run_id(config, suffix)
+            futures = {arch: pool.submit(_run_update, config, run_id, arch) for arch in ARCHITECTURES}
+            pending.append((config, None, futures, None))
+
+        results = []
+        for config, whole, futures, cached in pending:
+            if whole is not None:
+                results.append(whole.result())
+                continue
+            if cached is not None:
+                results.append(cached)
+                continue
+            update_ops = {}
+            update_stats = {}
+            for arch, f in futures.items():
+                ops, stats = f.result()
+                update_ops.update(ops)
+                update_stats.update(stats)
+            res = summarize_experiment(config, update_ops, run_attack_phase(config), update_stats)
+            cache, key = result_cache_slot(config)
+            if cache is not None:
+                cache.put(key, res)
+            results.append(res)
+        return results
+
+def run_sweep(configs, suffixes=None, workers=None, base_seed=None, replicas=1, split_architectures=False):
+    executor = ParallelSweepExecutor(workers=workers, base_seed=base_seed, replicas=replicas,
+                                     split_architectures=split_architectures)
+    return executor.run(configs, suffixes)
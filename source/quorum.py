@@ -0,0 +1,131 @@
+import random
+import statistics
+from .async_cluster import percentiles
+
+# Which K nodes sign for the distributed CA:
+# "fixed"        -> always nodes 1..K (legacy)
+# "round_robin"  -> a cursor walks the eligible nodes, K at a time
+# "least_loaded" -> the K eligible nodes that served the fewest sessions
+# "random"       -> K eligible nodes drawn uniformly
+# Every policy but "fixed" skips nodes known to be compromised or slow.
+QUORUM_POLICIES = ("fixed", "round_robin", "least_loaded", "random")
+
+# Share answers a node needs before it can be judged slow
+SLOW_MIN_SAMPLES = 3
+
+class QuorumScheduler:
+    """
+    Picks signing quorums among the share-holding nodes and keeps per-node
+    load and share latency counters. A node is slow when its median share
+    latency exceeds slow_factor times the median over all nodes; only nodes
+    with at least SLOW_MIN_SAMPLES answers are judged. Skipped nodes are
+    counted once per node and period, however many quorums are picked.
+    """
+    def __init__(self, node_ids, k, policy="fixed", slow_factor=3.0, seed=None):
+        if policy not in QUORUM_POLICIES:
+            raise ValueError(f"Unknown quorum policy: {policy}")
+        self.node_ids = list(node_ids)
+        self.k = k
+        self.policy = policy
+        self.slow_factor = slow_factor
+        self.rng = random.Random(seed)
+        self.cursor = 0
+        self.compromised = set()
+        # Nodes already counted as skipped this period, per reason
+        self.period_skips = {"compromised": set(), "slow": set()}
+
+        self.sessions = 0
+        self.node_sessions = {nid: 0 for nid in self.node_ids}
+        self.node_certs = {nid: 0 for nid in self.node_ids}
+        self.node_latencies = {nid: [] for nid in self.node_ids}
+        self.skipped_compromised = 0
+        self.skipped_slow = 0
+
+    def set_compromised(self, node_ids):
+        """
+        Nodes to keep out of quorums until the next call, which also
+        starts a new period for the skip counters.
+        """
+        self.compromised = set(node_ids)
+        self.period_skips = {"compromised": set(), "slow": set()}
+
+    def slow_nodes(self):
+        medians = {nid: statistics.median(lat) for nid, lat in self.node_latencies.items()
+                   if len(lat) >= SLOW_MIN_SAMPLES}
+        if len(medians) < 3:
+            return set()
+        threshold = self.slow_factor * statistics.median(medians.values())
+        return {nid for nid, median in medians.items() if median > threshold}
+
+    def eligible(self):
+        """
+        Nodes the policy may pick from, in id order. Exclusions are dropped
+        (slow first, then compromised) when they would leave fewer than K.
+        """
+        if self.policy == "fixed":
+            return list(self.node_ids)
+        slow = self.slow_nodes()
+        healthy = [nid for nid in self.node_ids if nid not in self.compromised and nid not in slow]
+        if len(healthy) >= self.k:
+            self.skipped_compromised += self._skip("compromised", self.compromised)
+            self.skipped_slow += self._skip("slow", slow - self.compromised)
+            return healthy
+        uncompromised = [nid for nid in self.node_ids if nid not in self.compromised]
+        if len(uncompromised) >= self.k:
+            self.skipped_compromised += self._skip("compromised", self.compromised)
+            return uncompromised
+        return list(self.node_ids)
+
+    def _skip(self, reason, node_ids):
+        """
+        Marks node_ids skipped for reason this period; returns how many
+        were not marked yet.
+        """
+        new = set(node_ids) - self.period_skips[reason]
+        self.period_skips[reason] |= new
+        return len(new)
+
+    def select(self, count=1):
+        """
+        Up to `count` disjoint quorums of K nodes (at least one).
+        """
+        nodes = self.eligible()
+        count = max(1, min(count, len(nodes) // self.k))
+        size = count * self.k
+        if self.policy == "fixed":
+            chosen = nodes[:size]
+        elif self.policy == "round_robin":
+            start = self.cursor % len(nodes)
+            chosen = (nodes[start:] + nodes[:start])[:size]
+            self.cursor = start + size
+        elif self.policy == "least_loaded":
+            chosen = sorted(nodes, key=lambda nid: (self.node_sessions[nid], nid))[:size]
+        else:
+            chosen = self.rng.sample(nodes, size)
+        return [sorted(chosen[i * self.k:(i + 1) * self.k]) for i in range(count)]
+
+    def record(self, session):
+        """
+        Books a finished SigningSession against its quorum.
+        """
+        self.sessions += 1
+        for nid in session.node_ids:
+            if nid not in self.node_sessions:
+                continue
+            self.node_sessions[nid] += 1
+            self.node_certs[nid] += session.certs_signed
+        for nid, latency in session.node_latencies.items():
+            if nid in self.node_latencies:
+                self.node_latencies[nid].append(latency)
+
+    def stats(self):
+        return {
+            "policy": self.policy,
+            "sessions": self.sessions,
+            "node_sessions": dict(self.node_sessions),
+            "node_certs": dict(self.node_certs),
+            "node_share_latency": {nid: percentiles(lat) for nid, lat in self.node_latencies.items()},
+            "skipped_compromised": self.skipped_compromised,
+            "skipped_slow": self.skipped_slow,
+            "slow_nodes": sorted(self.slow_nodes()),
+        }
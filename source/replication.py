@@ -0,0 +1,153 @@
+import os
+import json
+import hashlib
+from .storage import FileSystemStorage
+
+# How a cert reaches each node's certs/ directory:
+# "copy"     -> one full file copy per node (legacy layout)
+# "hardlink" -> one blob, hard-linked into every node; plain copies when the
+#               backend cannot link (or a link fails)
+# "manifest" -> one blob, each node keeps a name -> digest manifest
+REPLICATION_MODES = ("copy", "hardlink", "manifest")
+
+class BlobStore:
+    """
+    Content-addressed store: each distinct payload is written once, under
+    the SHA-256 of its bytes.
+    """
+    def __init__(self, root_dir, storage=None):
+        self.root_dir = root_dir
+        self.storage = storage if storage is not None else FileSystemStorage()
+        self.storage.makedirs(root_dir)
+
+    @staticmethod
+    def digest(data):
+        return hashlib.sha256(data).hexdigest()
+
+    def path(self, digest):
+        return os.path.join(self.root_dir, digest[:2], digest)
+
+    def put(self, data):
+        """
+        Stores data if not already present.
+        Returns (digest, True if a new blob was written).
+        """
+        digest = self.digest(data)
+        path = self.path(digest)
+        if self.storage.exists(path):
+            return digest, False
+        self.storage.write(path, data)
+        return digest, True
+
+    def get(self, digest):
+        return self.storage.read(self.path(digest))
+
+    def digests(self):
+        for key in self.storage.list(self.root_dir):
+            yield os.path.basename(key)
+
+    def remove(self, digest):
+        self.storage.delete(self.path(digest))
+
+class ReplicationStore:
+    """
+    Replicates cert payloads to every node of the distributed CA.
+    Logical replicas (what the sync-volume model counts) are tracked
+    separately from the files and bytes physically written.
+    """
+    def __init__(self, storage_dir, node_ids, mode="copy", storage=None):
+        if mode not in REPLICATION_MODES:
+            raise ValueError(f"Unknown replication mode: {mode}")
+        self.storage_dir = storage_dir
+        self.node_ids = list(node_ids)
+        self.mode = mode
+        self.storage = storage if storage is not None else FileSystemStorage()
+        self.blobs = BlobStore(os.path.join(storage_dir, "blobs"), storage=self.storage)
+        self.manifests = {nid: {} for nid in self.node_ids}
+        # A blob plus per-node copies would cost more than copying alone
+        self.copies = mode == "copy" or (mode == "hardlink" and not self.storage.supports_links)
+
+        self.logical_replicas = 0
+        self.logical_bytes = 0
+        self.files_written = 0
+        self.bytes_written = 0
+        self.files_deleted = 0
+        self.links_created = 0
+
+    def node_cert_dir(self, node_id):
+        return os.path.join(self.storage_dir, f"node_{node_id}", "certs")
+
+    def replicate(self, name, data):
+        """
+        Makes data available as `name` on every node.
+        """
+        self.logical_replicas += len(self.node_ids)
+        self.logical_bytes += len(data) * len(self.node_ids)
+
+        if self.copies:
+            for node_id in self.node_ids:
+                self._write(os.path.join(self.node_cert_dir(node_id), name), data)
+            return
+
+        digest, created = self.blobs.put(data)
+        if created:
+            self.files_written += 1
+            self.bytes_written += len(data)
+
+        for node_id in self.node_ids:
+            if self.mode == "manifest":
+                self.manifests[node_id][name] = digest
+                continue
+
+            final_path = os.path.join(self.node_cert_dir(node_id), name)
+            if self.storage.link(self.blobs.path(digest), final_path):
+                self.links_created += 1
+            else:
+                # e.g. a filesystem without hard links; copy from now on
+                self.copies = True
+                self.files_written += 1
+                self.bytes_written += len(data)
+
+    def commit(self):
+        """
+        Ends a replication round: writes node manifests and drops blobs no
+        node references any more.
+        """
+        if self.mode == "copy":
+            return
+        if self.mode == "manifest":
+            for node_id, manifest in self.manifests.items():
+                payload = json.dumps(manifest, sort_keys=True).encode()
+                self._write(os.path.join(self.node_cert_dir(node_id), "manifest.json"), payload)
+
+        # Hard links keep their data alive after the blob is gone
+        live = set()
+        if self.mode == "manifest":
+            for manifest in self.manifests.values():
+                live.update(manifest.values())
+        for digest in list(self.blobs.digests()):
+            if digest not in live:
+                self.blobs.remove(digest)
+                self.files_deleted += 1
+
+    def read(self, node_id, name):
+        if self.mode == "manifest":
+            return self.blobs.get(self.manifests[node_id][name])
+        return self.storage.read(os.path.join(self.node_cert_dir(node_id), name))
+
+    def stats(self):
+        return {
+            "mode": self.mode,
+            "copies": self.copies,
+            "logical_replicas": self.logical_replicas,
+            "logical_bytes": self.logical_bytes,
+            "files_written": self.files_written,
+            "bytes_written": self.bytes_written,
+            "files_deleted": self.files_deleted,
+            "links_created": self.links_created,
+        }
+
+    def _write(self, path, data):
+        self.storage.write(path, data)
+        self.files_written += 1
+        self.bytes_written += len(data)
@@ -0,0 +1,130 @@
+import os
+import glob
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import numpy as np
+
+# Config attributes that do not change what run_experiment returns
+UNKEYED_FIELDS = ("base_dir", "instrument_hooks", "result_cache", "result_cache_bytes")
+
+_code_version = None
+_open_caches = {}
+
+def code_version():
+    """
+    SHA-256 over the simulator sources, so editing any module invalidates
+    every cached result.
+    """
+    global _code_version
+    if _code_version is None:
+        digest = hashlib.sha256()
+        for path in sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), "*.py"))):
+            with open(path, "rb") as f:
+                digest.update(os.path.basename(path).encode() + b"\0" + f.read())
+        _code_version = digest.hexdigest()[:16]
+    return _code_version
+
+def canonical_config(config):
+    fields = {k: v for k, v in vars(config).items() if k not in UNKEYED_FIELDS}
+    return json.dumps(fields, sort_keys=True, default=repr)
+
+def config_key(config):
+    """
+    Cache key of a run: every result-relevant config field (seed and mode
+    included) plus the code version.
+    """
+    payload = code_version() + "\0" + canonical_config(config)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def content_seed(base_seed, config, replica=0):
+    """
+    Seed derived from base_seed and the config's own fields instead of its
+    position in a sweep, so the same point in two sweeps gets the same seed
+    (and the same cache entry).
+    """
+    fields = json.loads(canonical_config(config))
+    fields.pop("seed", None)
+    digest = hashlib.sha256(json.dumps(fields, sort_keys=True).encode()).digest()
+    child = np.random.SeedSequence([base_seed, int.from_bytes(digest[:8], "little"), replica])
+    return int(child.generate_state(1, dtype=np.uint64)[0])
+
+class ResultCache:
+    """
+    SQLite file of run_experiment results keyed by config_key, bounded to
+    max_bytes of JSON by evicting the least recently used entries. Safe to
+    share between the processes of a parallel sweep.
+    """
+    def __init__(self, path, max_bytes=64 * 2 ** 20):
+        parent = os.path.dirname(path)
+        if parent and not os.path.exists(parent):
+            os.makedirs(parent, exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, data TEXT NOT NULL, "
+                           "size INTEGER NOT NULL, used REAL NOT NULL)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS results_used ON results (used)")
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE results SET used = ? WHERE key = ?", (time.time(), key))
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key, result):
+        data = json.dumps(result, sort_keys=True, default=str)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.execute("INSERT OR REPLACE INTO results (key, data, size, used) VALUES (?, ?, ?, ?)",
+                               (key, data, len(data), time.time()))
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+            while total > self.max_bytes:
+                oldest = self._conn.execute("SELECT key, size FROM results WHERE key != ? "
+                                            "ORDER BY used LIMIT 1", (key,)).fetchone()
+                if oldest is None:
+                    break
+                self._conn.execute("DELETE FROM results WHERE key = ?", (oldest[0],))
+                total -= oldest[1]
+                self.evictions += 1
+            self._conn.execute("COMMIT")
+
+    def stats(self):
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        return {
+            "entries": entries,
+            "bytes": size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def close(self):
+        self._conn.close()
+
+def open_result_cache(config):
+    """
+    Process-wide ResultCache for config.result_cache (None: caching off).
+    """
+    if config.result_cache is None:
+        return None
+    # Keyed by pid too: an SQLite connection must not cross a fork
+    slot = (os.getpid(), config.result_cache)
+    cache = _open_caches.get(slot)
+    if cache is None:
+        cache = ResultCache(config.result_cache, config.result_cache_bytes)
+        _open_caches[slot] = cache
+    cache.max_bytes = config.result_cache_bytes
+    return cache
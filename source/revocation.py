@@ -0,0 +1,110 @@
+import os
+import time
+from .ca_core import CACore
+from .storage import FileSystemStorage
+from .async_cluster import percentiles
+from .analytical_model import REVOCATION_MODES
+
+def sample_compromised(rng, poisson_lambda, nodes):
+    """
+    Nodes (0-based) whose first attack lands within the period.
+    """
+    if poisson_lambda <= 0:
+        return []
+    return [n for n in range(nodes) if rng.expovariate(poisson_lambda) <= 1.0]
+
+class CRLPublisher:
+    """
+    Keeps one issuer's revoked serials and publishes its CRL to every node
+    once per period. An entry stays listed for `retention` publications,
+    the lifetime of the cert it revokes.
+    """
+    def __init__(self, name, node_dirs, mode="full", retention=10, full_every=4, storage=None):
+        if mode not in REVOCATION_MODES or mode == "none":
+            raise ValueError(f"Unknown CRL mode: {mode}")
+        self.name = name
+        self.node_dirs = list(node_dirs)
+        self.mode = mode
+        self.retention = retention
+        self.full_every = full_every
+        self.storage = storage if storage is not None else FileSystemStorage()
+
+        # serial -> first publication listing it
+        self.revoked = {}
+        self.publication = 0
+        self.crl_number = 0
+        self.base_publication = 0
+        self.base_number = None
+
+        self.revocations = 0
+        self.crls_full = 0
+        self.crls_delta = 0
+        self.crl_entries = 0
+        self.crl_sizes = []
+        self.generation_time = 0.0
+        self.distribution_bytes = 0
+
+    def revoke(self, serials):
+        for serial in serials:
+            if serial not in self.revoked:
+                self.revoked[serial] = self.publication + 1
+                self.revocations += 1
+
+    def publish(self, sign):
+        """
+        Signs the next CRL with sign(serials, crl_number, delta_of) and writes
+        it to every node. Returns the CRL entries distributed (entries x nodes).
+        """
+        self.publication += 1
+        self.crl_number += 1
+        cutoff = self.publication - self.retention
+        self.revoked = {s: p for s, p in self.revoked.items() if p > cutoff}
+
+        full = (self.mode == "full" or self.base_number is None
+                or self.publication - self.base_publication >= self.full_every)
+        if full:
+            serials = sorted(self.revoked)
+            delta_of = None
+            self.base_publication = self.publication
+            self.base_number = self.crl_number
+        else:
+            serials = sorted(s for s, p in self.revoked.items() if p > self.base_publication)
+            delta_of = self.base_number
+
+        start = time.perf_counter()
+        data = CACore.serialize_crl(sign(serials, self.crl_number, delta_of))
+        self.generation_time += time.perf_counter() - start
+
+        name = f"{self.name}.crl.pem" if full else f"{self.name}.delta.crl.pem"
+        for node_dir in self.node_dirs:
+            self.storage.write(os.path.join(node_dir, "crl", name), data)
+
+        if full:
+            self.crls_full += 1
+        else:
+            self.crls_delta += 1
+        self.crl_sizes.append(len(data))
+        self.distribution_bytes += len(data) * len(self.node_dirs)
+        entries = len(serials) * len(self.node_dirs)
+        self.crl_entries += entries
+        return entries
+
+    @staticmethod
+    def merge_stats(publishers):
+        """
+        Combined stats of several issuers' publishers.
+        """
+        sizes = [size for pub in publishers for size in pub.crl_sizes]
+        return {
+            "mode": publishers[0].mode if publishers else None,
+            "revocations": sum(pub.revocations for pub in publishers),
+            "crls_full": sum(pub.crls_full for pub in publishers),
+            "crls_delta": sum(pub.crls_delta for pub in publishers),
+            "crl_entries": sum(pub.crl_entries for pub in publishers),
+            "crl_bytes": percentiles(sizes),
+            "generation_time": sum(pub.generation_time for pub in publishers),
+            "distribution_bytes": sum(pub.distribution_bytes for pub in publishers),
+        }
+
+    def stats(self):
+        return CRLPublisher.merge_stats([self])
@@ -3,13 +3,42 @@ import time
 import random
 import shutil
 import math
+import copy
+from concurrent.futures import ThreadPoolExecutor
 from .ca_core import CACore
 from .sss import ShamirSecretSharing
 from .centralized_manager import CentralizedManager
 from .distributed_manager import DistributedManager
+from .csr_pool import CSRPool
+from .replication import ReplicationStore
+from .storage import make_storage
+from .async_cluster import AsyncCluster, LinkModel, percentiles
+from .instrumentation import make_instrumentation, profiled
+from .verification import Verifier
+from .revocation import CRLPublisher, sample_compromised
+from .cert_archive import CertArchive, CERT_FORMATS
+from .result_cache import open_result_cache, config_key
+from .quorum import QuorumScheduler
+from .io_accounting import wrap_storage
+from .issuance_pipeline import IssuancePipeline
+from .attack_engine import make_attack_engine, leakage_std_error, confidence_interval, effective_sample_size
+from . import analytical_model
 
 class SimulationConfig:
-    def __init__(self, M=6, T=30, p=0.001, V1=75.0, V2=0.1, total_certs=60, total_periods=100):
+    def __init__(self, M=6, T=30, p=0.001, V1=75.0, V2=0.1, total_certs=60, total_periods=100,
+                 attack_periods=None, attack_engine="vectorized", seed=None, mode="crypto",
+                 ca_persist="write_through", csr_policy="fresh", csr_workers=0, csr_corpus_dir=None,
+                 replication="copy", storage="filesystem", dist_transport="direct",
+                 link_latency=0.0, link_jitter=0.0, link_drop=0.0, link_timeout=1.0,
+                 coord_cost=0.0, instrument=False, instrument_hooks=None, profile=False,
+                 dist_epoch_batch=1, dist_rotation="rekey", rekey_every=10, share_msg_cost=None,
+                 ca_hierarchy="flat", cert_renew_every=1, verify_replicas=False, verify_workers=0,
+                 revocation="none", detection_delay=0.1, crl_retention=10, crl_full_every=4,
+                 crl_entry_cost=None, cert_format="pem", rotation_schedule="lockstep",
+                 rotation_jitter=0.1, attack_sampling="plain", is_rate=None, result_cache=None,
+                 result_cache_bytes=64 * 2 ** 20, quorum_policy="fixed", dist_quorums=1,
+                 quorum_slow_factor=3.0, measure_io=False, storage_fsync=False, issuance_workers=0,
+                 issuance_queue=256):
         self.M = M
         self.T = T
         self.p = p
@@ -17,6 +46,105 @@ class SimulationConfig:
         self.V2 = V2
         self.total_certs = total_certs
         self.total_periods = total_periods
+        # The attack phase does not depend on the crypto update phase, so it
+        # can be sampled over many more periods than we actually rotate.
+        # None -> same as total_periods.
+        self.attack_periods = attack_periods if attack_periods is not None else total_periods
+        # "vectorized" (NumPy batches), "python" (per-event reference loop)
+        # or "event" (continuous-time discrete-event scheduler)
+        self.attack_engine = attack_engine
+        self.seed = seed
+        # "crypto": real keys/CSRs/PEM files + Monte Carlo attack phase
+        # "montecarlo": modeled update cost + Monte Carlo attack phase
+        # "model": closed-form expected costs, no sampling at all
+        self.mode = mode
+        # Centralized CA key/cert persistence: "write_through" or "lazy"
+        self.ca_persist = ca_persist
+        # Subscriber key/CSR supply, see csr_pool.REUSE_POLICIES.
+        # csr_workers > 0 pre-generates fresh CSRs in background threads.
+        # csr_corpus_dir defaults to <base_dir>/csr_corpus for the corpus policy.
+        self.csr_policy = csr_policy
+        self.csr_workers = csr_workers
+        self.csr_corpus_dir = csr_corpus_dir
+        # Distributed cert replication, see replication.REPLICATION_MODES
+        self.replication = replication
+        # Persistence backend, see storage.STORAGE_BACKENDS
+        self.storage = storage
+        # How the distributed coordinator reaches the nodes, see
+        # async_cluster.TRANSPORTS. The link model (seconds, probability)
+        # only applies to the networked transports.
+        self.dist_transport = dist_transport
+        self.link_latency = link_latency
+        self.link_jitter = link_jitter
+        self.link_drop = link_drop
+        self.link_timeout = link_timeout
+        # Cost charged per second of share collection over the transport,
+        # added to the distributed update cost
+        self.coord_cost = coord_cost
+        # Per-stage wall/CPU timers (returned under "timings"); hooks are
+        # called as hook(scope, stage, period, wall, cpu) and must be
+        # picklable for parallel sweeps. profile dumps cProfile stats per run.
+        self.instrument = instrument
+        self.instrument_hooks = instrument_hooks
+        self.profile = profile
+        # Distributed root keys generated and Shamir-split this many
+        # rotations at a time (1 = one per period, as before)
+        self.dist_epoch_batch = dist_epoch_batch
+        # Distributed per-period update, see analytical_model.DIST_ROTATIONS.
+        # In "refresh" mode the root key is replaced every rekey_every periods
+        # and each share message is charged share_msg_cost (None -> V2).
+        self.dist_rotation = dist_rotation
+        self.rekey_every = rekey_every
+        self.share_msg_cost = share_msg_cost if share_msg_cost is not None else V2
+        # Centralized CA layout, see centralized_manager.CA_HIERARCHIES. With
+        # "intermediate", user certs are renewed every cert_renew_every
+        # periods and each issuing intermediate is trusted for that long.
+        self.ca_hierarchy = ca_hierarchy
+        self.cert_renew_every = cert_renew_every
+        # Relying-party check of every stored cert copy after each update
+        # (not charged to the update cost, reported under "verification").
+        # verify_workers > 0 verifies on a thread pool (multi-core hosts only).
+        self.verify_replicas = verify_replicas
+        self.verify_workers = verify_workers
+        # Revocation of certs exposed by a detected compromise, see
+        # analytical_model.REVOCATION_MODES. detection_delay is the fraction
+        # of a period until the revocation; CRL entries stay listed for
+        # crl_retention periods and each entry delivered to a node costs
+        # crl_entry_cost (None -> V2).
+        self.revocation = revocation
+        self.detection_delay = detection_delay
+        self.crl_retention = crl_retention
+        self.crl_full_every = crl_full_every
+        self.crl_entry_cost = crl_entry_cost if crl_entry_cost is not None else V2
+        # Issued user cert layout, see cert_archive.CERT_FORMATS
+        self.cert_format = cert_format
+        # Centralized rotation times for the event attack engine, see
+        # event_engine.ROTATION_SCHEDULES (jitter in periods, < 0.5)
+        self.rotation_schedule = rotation_schedule
+        self.rotation_jitter = rotation_jitter
+        # Distributed attack sampling, see attack_engine.ATTACK_SAMPLINGS;
+        # is_rate overrides the tilted per-period rate (None: K of M nodes)
+        self.attack_sampling = attack_sampling
+        self.is_rate = is_rate
+        # SQLite file of cached run_experiment results (None: off), LRU
+        # bounded to result_cache_bytes. Runs without a seed are not cached.
+        self.result_cache = result_cache
+        self.result_cache_bytes = result_cache_bytes
+        # Distributed signing quorums, see quorum.QUORUM_POLICIES. dist_quorums
+        # disjoint quorums sign slices of each re-issuance concurrently.
+        self.quorum_policy = quorum_policy
+        self.dist_quorums = dist_quorums
+        self.quorum_slow_factor = quorum_slow_factor
+        # Count the bytes/files/syncs the systems actually write, per node
+        # and period (io_accounting); storage_fsync fsyncs every file write
+        self.measure_io = measure_io
+        self.storage_fsync = storage_fsync
+        # Bulk re-issuance through issuance_pipeline with issuance_workers
+        # CSR and signing threads each (0: serial batches, the faster choice
+        # on a single core); issuance_queue bounds the certs waiting between
+        # two stages
+        self.issuance_workers = issuance_workers
+        self.issuance_queue = issuance_queue
         # Derived K (Threshold): Defaulting to roughly 1/3 or at least 2
         # If M=6, K=2. If M=3, K=1 (unsafe) -> max(2, ...)
         self.K = max(2, int(M // 3))
@@ -41,201 +169,753 @@ def ensure_dir(path):
     except FileExistsError:
         pass
 
+def open_storage(config, root_dir):
+    # One SQLite file per system, so architectures can run in separate processes
+    storage = make_storage(config.storage, path=os.path.join(root_dir, "store.sqlite"), fsync=config.storage_fsync)
+    return wrap_storage(storage, config.measure_io)
+
+def make_csr_pool(config):
+    corpus_dir = config.csr_corpus_dir
+    if corpus_dir is None and config.csr_policy == "corpus":
+        corpus_dir = os.path.join(config.base_dir, "csr_corpus")
+    return CSRPool(policy=config.csr_policy, workers=config.csr_workers, corpus_dir=corpus_dir)
+
+def make_crl_publishers(config, storage, names, node_dirs):
+    if config.revocation == "none":
+        return []
+    return [CRLPublisher(name, node_dirs, mode=config.revocation, retention=config.crl_retention,
+                         full_every=config.crl_full_every, storage=storage) for name in names]
+
+def detection_rng(config, scope):
+    # Compromises the crypto run reacts to; independent of the attack phase
+    return random.Random(None if config.seed is None else f"{config.seed}:{scope}")
+
+def make_archives(config, node_dirs, storage=None):
+    """
+    One packed DER archive per node dir, or None for the PEM layout.
+    Archive writes are booked on storage when it measures I/O.
+    """
+    if config.cert_format not in CERT_FORMATS:
+        raise ValueError(f"Unknown cert format: {config.cert_format}")
+    if config.cert_format == "pem":
+        return None
+    on_write = storage.record if config.measure_io else None
+    return [CertArchive(os.path.join(node_dir, "certs"), on_write=on_write) for node_dir in node_dirs]
+
+def merge_archive_stats(archives):
+    res = {}
+    for archive in archives:
+        for key, value in archive.stats().items():
+            res[key] = res.get(key, 0) + value
+    res["archives"] = len(archives)
+    return res
+
+def make_issuance_pipeline(config):
+    if config.issuance_workers <= 0:
+        return None
+    return IssuancePipeline(supply_workers=config.issuance_workers, sign_workers=config.issuance_workers,
+                            queue_size=config.issuance_queue)
+
+def make_verifier(config):
+    if not config.verify_replicas:
+        return None
+    return Verifier(workers=config.verify_workers)
+
 class RealCentralizedSystem:
     def __init__(self, config, run_id):
         self.config = config
         self.root_dir = os.path.join(config.base_dir, f"run_{run_id}", "centralized")
         self.nodes = []
+        self.storage = open_storage(config, self.root_dir)
         
-        if not os.path.exists(self.root_dir):
-            os.makedirs(self.root_dir)
+        self.storage.makedirs(self.root_dir)
         
         # Initialize M CA Nodes
         for i in range(config.M):
             node_dir = os.path.join(self.root_dir, f"node_{i}")
-            if not os.path.exists(node_dir):
-                os.makedirs(node_dir)
-            self.nodes.append(CentralizedManager(storage_dir=node_dir))
+            self.nodes.append(CentralizedManager(storage_dir=node_dir, persist=config.ca_persist,
+                                                 storage=self.storage, hierarchy=config.ca_hierarchy))
+        
+        self.period = 0
+        self.ca_certs_signed = 0
+        self.user_certs_issued = 0
+        # CA cert that issued each node's current user certs
+        self.user_cert_issuers = [None] * config.M
+        self.user_serials = [[] for _ in range(config.M)]
+        self.verifier = make_verifier(config)
+        node_dirs = [node_mgr.storage_dir for node_mgr in self.nodes]
+        self.crl_publishers = make_crl_publishers(config, self.storage,
+                                                  [f"node_{i}" for i in range(config.M)], node_dirs)
+        self.archives = make_archives(config, node_dirs, self.storage)
+        self.detection_rng = detection_rng(config, "centralized")
+        self.csr_pool = make_csr_pool(config)
+        self.pipeline = make_issuance_pipeline(config)
+        if self.pipeline is None:
+            self.csr_pool.prefetch(self._cert_names())
+        self.instrument = make_instrumentation(config, "centralized")
+
+    def _cert_names(self):
+        return [f"User_{i * self.config.certs_per_node + j}"
+                for i in range(self.config.M) for j in range(self.config.certs_per_node)]
 
     def update_all(self):
-        # Centralized Cost = V2 * Sum of certs stored/updated
-        # certs_per_node * M is roughly total_certs
-        # To be precise:
-        total_certs_managed = self.config.certs_per_node * self.config.M
-        weighted_cost = self.config.V2 * total_certs_managed
+        self.period += 1
+        if self.config.measure_io:
+            self.storage.begin_period(self.period)
+        renew = analytical_model.is_renewal_period(self.config, self.period)
+        signed = 0
         
-        for i, node_mgr in enumerate(self.nodes):
-            # 1. Rotate CA Key
-            node_mgr.initialize_ca()
-            
-            # 2. Re-issue User Certs
-            for j in range(self.config.certs_per_node):
-                cert_id = i * self.config.certs_per_node + j
-                user_key = CACore.generate_private_key()
-                csr = CACore.create_csr(user_key, f"User_{cert_id}")
-                out_path = os.path.join(node_mgr.storage_dir, f"user_{cert_id}.pem")
-                node_mgr.issue_certificate(csr, out_path)
+        self.instrument.next_period()
+        with self.instrument.stage("update"), self.storage.transaction():
+            for i, node_mgr in enumerate(self.nodes):
+                # 1. Rotate CA Key
+                with self.instrument.stage("rotate"):
+                    ca_signed = node_mgr.initialize_ca()
+                self.ca_certs_signed += ca_signed
+                signed += ca_signed
                 
-        return weighted_cost
+                # User certs chaining to a still-trusted intermediate are kept
+                # (the pipeline re-issues for all nodes once they are rotated)
+                if not renew or self.pipeline is not None:
+                    continue
+                
+                # 2. Re-issue User Certs (one batch against the cached CA key)
+                with self.instrument.stage("csr"):
+                    csrs = []
+                    out_paths = []
+                    for j in range(self.config.certs_per_node):
+                        cert_id = i * self.config.certs_per_node + j
+                        csrs.append(self.csr_pool.get(f"User_{cert_id}"))
+                        out_paths.append(os.path.join(node_mgr.storage_dir, f"user_{cert_id}.pem"))
+                with self.instrument.stage("sign"):
+                    if self.archives is None:
+                        user_certs = node_mgr.issue_certificates(csrs, out_paths)
+                    else:
+                        user_certs = node_mgr.issue_certificates(csrs)
+                        first_id = i * self.config.certs_per_node
+                        self.archives[i].append_many(
+                            (first_id + j, CACore.serialize_cert_der(c)) for j, c in enumerate(user_certs))
+                self.user_serials[i] = [c.serial_number for c in user_certs]
+                self.user_certs_issued += len(csrs)
+                self.user_cert_issuers[i] = node_mgr.load_ca()[1]
+                signed += len(csrs)
+            
+            if renew and self.pipeline is not None:
+                with self.instrument.stage("issue"):
+                    signed += self._issue_pipelined()
+        
+        crl_entries = 0
+        if self.crl_publishers:
+            with self.instrument.stage("revoke"), self.storage.transaction():
+                crl_entries = self.revoke_and_publish()
+        
+        # Next period's CSRs are generated while the caller moves on
+        # (the pipeline makes its own, a prefetch would hold them all)
+        if self.pipeline is None and analytical_model.is_renewal_period(self.config, self.period + 1):
+            self.csr_pool.prefetch(self._cert_names())
+        
+        if self.verifier is not None:
+            with self.instrument.stage("verify"):
+                self.verify_all()
+        
+        # Centralized Cost = V2 * certs actually re-signed (self-signed roots are free)
+        return self.config.V2 * signed + self.config.crl_entry_cost * crl_entries
+
+    def _issue_pipelined(self):
+        """
+        Re-issues every node's user certs through the issuance pipeline;
+        cert_id // certs_per_node is the node that signs it.
+        Returns the number of certs issued.
+        """
+        per_node = self.config.certs_per_node
+        cas = [node_mgr.load_ca() for node_mgr in self.nodes]
+        serials = [[] for _ in self.nodes]
+
+        def supply(cert_id, name):
+            return self.csr_pool.get(name)
+
+        def sign(cert_id, csr):
+            ca_key, ca_cert = cas[cert_id // per_node]
+            return CACore.sign_csr(ca_cert, ca_key, csr)
+
+        def persist(cert_id, user_cert):
+            i = cert_id // per_node
+            if self.archives is None:
+                path = os.path.join(self.nodes[i].storage_dir, f"user_{cert_id}.pem")
+                self.storage.write(path, CACore.serialize_cert(user_cert))
+            else:
+                self.archives[i].append(cert_id, CACore.serialize_cert_der(user_cert))
+            serials[i].append(user_cert.serial_number)
+
+        items = ((cert_id, f"User_{cert_id}") for cert_id in range(len(self.nodes) * per_node))
+        issued = self.pipeline.run(items, supply, sign, persist)
+        self.user_serials = serials
+        self.user_cert_issuers = [ca_cert for _, ca_cert in cas]
+        self.user_certs_issued += issued
+        return issued
+
+    def revoke_and_publish(self):
+        """
+        Revokes the current certs of every node found compromised this
+        period, then each node publishes its CRL to all nodes.
+        Returns the CRL entries distributed.
+        """
+        poisson_lambda = self.config.p * self.config.T
+        for i in sample_compromised(self.detection_rng, poisson_lambda, self.config.M):
+            self.crl_publishers[i].revoke(self.user_serials[i])
+        entries = 0
+        for node_mgr, publisher in zip(self.nodes, self.crl_publishers):
+            entries += publisher.publish(node_mgr.issue_crl)
+        return entries
+
+    def verify_all(self):
+        """
+        Verifies every node's stored user certs against that node's trust
+        anchor (its root, plus the issuing intermediate if any).
+        """
+        for i, node_mgr in enumerate(self.nodes):
+            self.verifier.reset()
+            if self.config.ca_hierarchy == "intermediate":
+                self.verifier.trust(node_mgr.load_root()[1])
+                self.verifier.add_intermediate(self.user_cert_issuers[i])
+            else:
+                self.verifier.trust(node_mgr.load_ca()[1])
+            cert_ids = [i * self.config.certs_per_node + j for j in range(self.config.certs_per_node)]
+            if self.archives is None:
+                blobs = [self.storage.read(os.path.join(node_mgr.storage_dir, f"user_{cert_id}.pem"))
+                         for cert_id in cert_ids]
+            else:
+                blobs = [self.archives[i].get(cert_id) for cert_id in cert_ids]
+            self.verifier.verify_many(blobs)
+
+    def stats(self):
+        res = {
+            "csr_pool": self.csr_pool.stats(),
+            "ca_certs_signed": self.ca_certs_signed,
+            "user_certs_issued": self.user_certs_issued,
+        }
+        if self.verifier is not None:
+            res["verification"] = self.verifier.stats()
+        if self.crl_publishers:
+            res["revocation"] = CRLPublisher.merge_stats(self.crl_publishers)
+        if self.archives is not None:
+            res["archive"] = merge_archive_stats(self.archives)
+        if self.pipeline is not None:
+            res["issuance"] = self.pipeline.stats()
+        if self.config.measure_io:
+            res["io"] = self.storage.stats()
+        timings = self.instrument.summary()
+        if timings:
+            res["timings"] = timings
+        return res
+
+    def close(self):
+        # Persist any CA pairs held back by the lazy policy
+        for node_mgr in self.nodes:
+            node_mgr.flush()
+        for archive in self.archives or ():
+            archive.close()
+        self.csr_pool.close()
+        if self.verifier is not None:
+            self.verifier.close()
+        self.storage.close()
 
 class RealDistributedSystem:
     def __init__(self, config, run_id):
         self.config = config
         self.root_dir = os.path.join(config.base_dir, f"run_{run_id}", "distributed")
         self.storage_dir = os.path.join(self.root_dir, "storage")
+        self.storage = open_storage(config, self.root_dir)
         
-        if not os.path.exists(self.root_dir):
-            os.makedirs(self.root_dir)
-        if not os.path.exists(self.storage_dir):
-            os.makedirs(self.storage_dir)
+        self.storage.makedirs(self.storage_dir)
         
-        self.manager = DistributedManager(storage_dir=self.storage_dir, n=config.M, k=config.K)
+        self.manager = DistributedManager(storage_dir=self.storage_dir, n=config.M, k=config.K,
+                                          storage=self.storage)
+        self.signing_stats = []
+        self.period = 0
+        self.share_refreshes = 0
+        self.refresh_messages = 0
+        self.verifier = make_verifier(config)
+        self.user_serials = []
+        node_dirs = [os.path.join(self.storage_dir, f"node_{nid}") for nid in range(1, config.M + 1)]
+        self.crl_publishers = make_crl_publishers(config, self.storage, ["root"], node_dirs)
+        self.archives = make_archives(config, node_dirs, self.storage)
+        self.detection_rng = detection_rng(config, "distributed")
+        # Nodes (1-based) detected compromised this period
+        self.compromised = []
+        self.quorums = QuorumScheduler(range(1, config.M + 1), config.K, policy=config.quorum_policy,
+                                       slow_factor=config.quorum_slow_factor, seed=config.seed)
+        self.signing_pool = None
+        if config.dist_quorums > 1:
+            self.signing_pool = ThreadPoolExecutor(max_workers=config.dist_quorums)
+        self.replication = ReplicationStore(self.storage_dir, range(1, config.M + 1),
+                                            mode=config.replication, storage=self.storage)
+        
+        self.cluster = None
+        if config.dist_transport != "direct":
+            link = LinkModel(latency=config.link_latency, jitter=config.link_jitter,
+                             drop=config.link_drop, seed=config.seed)
+            self.cluster = AsyncCluster(self.manager, transport=config.dist_transport, link=link,
+                                        timeout=config.link_timeout)
+        
+        self.csr_pool = make_csr_pool(config)
+        self.pipeline = make_issuance_pipeline(config)
+        if self.pipeline is None:
+            self.csr_pool.prefetch(self._cert_names())
+        self.instrument = make_instrumentation(config, "distributed")
+
+    def _cert_names(self):
+        return [f"User_{j}" for j in range(self.config.total_certs)]
 
     def update_all(self):
+        self.period += 1
+        if self.config.measure_io:
+            self.storage.begin_period(self.period)
+        if self.crl_publishers or self.config.quorum_policy != "fixed":
+            poisson_lambda = self.config.p * self.config.T
+            self.compromised = [n + 1 for n in sample_compromised(self.detection_rng, poisson_lambda, self.config.M)]
+            self.quorums.set_compromised(self.compromised)
+        weighted_cost = self._update()
+        if self.crl_publishers:
+            with self.instrument.stage("revoke"), self.storage.transaction():
+                weighted_cost += self.config.crl_entry_cost * self.revoke_and_publish()
+        if self.verifier is not None:
+            with self.instrument.stage("verify"):
+                self.verify_all()
+        return weighted_cost
+
+    def _update(self):
+        if not analytical_model.is_rekey_period(self.config, self.period):
+            # Same root key and certs, only the shares are re-randomized
+            self.instrument.next_period()
+            with self.instrument.stage("update"), self.instrument.stage("refresh"):
+                self.refresh_messages += self.manager.refresh_shares()
+            self.share_refreshes += 1
+            return analytical_model.share_refresh_cost(self.config)
+
         # Distributed Cost = V2 * Sum of certs stored across all nodes
         # Each node stores ALL certs (Full Replication)
-        raw_update_ops = self.config.total_certs * self.config.M
-        weighted_cost = self.config.V2 * raw_update_ops
+        weighted_cost = analytical_model.distributed_rekey_cost(self.config)
         
+        self.instrument.next_period()
+        with self.instrument.stage("update"), self.storage.transaction():
+            coordination_time = self._rotate_and_reissue()
+        
+        if self.cluster is not None:
+            weighted_cost += self.config.coord_cost * coordination_time
+            
+        return weighted_cost
+
+    def revoke_and_publish(self):
+        """
+        Revokes every current cert if K nodes were compromised this period,
+        then publishes the CRL under a threshold signature.
+        Returns the CRL entries distributed.
+        """
+        publisher = self.crl_publishers[0]
+        if len(self.compromised) >= self.config.K:
+            publisher.revoke(self.user_serials)
+        session = self._open_session(self.quorums.select()[0])
+        if session is None:
+            return 0
+        with session:
+            entries = publisher.publish(session.sign_crl)
+        self.quorums.record(session)
+        return entries
+
+    def _open_sessions(self, count):
+        """
+        Sessions for up to `count` disjoint quorums (fewer if some fail).
+        """
+        sessions = [self._open_session(quorum) for quorum in self.quorums.select(count)]
+        return [session for session in sessions if session is not None]
+
+    def _open_session(self, quorum):
+        if self.cluster is not None:
+            # Shares travel over the transport; coordination time counts as setup
+            session = self.cluster.open_session(quorum)
+        else:
+            session = self.manager.open_session(quorum)
+        if session is None:
+            print(f"[ERROR] Quorum {quorum} cannot sign in distributed mode!")
+        return session
+
+    def _rotate_and_reissue(self):
         # 1. Rotate Root Key
-        self.manager.initialize_ca()
+        with self.instrument.stage("rotate"):
+            if self.config.dist_epoch_batch > 1 and not self.manager.prepared_epochs():
+                self.manager.prepare_epochs(self.config.dist_epoch_batch)
+            self.manager.initialize_ca()
         
         # 2. Re-issue User Certs (Threshold Sign)
-        # Quorum: first K nodes (1..K)
-        quorum = list(range(1, self.config.K + 1))
+        with self.instrument.stage("collect"):
+            sessions = self._open_sessions(self.config.dist_quorums)
+        if not sessions:
+            return 0.0
         
-        for j in range(self.config.total_certs):
-            user_key = CACore.generate_private_key()
-            csr = CACore.create_csr(user_key, f"User_{j}")
-            
-            temp_path = os.path.abspath(os.path.join(self.root_dir, f"user_{j}_temp.pem"))
-            if not os.path.exists(os.path.dirname(temp_path)):
-                os.makedirs(os.path.dirname(temp_path))
-            
-            success = self.manager.sign_request(csr, quorum, temp_path)
-            
-            if not success:
-                print(f"[ERROR] Failed to sign user_{j} in distributed mode!")
-                continue
-
-            # 3. Storage Replication
-            for node_id in range(1, self.config.M + 1):
-                node_storage_path = os.path.join(self.storage_dir, f"node_{node_id}", "certs")
-                if not os.path.exists(node_storage_path):
-                    os.makedirs(node_storage_path)
-                
-                final_path = os.path.join(node_storage_path, f"user_{j}.pem")
-                shutil.copy(temp_path, final_path)
-            
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-            
-        return weighted_cost
+        if self.pipeline is not None:
+            with self.instrument.stage("issue"):
+                self._issue_pipelined(sessions)
+            return sum(session.setup_time for session in sessions)
+        
+        with self.instrument.stage("csr"):
+            csrs = self.csr_pool.get_many(self._cert_names())
+        
+        # Shares are collected and the key reconstructed once per quorum and period
+        with self.instrument.stage("sign"):
+            user_certs = self._sign_split(sessions, csrs)
+        for session in sessions:
+            self.signing_stats.append(session.stats())
+            self.quorums.record(session)
+        self.user_serials = [c.serial_number for c in user_certs]
+        
+        # 3. Storage Replication
+        with self.instrument.stage("replicate"):
+            if self.archives is None:
+                for j, user_cert in enumerate(user_certs):
+                    self.replication.replicate(f"user_{j}.pem", CACore.serialize_cert(user_cert))
+                self.replication.commit()
+            else:
+                ders = [CACore.serialize_cert_der(c) for c in user_certs]
+                for archive in self.archives:
+                    archive.append_many(enumerate(ders))
+        
+        self.csr_pool.prefetch(self._cert_names())
+        
+        return sum(session.setup_time for session in sessions)
+
+    def _issue_pipelined(self, sessions):
+        """
+        Re-issues and replicates every user cert through the issuance
+        pipeline. Like _sign_split, each session signs a contiguous slice.
+        """
+        total = self.config.total_certs
+        serials = [None] * total
+
+        def supply(cert_id, name):
+            return self.csr_pool.get(name)
+
+        def sign(cert_id, csr):
+            session = sessions[cert_id * len(sessions) // total]
+            return CACore.sign_csr(session.ca_cert, session.ca_key, csr)
+
+        def persist(cert_id, user_cert):
+            if self.archives is None:
+                self.replication.replicate(f"user_{cert_id}.pem", CACore.serialize_cert(user_cert))
+            else:
+                der = CACore.serialize_cert_der(user_cert)
+                for archive in self.archives:
+                    archive.append(cert_id, der)
+            serials[cert_id] = user_cert.serial_number
+
+        start = time.perf_counter()
+        try:
+            self.pipeline.run(((j, f"User_{j}") for j in range(total)), supply, sign, persist)
+        finally:
+            for session in sessions:
+                session.close()
+        if self.archives is None:
+            self.replication.commit()
+        elapsed = time.perf_counter() - start
+        bounds = [total * i // len(sessions) for i in range(len(sessions) + 1)]
+        for i, session in enumerate(sessions):
+            session.record_batch(bounds[i + 1] - bounds[i], elapsed)
+            self.signing_stats.append(session.stats())
+            self.quorums.record(session)
+        self.user_serials = serials
+
+    def _sign_split(self, sessions, csrs):
+        """
+        Signs contiguous slices of csrs, one per session, concurrently on
+        the signing pool. Returns the certs in input order.
+        """
+        if len(sessions) == 1:
+            with sessions[0]:
+                return sessions[0].sign_batch(csrs)
+        bounds = [len(csrs) * i // len(sessions) for i in range(len(sessions) + 1)]
+        futures = [self.signing_pool.submit(session.sign_batch, csrs[bounds[i]:bounds[i + 1]])
+                   for i, session in enumerate(sessions)]
+        try:
+            return [cert for f in futures for cert in f.result()]
+        finally:
+            for session in sessions:
+                session.close()
+
+    def verify_all(self):
+        """
+        Verifies every node's replica of every user cert against the
+        current distributed root.
+        """
+        self.verifier.reset()
+        self.verifier.trust(self.storage.read(self.manager.cert_path))
+        for n, node_id in enumerate(self.replication.node_ids):
+            if self.archives is None:
+                blobs = [self.replication.read(node_id, f"user_{j}.pem") for j in range(self.config.total_certs)]
+            else:
+                blobs = [self.archives[n].get(j) for j in range(self.config.total_certs)]
+            self.verifier.verify_many(blobs)
+
+    def stats(self):
+        """
+        Threshold signing latency summed over all periods so far.
+        """
+        setup_time = sum(s["setup_time"] for s in self.signing_stats)
+        batch_time = sum(s["batch_time"] for s in self.signing_stats)
+        certs = sum(s["certs"] for s in self.signing_stats)
+        batches = sum(s["batches"] for s in self.signing_stats)
+        # End-to-end: share collection + reconstruction + signing, per period
+        end_to_end = [s["setup_time"] + s["batch_time"] for s in self.signing_stats]
+        res = {
+            "signing_setup_time": setup_time,
+            "signing_batches": batches,
+            "signing_certs": certs,
+            "per_batch_latency": (setup_time + batch_time) / batches if batches else 0.0,
+            "per_cert_latency": batch_time / certs if certs else 0.0,
+            "end_to_end_latency": percentiles(end_to_end),
+            "throughput": percentiles([s["certs"] / t for s, t in zip(self.signing_stats, end_to_end) if t > 0]),
+            "csr_pool": self.csr_pool.stats(),
+        }
+        if self.archives is None:
+            res["replication"] = self.replication.stats()
+        else:
+            res["archive"] = merge_archive_stats(self.archives)
+        if self.pipeline is not None:
+            res["issuance"] = self.pipeline.stats()
+        if self.verifier is not None:
+            res["verification"] = self.verifier.stats()
+        if self.crl_publishers:
+            res["revocation"] = self.crl_publishers[0].stats()
+        if self.config.dist_rotation == "refresh":
+            res["share_refreshes"] = self.share_refreshes
+            res["refresh_messages"] = self.refresh_messages
+        if self.cluster is not None:
+            res["coordination"] = self.cluster.stats()
+        res["quorum"] = self.quorums.stats()
+        if self.config.measure_io:
+            res["io"] = self.storage.stats()
+        timings = self.instrument.summary()
+        if timings:
+            res["timings"] = timings
+        return res
+
+    def close(self):
+        if self.cluster is not None:
+            self.cluster.close()
+        if self.signing_pool is not None:
+            self.signing_pool.shutdown()
+        for archive in self.archives or ():
+            archive.close()
+        self.csr_pool.close()
+        if self.verifier is not None:
+            self.verifier.close()
+        self.storage.close()
+
+SIMULATION_MODES = ("crypto", "montecarlo", "model")
+ARCHITECTURES = ("centralized", "distributed")
+
+# User cert copies each architecture's update cost charges V2 for
+MODELED_CERT_REPLICAS = {
+    "centralized": analytical_model.centralized_cert_replicas,
+    "distributed": analytical_model.distributed_cert_replicas,
+}
+
+def make_run_id(config, run_id_suffix=""):
+    # Use a unique run ID based on T and suffix to separate files
+    return f"{config.T}_{run_id_suffix}"
+
+def run_update_phase(config, run_id, architectures=ARCHITECTURES):
+    """
+    Runs the rotation/re-issuance loop for the selected architectures.
+    Returns ({architecture: accumulated weighted update cost},
+             {architecture: system stats}).
+    """
+    totals = {}
+    if config.mode != "crypto":
+        # The cost each update_all reports is deterministic, skip the crypto
+        c_rate, d_rate = analytical_model.revocation_rates(config)
+        if "centralized" in architectures:
+            totals["centralized"] = (analytical_model.centralized_total_update_cost(config, config.total_periods)
+                                     + analytical_model.revocation_total_cost(config, c_rate, config.total_periods))
+        if "distributed" in architectures:
+            totals["distributed"] = (analytical_model.distributed_total_update_cost(config, config.total_periods)
+                                     + analytical_model.revocation_total_cost(config, d_rate, config.total_periods))
+        return totals, {}
+
+    systems = {}
+    if "centralized" in architectures:
+        systems["centralized"] = RealCentralizedSystem(config, run_id)
+    if "distributed" in architectures:
+        systems["distributed"] = RealDistributedSystem(config, run_id)
+
+    profile_path = None
+    if config.profile:
+        profile_path = os.path.join(config.base_dir, f"run_{run_id}", f"profile_{'_'.join(systems)}.pstats")
+
+    for arch in systems:
+        totals[arch] = 0.0
+    with profiled(profile_path):
+        for t in range(1, config.total_periods + 1):
+            for arch, system in systems.items():
+                totals[arch] += system.update_all()
+    for system in systems.values():
+        system.close()
+
+    stats = {arch: system.stats() for arch, system in systems.items()}
+    if profile_path:
+        for arch_stats in stats.values():
+            arch_stats["profile_path"] = profile_path
+    return totals, stats
+
+def run_attack_phase(config):
+    """
+    Samples the attack phase over attack_periods. Independent of the update
+    phase, so it can run in any order or process.
+    """
+    instrument = make_instrumentation(config, "attack")
+    attack = make_attack_engine(config, seed=config.seed, instrument=instrument).run(config.attack_periods)
+    timings = instrument.summary()
+    if timings:
+        attack["timings"] = timings
+    return attack
 
 def run_experiment(config, run_id_suffix=""):
     """
     Runs a single experiment with the provided configuration.
     Returns a dict with results.
     """
-    poisson_lambda = config.p * config.T
-    
-    # Use a unique run ID based on T and suffix to separate files
-    run_id = f"{config.T}_{run_id_suffix}"
-    
-    # Setup
-    sys_central = RealCentralizedSystem(config, run_id)
-    sys_dist = RealDistributedSystem(config, run_id)
-    
-    # Stats
-    total_risk_central = 0.0
-    total_risk_dist = 0.0
-    total_ops_central = 0.0
-    total_ops_dist = 0.0
-    
-    # Loop Periods
-    for t in range(1, config.total_periods + 1):
-        # 1. Update Phase
-        c_cost = sys_central.update_all()
-        total_ops_central += c_cost
-        
-        d_cost = sys_dist.update_all()
-        total_ops_dist += d_cost
-        
-        # 2. Attack Phase
-        # Centralized
-        c_compromised_nodes = set()
-        c_period_leakage = 0.0
-        
-        for node_id in range(config.M):
-            time_cursor = 0.0
-            while True:
-                inter_arrival = random.expovariate(poisson_lambda)
-                time_cursor += inter_arrival
-                if time_cursor > 1.0: 
-                    break
-                if node_id not in c_compromised_nodes:
-                    c_compromised_nodes.add(node_id)
-                    leakage_duration = 1.0 - time_cursor
-                    # Leakage = Duration * (Certs per node)
-                    c_period_leakage += (leakage_duration * config.certs_per_node)
-        
-        c_weighted_risk = config.V1 * c_period_leakage
-        total_risk_central += c_weighted_risk
-        
-        # Distributed
-        d_compromised_nodes = set()
-        system_compromised_at = None
-        attack_events = []
-        
-        for node_id in range(1, config.M + 1): # Nodes are 1..M in distributed logic now?
-            # DistributedManager uses 1-based indexing for shares (node_1..node_M)
-            # Attack logic should match.
-            time_cursor = 0.0
-            while True:
-                inter_arrival = random.expovariate(poisson_lambda)
-                time_cursor += inter_arrival
-                if time_cursor > 1.0:
-                    break
-                attack_events.append((time_cursor, node_id))
-        
-        attack_events.sort()
-        
-        for at_time, node_id in attack_events:
-            d_compromised_nodes.add(node_id)
-            if len(d_compromised_nodes) >= config.K:
-                if system_compromised_at is None:
-                    system_compromised_at = at_time
-                    break
-        
-        d_period_leakage = 0.0
-        if system_compromised_at is not None:
-            leakage_duration = 1.0 - system_compromised_at
-            # Distributed: All certs leaked
-            d_period_leakage += (leakage_duration * config.total_certs)
-            
-        d_weighted_risk = config.V1 * d_period_leakage
-        total_risk_dist += d_weighted_risk
+    if config.mode not in SIMULATION_MODES:
+        raise ValueError(f"Unknown simulation mode: {config.mode}")
+
+    cache, key = result_cache_slot(config)
+    if cache is None:
+        return _run_experiment(config, run_id_suffix)
+    res = cache.get(key)
+    if res is not None:
+        res["cached"] = True
+        return res
+    res = _run_experiment(config, run_id_suffix)
+    cache.put(key, res)
+    return res
+
+def result_cache_slot(config):
+    """
+    (cache, key) of a cacheable run, or (None, None). Runs without a seed
+    are not cached, except for the deterministic model mode.
+    """
+    cache = open_result_cache(config)
+    if cache is None or (config.seed is None and config.mode != "model"):
+        return None, None
+    return cache, config_key(config)
+
+def _run_experiment(config, run_id_suffix):
+    if config.mode == "model":
+        res = analytical_model.evaluate(config)
+        return _result_dict(config, res["C_Risk"], res["C_Total"], res["D_Risk"], res["D_Total"])
+
+    # 1. Update Phase
+    update_ops, update_stats = run_update_phase(config, make_run_id(config, run_id_suffix))
+        
+    # 2. Attack Phase
+    attack = run_attack_phase(config)
+
+    return summarize_experiment(config, update_ops, attack, update_stats)
+
+def summarize_experiment(config, update_ops, attack, update_stats=None):
+    """
+    Turns accumulated update cost and attack statistics into unit time costs.
+    """
+    total_risk_central = config.V1 * attack["c_leakage"]
+    total_risk_dist = config.V1 * attack["d_leakage"]
         
     # Calculate Unit Time Costs
     total_time = config.total_periods * config.T
     
-    unit_update_central = total_ops_central / total_time
-    unit_update_dist = total_ops_dist / total_time
+    unit_update_central = update_ops["centralized"] / total_time
+    unit_update_dist = update_ops["distributed"] / total_time
     
-    unit_risk_central = total_risk_central / config.total_periods
-    unit_risk_dist = total_risk_dist / config.total_periods
+    unit_risk_central = total_risk_central / config.attack_periods
+    unit_risk_dist = total_risk_dist / config.attack_periods
 
     unit_total_central = unit_update_central + unit_risk_central
     unit_total_dist = unit_update_dist + unit_risk_dist
 
+    res = _result_dict(config, unit_risk_central, unit_total_central, unit_risk_dist, unit_total_dist)
+    res["C_Risk_SE"] = config.V1 * leakage_std_error(attack, "c_leakage")
+    res["D_Risk_SE"] = config.V1 * leakage_std_error(attack, "d_leakage")
+    res["C_Risk_CI"] = confidence_interval(unit_risk_central, res["C_Risk_SE"])
+    res["D_Risk_CI"] = confidence_interval(unit_risk_dist, res["D_Risk_SE"])
+    ess = effective_sample_size(attack)
+    if ess is not None:
+        res["D_IS_ESS"] = ess
+    timings = {}
+    if update_stats:
+        res["update_stats"] = {}
+        for arch, arch_stats in update_stats.items():
+            arch_stats = dict(arch_stats)
+            if "timings" in arch_stats:
+                timings[arch] = arch_stats.pop("timings")
+            if "io" in arch_stats:
+                # Measured writes next to what the model charged for them: user
+                # cert copies (V2 each) and delivered CRL entries (crl_entry_cost
+                # each) counted apart; modeled_cost also holds share refreshes
+                # and coordination time
+                res.setdefault("io", {})[arch] = dict(
+                    arch_stats["io"]["total"],
+                    modeled_cost=update_ops[arch],
+                    modeled_replicas=MODELED_CERT_REPLICAS[arch](config, config.total_periods),
+                    modeled_crl_entries=arch_stats.get("revocation", {}).get("crl_entries", 0))
+            res["update_stats"][arch] = arch_stats
+    if "timings" in attack:
+        timings["attack"] = attack["timings"]
+    if timings:
+        res["timings"] = timings
+    return res
+
+def _result_dict(config, c_risk, c_total, d_risk, d_total):
     return {
         "T": config.T,
         "M": config.M,
         "p": config.p,
         "V1": config.V1,
         "V2": config.V2,
-        "C_Risk": unit_risk_central,
-        "C_Total": unit_total_central,
-        "D_Risk": unit_risk_dist,
-        "D_Total": unit_total_dist
+        "mode": config.mode,
+        "C_Risk": c_risk,
+        "C_Total": c_total,
+        "D_Risk": d_risk,
+        "D_Total": d_total
     }
+
+def cross_check(config, run_id_suffix="", modes=SIMULATION_MODES):
+    """
+    Runs the same configuration under several modes and reports each
+    sampled mode's discrepancy against the closed-form model.
+    Returns {"results": {mode: result}, "discrepancy": {mode: {metric: ...}}}.
+    """
+    results = {}
+    for mode in modes:
+        results[mode] = run_experiment(_with_mode(config, mode), run_id_suffix=f"{run_id_suffix}_{mode}")
+
+    model = results.get("model") or run_experiment(_with_mode(config, "model"))
+    discrepancy = {}
+    for mode, res in results.items():
+        if mode == "model":
+            continue
+        discrepancy[mode] = {}
+        for metric in ("C_Risk", "C_Total", "D_Risk", "D_Total"):
+            diff = res[metric] - model[metric]
+            entry = {
+                "abs": diff,
+                "rel": diff / model[metric] if model[metric] else 0.0,
+            }
+            se = res.get(metric[0] + "_Risk_SE")
+            if se:
+                # Update cost is deterministic, so risk SE applies to totals too
+                entry["z"] = diff / se
+            discrepancy[mode][metric] = entry
+
+    return {"results": results, "discrepancy": discrepancy}
+
+def _with_mode(config, mode):
+    mode_config = copy.copy(config)
+    mode_config.mode = mode
+    return mode_config
@@ -1,5 +1,5 @@
 import secrets
-# from functools import reduce (Unused)
+from functools import lru_cache
 
 # SECP256R1 (Prime256v1) Curve Order
 CURVE_ORDER = 0xFFFFFFFF00000000FFFFFFFFFFFFFFFFBCE6FAADA7179E84F3B9CAC2FC632551
@@ -24,45 +24,113 @@ def mod_inverse(k, p):
         raise Exception('Modular inverse does not exist')
     return x % p
 
-def lagrange_interpolate(x, x_s, y_s, prime):
+def batch_mod_inverse(values, prime):
+    """
+    Montgomery's trick: inverts every value with a single mod_inverse and
+    3(n-1) multiplications.
+    """
+    n = len(values)
+    if n == 0:
+        return []
+    prefix = [1] * n
+    acc = 1
+    for i, v in enumerate(values):
+        prefix[i] = acc
+        acc = (acc * v) % prime
+
+    inv = mod_inverse(acc, prime)
+    res = [0] * n
+    for i in range(n - 1, -1, -1):
+        res[i] = (inv * prefix[i]) % prime
+        inv = (inv * values[i]) % prime
+    return res
+
+@lru_cache(maxsize=1024)
+def lagrange_weights(x_s, x, prime):
+    """
+    Lagrange basis weights w_i = prod_{j!=i} (x - x_j) / (x_i - x_j) for the
+    evaluation point x, cached per quorum x-set (x_s must be a tuple).
+    """
     k = len(x_s)
-    if k != len(y_s):
-        raise ValueError("x_s and y_s must be same length")
-        
-    nums = [] 
-    dens = [] 
-    
+    nums = []
+    dens = []
+
     for i in range(k):
-        others = list(x_s)
-        cur = others.pop(i)
-        
+        cur = x_s[i]
+
         num = 1
         den = 1
-        
-        for val in others:
-            num = (num * (x - val)) % prime
-            den = (den * (cur - val)) % prime
-            
+
+        for j in range(k):
+            if j == i:
+                continue
+            num = (num * (x - x_s[j])) % prime
+            den = (den * (cur - x_s[j])) % prime
+
         nums.append(num)
         dens.append(den)
-        
-    den = reduce_prod(dens, prime)
-    
+
+    inv_dens = batch_mod_inverse(dens, prime)
+    return tuple((nums[i] * inv_dens[i]) % prime for i in range(k))
+
+def lagrange_interpolate(x, x_s, y_s, prime):
+    k = len(x_s)
+    if k != len(y_s):
+        raise ValueError("x_s and y_s must be same length")
+
+    weights = lagrange_weights(tuple(x_s), x, prime)
+
     num_sum = 0
     for i in range(k):
-        num = nums[i]
-        den_others = (den * mod_inverse(dens[i], prime)) % prime
-        term = (y_s[i] * num * den_others) % prime
-        num_sum = (num_sum + term) % prime
-        
-    final_res = (num_sum * mod_inverse(den, prime)) % prime
-    return final_res
+        num_sum = (num_sum + y_s[i] * weights[i]) % prime
+    return num_sum
 
-def reduce_prod(lst, prime):
-    res = 1
-    for x in lst:
-        res = (res * x) % prime
-    return res
+# Random bytes drawn per polynomial coefficient in batched splits: 64 bits
+# above the 256-bit order, so reducing mod the order has negligible bias
+COEFF_BYTES = 40
+
+@lru_cache(maxsize=64)
+def power_table(n, k, prime):
+    """
+    x^d mod prime for the evaluation points x = 1..n and degrees d < k.
+    """
+    table = []
+    for x in range(1, n + 1):
+        row = [1] * k
+        for d in range(1, k):
+            row[d] = (row[d - 1] * x) % prime
+        table.append(tuple(row))
+    return tuple(table)
+
+def random_coeffs(count, prime):
+    """
+    count random field elements from a single CSPRNG read.
+    """
+    raw = secrets.token_bytes(count * COEFF_BYTES)
+    return [int.from_bytes(raw[i * COEFF_BYTES:(i + 1) * COEFF_BYTES], "big") % prime
+            for i in range(count)]
+
+class ShareMatrix:
+    """
+    Shares of several secrets over the same points. values[i][j] is node
+    xs[i]'s share of secret j, so each row is what one node stores.
+    """
+    def __init__(self, xs, values):
+        self.xs = xs
+        self.values = values
+
+    @property
+    def num_secrets(self):
+        return len(self.values[0]) if self.values else 0
+
+    def node_row(self, x):
+        return self.values[self.xs.index(x)]
+
+    def shares_for(self, j):
+        """
+        (x, y) shares of secret j, as returned by ShamirSecretSharing.split.
+        """
+        return [(x, row[j]) for x, row in zip(self.xs, self.values)]
 
 class ShamirSecretSharing:
     @staticmethod
@@ -78,6 +146,32 @@ class ShamirSecretSharing:
             shares.append((i, val))
         return shares
 
+    @staticmethod
+    def split_many(secret_ints, n, k, prime=CURVE_ORDER):
+        """
+        Split several secrets over the same n points with threshold k.
+        Uses a cached power table of the points and one CSPRNG read for all
+        coefficients. Returns a ShareMatrix.
+        """
+        m = len(secret_ints)
+        powers = power_table(n, k, prime)
+        randoms = random_coeffs(m * (k - 1), prime)
+
+        polys = []
+        for j, secret_int in enumerate(secret_ints):
+            polys.append([secret_int] + randoms[j * (k - 1):(j + 1) * (k - 1)])
+
+        values = []
+        for row in powers:
+            node_vals = []
+            for coeffs in polys:
+                acc = 0
+                for d in range(k):
+                    acc += coeffs[d] * row[d]
+                node_vals.append(acc % prime)
+            values.append(node_vals)
+        return ShareMatrix(tuple(range(1, n + 1)), values)
+
     @staticmethod
     def combine(shares, prime=CURVE_ORDER):
         """
@@ -86,3 +180,22 @@ class ShamirSecretSharing:
         x_s = [s[0] for s in shares]
         y_s = [s[1] for s in shares]
         return lagrange_interpolate(0, x_s, y_s, prime)
+
+    @staticmethod
+    def combine_many(x_s, y_rows, prime=CURVE_ORDER):
+        """
+        Recover many secrets shared over the same quorum x_s in one pass.
+        y_rows holds one share vector (ordered like x_s) per secret; the
+        Lagrange weights are computed once and reused for every row.
+        """
+        weights = lagrange_weights(tuple(x_s), 0, prime)
+        k = len(weights)
+        secrets_out = []
+        for y_s in y_rows:
+            if len(y_s) != k:
+                raise ValueError("x_s and y_s must be same length")
+            acc = 0
+            for i in range(k):
+                acc += y_s[i] * weights[i]
+            secrets_out.append(acc % prime)
+        return secrets_out
@@ -0,0 +1,278 @@
+import os
+import shutil
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+# Backends selectable through SimulationConfig.storage
+STORAGE_BACKENDS = ("filesystem", "memory", "sqlite")
+
+class Storage:
+    """
+    Key/value persistence used for shares, CA keys and certs. Keys are the
+    same path strings the filesystem layout uses (os.path.join of storage
+    dirs and file names), so every backend sees the same tree.
+    """
+    # Durable flushes so far (fsyncs or commits)
+    syncs = 0
+    # Whether link() can share bytes instead of copying them
+    supports_links = False
+
+    def write(self, key, data):
+        raise NotImplementedError
+
+    def read(self, key):
+        raise NotImplementedError
+
+    def exists(self, key):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def list(self, prefix):
+        """
+        Keys located under the directory prefix.
+        """
+        raise NotImplementedError
+
+    def clear(self, prefix):
+        for key in list(self.list(prefix)):
+            self.delete(key)
+
+    def makedirs(self, path):
+        pass
+
+    def link(self, src, dst):
+        """
+        Makes dst hold the same bytes as src.
+        Returns True if no data had to be copied.
+        """
+        self.write(dst, self.read(src))
+        return False
+
+    @contextmanager
+    def transaction(self):
+        yield self
+
+    def close(self):
+        pass
+
+    @staticmethod
+    def _norm(key):
+        return os.path.normpath(key)
+
+    @staticmethod
+    def _prefix(prefix):
+        prefix = os.path.normpath(prefix)
+        return "" if prefix == "." else prefix + os.sep
+
+class FileSystemStorage(Storage):
+    """
+    The original on-disk layout: one file per key. With fsync every write
+    is forced to disk before returning.
+    """
+    supports_links = True
+
+    def __init__(self, fsync=False):
+        self.fsync = fsync
+
+    def write(self, key, data):
+        parent = os.path.dirname(key)
+        if parent and not os.path.exists(parent):
+            os.makedirs(parent, exist_ok=True)
+        with open(key, 'wb') as f:
+            f.write(data)
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+                self.syncs += 1
+
+    def read(self, key):
+        with open(key, 'rb') as f:
+            return f.read()
+
+    def exists(self, key):
+        return os.path.exists(key)
+
+    def delete(self, key):
+        if os.path.exists(key):
+            os.remove(key)
+
+    def list(self, prefix):
+        if not os.path.isdir(prefix):
+            return
+        for dirpath, _, filenames in os.walk(prefix):
+            for name in filenames:
+                yield os.path.join(dirpath, name)
+
+    def clear(self, prefix):
+        if os.path.exists(prefix):
+            shutil.rmtree(prefix)
+
+    def makedirs(self, path):
+        if not os.path.exists(path):
+            os.makedirs(path, exist_ok=True)
+
+    def link(self, src, dst):
+        self.delete(dst)
+        self.makedirs(os.path.dirname(dst))
+        try:
+            os.link(src, dst)
+            return True
+        except OSError:
+            shutil.copyfile(src, dst)
+            return False
+
+class MemoryStorage(Storage):
+    """
+    Pure in-memory dict store. Nothing touches the disk.
+    """
+    supports_links = True
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def write(self, key, data):
+        with self._lock:
+            self._data[self._norm(key)] = bytes(data)
+
+    def read(self, key):
+        try:
+            return self._data[self._norm(key)]
+        except KeyError:
+            raise FileNotFoundError(key)
+
+    def exists(self, key):
+        return self._norm(key) in self._data
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(self._norm(key), None)
+
+    def list(self, prefix):
+        prefix = self._prefix(prefix)
+        with self._lock:
+            keys = [k for k in self._data if k.startswith(prefix)]
+        return iter(keys)
+
+    def link(self, src, dst):
+        # bytes are immutable, so sharing the object is a true link
+        with self._lock:
+            self._data[self._norm(dst)] = self._data[self._norm(src)]
+        return True
+
+class SQLiteStorage(Storage):
+    """
+    Single-file SQLite store. Writes are grouped into transactions of up to
+    batch_size statements, or one explicit transaction() block.
+    """
+    def __init__(self, path, batch_size=256):
+        parent = os.path.dirname(path)
+        if parent and not os.path.exists(parent):
+            os.makedirs(parent, exist_ok=True)
+        self.path = path
+        self.batch_size = batch_size
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS blobs (key TEXT PRIMARY KEY, data BLOB NOT NULL)")
+        self._lock = threading.RLock()
+        self._pending = 0
+        self._depth = 0
+
+    def _begin(self):
+        if not self._conn.in_transaction:
+            self._conn.execute("BEGIN")
+
+    def _wrote(self):
+        self._pending += 1
+        if self._depth == 0 and self._pending >= self.batch_size:
+            self._commit()
+
+    def _commit(self):
+        if self._conn.in_transaction:
+            self._conn.execute("COMMIT")
+            self.syncs += 1
+        self._pending = 0
+
+    def write(self, key, data):
+        with self._lock:
+            self._begin()
+            self._conn.execute("INSERT OR REPLACE INTO blobs (key, data) VALUES (?, ?)",
+                               (self._norm(key), bytes(data)))
+            self._wrote()
+
+    def read(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM blobs WHERE key = ?", (self._norm(key),)).fetchone()
+        if row is None:
+            raise FileNotFoundError(key)
+        return row[0]
+
+    def exists(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM blobs WHERE key = ?", (self._norm(key),)).fetchone()
+        return row is not None
+
+    def delete(self, key):
+        with self._lock:
+            self._begin()
+            self._conn.execute("DELETE FROM blobs WHERE key = ?", (self._norm(key),))
+            self._wrote()
+
+    def list(self, prefix):
+        prefix = self._prefix(prefix)
+        with self._lock:
+            rows = self._conn.execute("SELECT key FROM blobs WHERE substr(key, 1, ?) = ?",
+                                      (len(prefix), prefix)).fetchall()
+        return iter([r[0] for r in rows])
+
+    def clear(self, prefix):
+        prefix = self._prefix(prefix)
+        with self._lock:
+            self._begin()
+            self._conn.execute("DELETE FROM blobs WHERE substr(key, 1, ?) = ?", (len(prefix), prefix))
+            self._wrote()
+
+    def link(self, src, dst):
+        with self._lock:
+            self._begin()
+            self._conn.execute("INSERT OR REPLACE INTO blobs (key, data) "
+                               "SELECT ?, data FROM blobs WHERE key = ?",
+                               (self._norm(dst), self._norm(src)))
+            self._wrote()
+        return False
+
+    @contextmanager
+    def transaction(self):
+        with self._lock:
+            self._depth += 1
+            try:
+                self._begin()
+                yield self
+            finally:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._commit()
+
+    def close(self):
+        with self._lock:
+            self._commit()
+            self._conn.close()
+
+def make_storage(kind="filesystem", path=None, fsync=False):
+    """
+    Builds a backend by name. path is the SQLite database file; fsync
+    applies to the filesystem backend.
+    """
+    if kind == "filesystem":
+        return FileSystemStorage(fsync=fsync)
+    if kind == "memory":
+        return MemoryStorage()
+    if kind == "sqlite":
+        if path is None:
+            raise ValueError("The sqlite backend needs a database path")
+        return SQLiteStorage(path)
+    raise ValueError(f"Unknown storage backend: {kind}")
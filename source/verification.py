@@ -0,0 +1,124 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from .ca_core import CACore
+
+class Verifier:
+    """
+    Relying-party side: checks user certs against a set of trusted roots
+    plus any intermediates that chain to them. Parsed issuer certs and
+    their public keys are cached by subject name, so a batch against one
+    CA only pays for the user cert itself. The optional thread pool is
+    slower than serial checks unless several cores are free (see the
+    verifier.verify_many benchmarks), so workers defaults to 0.
+    """
+    def __init__(self, workers=0):
+        self._executor = ThreadPoolExecutor(max_workers=workers) if workers > 0 else None
+        # subject name -> [(issuer cert, public key)]
+        self._issuers = {}
+        self._parsed = {}
+        self._lock = threading.Lock()
+
+        self.verified = 0
+        self.failed = 0
+        self.elapsed = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def _load(self, cert):
+        # Issuer PEMs are parsed once and reused
+        if not isinstance(cert, (bytes, bytearray)):
+            return cert
+        parsed = self._parsed.get(bytes(cert))
+        if parsed is None:
+            parsed = CACore.load_cert(cert)
+            self._parsed[bytes(cert)] = parsed
+        return parsed
+
+    def reset(self):
+        """
+        Forgets every trusted issuer, e.g. after the root has rotated.
+        """
+        self._issuers = {}
+        self._parsed = {}
+
+    def trust(self, root_cert):
+        """
+        Adds a trust anchor (cert object or PEM bytes).
+        """
+        root_cert = self._load(root_cert)
+        self._issuers.setdefault(root_cert.subject, []).append((root_cert, root_cert.public_key()))
+
+    def add_intermediate(self, cert):
+        """
+        Accepts an intermediate only if it verifies against a trusted issuer.
+        Returns True if it was added.
+        """
+        cert = self._load(cert)
+        if self._find_issuer(cert) is None:
+            return False
+        self._issuers.setdefault(cert.subject, []).append((cert, cert.public_key()))
+        return True
+
+    def _find_issuer(self, cert):
+        candidates = self._issuers.get(cert.issuer)
+        with self._lock:
+            if candidates:
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+        for issuer_cert, public_key in candidates or ():
+            if CACore.verify_cert(cert, issuer_cert, issuer_public_key=public_key):
+                return issuer_cert
+        return None
+
+    @staticmethod
+    def _parse(data):
+        # PEM text or raw DER (e.g. a memoryview into a CertArchive)
+        if bytes(data[:5]) == b"-----":
+            return CACore.load_cert(bytes(data))
+        return CACore.load_cert_der(data)
+
+    def _verify_one(self, cert):
+        if isinstance(cert, (bytes, bytearray, memoryview)):
+            cert = self._parse(cert)
+        return self._find_issuer(cert) is not None
+
+    def verify(self, cert):
+        """
+        Verifies one user cert (object, PEM or DER bytes). Returns True/False.
+        """
+        return self.verify_many([cert])[0]
+
+    def verify_many(self, certs):
+        """
+        Verifies a batch, on the thread pool if there is one.
+        Returns one bool per cert, in input order.
+        """
+        start = time.perf_counter()
+        if self._executor is not None:
+            results = list(self._executor.map(self._verify_one, certs))
+        else:
+            results = [self._verify_one(c) for c in certs]
+        self.elapsed += time.perf_counter() - start
+
+        ok = sum(results)
+        self.verified += ok
+        self.failed += len(results) - ok
+        return results
+
+    def stats(self):
+        total = self.verified + self.failed
+        return {
+            "verified": self.verified,
+            "failed": self.failed,
+            "elapsed": self.elapsed,
+            "per_sec": total / self.elapsed if self.elapsed > 0 else 0.0,
+            "issuer_cache_hits": self.cache_hits,
+            "issuer_cache_misses": self.cache_misses,
+        }
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
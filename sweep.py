@@ -0,0 +1,68 @@
+import sys
+import os
+import json
+import argparse
+
+# Add current directory to path so we can import source
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from source.grid_sweep import GridSpec, GRID_FORMATS, run_grid
+
+def parse_value(text):
+    """
+    JSON literal if it parses (numbers, true/false, null), else the raw string.
+    """
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+def parse_assignments(items, multi):
+    res = {}
+    for item in items or []:
+        name, sep, value = item.partition("=")
+        if not sep:
+            raise SystemExit(f"Expected NAME=VALUE, got: {item}")
+        res[name] = [parse_value(v) for v in value.split(",")] if multi else parse_value(value)
+    return res
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless grid sweep over SimulationConfig parameters")
+    parser.add_argument("spec", nargs="?", help="JSON grid spec with axes/base/replicas/seed")
+    parser.add_argument("--axis", action="append", metavar="NAME=V1,V2,...",
+                        help="Add (or replace) a grid axis, e.g. --axis p=0.001,0.002")
+    parser.add_argument("--set", action="append", metavar="NAME=VALUE",
+                        help="Fixed SimulationConfig parameter, e.g. --set mode=montecarlo")
+    parser.add_argument("--out", required=True, help="Result stream (.jsonl or .csv)")
+    parser.add_argument("--format", choices=GRID_FORMATS, help="Defaults to the --out extension")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--replicas", type=int)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--no-resume", action="store_true", help="Overwrite --out instead of skipping finished points")
+    parser.add_argument("--keep-runs", action="store_true", help="Keep each crypto run's directory")
+    args = parser.parse_args()
+
+    spec_json = {"axes": {}}
+    if args.spec:
+        with open(args.spec) as f:
+            spec_json = json.load(f)
+    axes = dict(spec_json.get("axes", {}))
+    axes.update(parse_assignments(args.axis, multi=True))
+    base = dict(spec_json.get("base", {}))
+    base.update(parse_assignments(args.set, multi=False))
+    replicas = args.replicas if args.replicas is not None else spec_json.get("replicas", 1)
+    seed = args.seed if args.seed is not None else spec_json.get("seed")
+    spec = GridSpec(axes, base=base, replicas=replicas, seed=seed)
+
+    print(f"Grid of {spec.size()} points (seed {spec.seed}) -> {args.out}")
+
+    def progress(row):
+        print(f"[{row['index'] + 1}/{spec.size()}] {row['point']}: "
+              f"C_Total={row['C_Total']:.4f} D_Total={row['D_Total']:.4f}", flush=True)
+
+    count = run_grid(spec, args.out, fmt=args.format, workers=args.workers, resume=not args.no_resume,
+                     keep_runs=args.keep_runs, on_result=progress)
+    print(f"Ran {count} point(s), {spec.size() - count} already in {args.out}")
+
+if __name__ == "__main__":
+    main()
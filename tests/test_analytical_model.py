@@ -0,0 +1,46 @@
+import math
+import pytest
+from source.simulation_engine import SimulationConfig, cross_check
+from source import analytical_model
+
+# |z| of a sampled mode against the model that cross_check may report
+MAX_Z = 4.0
+
+def test_evaluate_small_config_by_hand():
+    # M=3 (so K=2), lambda = p*T = 0.1, 20 certs per node, V1=75, V2=0.1
+    config = SimulationConfig(M=3, T=10, p=0.01)
+    lam = 0.1
+
+    def mean_exp(a):
+        # integral_0^1 exp(-a*lam*t) dt
+        return (1 - math.exp(-a * lam)) / (a * lam)
+
+    # Centralized: each node exposes its 20 certs for (1 - t)^+ after its first attack
+    c_risk = 75 * 60 * (1 - mean_exp(1))
+    # Distributed: q(t) = 1 - exp(-lam t), P(>= 2 of 3 fell) = 3q^2 - 2q^3
+    q2 = 1 - 2 * mean_exp(1) + mean_exp(2)
+    q3 = 1 - 3 * mean_exp(1) + 3 * mean_exp(2) - mean_exp(3)
+    d_risk = 75 * 60 * (3 * q2 - 2 * q3)
+    q = 1 - math.exp(-lam)
+
+    res = analytical_model.evaluate(config)
+    assert res["C_Risk"] == pytest.approx(c_risk, rel=1e-9)
+    assert res["D_Risk"] == pytest.approx(d_risk, rel=1e-9)
+    # Update cost per unit time: V2 * certs re-signed (60) or replicated (60 * 3) / T
+    assert res["C_Total"] == pytest.approx(c_risk + 0.1 * 60 / 10, rel=1e-9)
+    assert res["D_Total"] == pytest.approx(d_risk + 0.1 * 180 / 10, rel=1e-9)
+    assert res["D_Compromise_Prob"] == pytest.approx(3 * q ** 2 - 2 * q ** 3, rel=1e-12)
+
+def test_kth_compromise_cdf_edges():
+    assert analytical_model.kth_compromise_cdf(0.5, 4, 0, 1.0) == 1.0
+    assert analytical_model.kth_compromise_cdf(0.5, 4, 5, 1.0) == 0.0
+    assert analytical_model.kth_compromise_cdf(0.5, 4, 1, 1.0) == pytest.approx(1 - math.exp(-2.0))
+
+def test_cross_check_within_bound(tmp_path):
+    config = SimulationConfig(M=3, total_certs=6, total_periods=4, p=0.003, attack_periods=4000, seed=2)
+    config.base_dir = str(tmp_path)
+    check = cross_check(config, run_id_suffix="t", modes=("model", "montecarlo", "crypto"))
+    assert set(check["discrepancy"]) == {"montecarlo", "crypto"}
+    for mode, metrics in check["discrepancy"].items():
+        for metric, entry in metrics.items():
+            assert abs(entry["z"]) <= MAX_Z, (mode, metric)
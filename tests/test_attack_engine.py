@@ -0,0 +1,36 @@
+import pytest
+from source.simulation_engine import SimulationConfig, run_experiment
+from source.attack_engine import VectorizedAttackEngine
+from source import analytical_model
+
+# Sampled risk must land within this many reported SEs of the model
+MAX_Z = 4.0
+
+CONFIGS = {
+    "flat": {},
+    "refresh": dict(dist_rotation="refresh", rekey_every=5),
+    "intermediate": dict(ca_hierarchy="intermediate", cert_renew_every=5),
+    "revocation_full": dict(revocation="full"),
+    "revocation_delta": dict(revocation="delta"),
+}
+
+@pytest.mark.parametrize("engine", ["vectorized", "python", "event"])
+@pytest.mark.parametrize("name", list(CONFIGS))
+def test_engine_matches_model(engine, name):
+    config = SimulationConfig(mode="montecarlo", attack_engine=engine, p=0.003, attack_periods=4000,
+                              seed=11, **CONFIGS[name])
+    res = run_experiment(config)
+    model = analytical_model.evaluate(config)
+    for metric in ("C_Risk", "D_Risk"):
+        assert res[metric + "_SE"] > 0
+        assert abs(res[metric] - model[metric]) <= MAX_Z * res[metric + "_SE"], metric
+
+@pytest.mark.parametrize("name", list(CONFIGS))
+def test_chunk_size_does_not_change_result(name):
+    config = SimulationConfig(p=0.003, **CONFIGS[name])
+    whole = VectorizedAttackEngine(config, seed=3).run(3000)
+    # 7 is rounded to whole epochs/blocks, and cuts through them otherwise
+    chunked = VectorizedAttackEngine(config, seed=3, chunk_periods=7).run(3000)
+    assert chunked.keys() == whole.keys()
+    for key, value in whole.items():
+        assert chunked[key] == pytest.approx(value, rel=1e-9), key
@@ -0,0 +1,36 @@
+from source.cert_archive import CertArchive
+
+def test_newest_record_wins(tmp_path):
+    archive = CertArchive(str(tmp_path / "certs"))
+    archive.append_many([(1, b"one"), (2, b"two")])
+    archive.append(1, b"one again")
+    assert bytes(archive.get(1)) == b"one again"
+    assert archive.stats()["records"] == 3
+    assert archive.stats()["certs"] == 2
+    archive.close()
+
+def test_reopen_keeps_records_and_appends(tmp_path):
+    path = str(tmp_path / "certs")
+    archive = CertArchive(path)
+    archive.append_many([(1, b"one"), (2, b"two")])
+    archive.append(1, b"one again")
+    archive.close()
+
+    archive = CertArchive(path)
+    assert archive.stats()["records"] == 3
+    assert sorted(archive.ids()) == [1, 2]
+    assert bytes(archive.get(1)) == b"one again"
+    assert bytes(archive.get(2)) == b"two"
+    archive.append(3, b"three")
+    assert {i: bytes(v) for i, v in archive.scan()} == {1: b"one again", 2: b"two", 3: b"three"}
+    archive.close()
+
+def test_views_stay_valid_after_growth(tmp_path):
+    archive = CertArchive(str(tmp_path / "certs"))
+    archive.append(1, b"first")
+    view = archive.get(1)
+    archive.append_many((i, bytes([i]) * 100) for i in range(2, 50))
+    assert bytes(view) == b"first"
+    assert bytes(archive.get(49)) == bytes([49]) * 100
+    del view
+    archive.close()
@@ -0,0 +1,39 @@
+import os
+import pytest
+from source.ca_core import CACore
+from source.csr_pool import CSRPool
+from source.simulation_engine import SimulationConfig, run_experiment
+
+NAMES = ["User_0", "User_1", "User_2"]
+
+def test_corpus_needs_a_dir():
+    with pytest.raises(ValueError):
+        CSRPool(policy="corpus")
+
+def test_corpus_built_on_first_use_then_loaded(tmp_path):
+    corpus_dir = str(tmp_path / "corpus")
+    first = CSRPool(policy="corpus", corpus_dir=corpus_dir)
+    csrs = first.get_many(NAMES)
+    assert sorted(os.listdir(corpus_dir)) == sorted(f"{name}.csr.pem" for name in NAMES)
+    assert first.stats()["generated"] == len(NAMES)
+
+    second = CSRPool(policy="corpus", corpus_dir=corpus_dir)
+    again = second.get_many(NAMES + NAMES)
+    assert [CACore.serialize_csr(c) for c in again[:3]] == [CACore.serialize_csr(c) for c in csrs]
+    stats = second.stats()
+    assert (stats["generated"], stats["loaded"], stats["reused"]) == (0, len(NAMES), len(NAMES))
+
+def test_prefetched_csrs_are_used():
+    pool = CSRPool(policy="fresh", workers=2)
+    pool.prefetch(NAMES)
+    pool.get_many(NAMES + NAMES[:1])
+    pool.close()
+    assert pool.stats()["prefetched"] == len(NAMES)
+    assert pool.stats()["generated"] == 1
+
+def test_corpus_policy_runs_without_a_corpus_dir(tmp_path):
+    config = SimulationConfig(M=3, total_certs=6, total_periods=2, attack_periods=10, seed=3,
+                              csr_policy="corpus")
+    config.base_dir = str(tmp_path)
+    run_experiment(config, run_id_suffix="corpus")
+    assert len(os.listdir(tmp_path / "csr_corpus")) == config.total_certs
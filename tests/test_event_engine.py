@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+from source.simulation_engine import SimulationConfig, run_experiment
+from source.event_engine import RotationSchedule, ExposureTracker, EventScheduler
+from source.attack_engine import make_attack_engine
+
+def test_lockstep_rotations_are_integers():
+    schedule = RotationSchedule("lockstep", 4)
+    assert schedule.next_rotation(0, 0.0) == 1.0
+    assert schedule.next_rotation(3, 2.5) == 3.0
+    # Strictly after t
+    assert schedule.next_rotation(1, 3.0) == 4.0
+
+def test_staggered_rotations_are_offset_per_node():
+    schedule = RotationSchedule("staggered", 4)
+    assert schedule.next_rotation(0, 0.1) == 1.0
+    assert schedule.next_rotation(2, 0.1) == 0.5
+    assert schedule.next_rotation(2, 0.5) == 1.5
+    assert schedule.next_rotation(3, 6.8) == 7.75
+
+def test_jittered_rotations_stay_near_integers_and_repeat():
+    schedule = RotationSchedule("jittered", 3, jitter=0.3, seed=9)
+    times = []
+    t = 0.0
+    for _ in range(50):
+        t = schedule.next_rotation(1, t)
+        times.append(t)
+    assert all(b > a for a, b in zip(times, times[1:]))
+    assert all(abs(x - round(x)) <= 0.3 for x in times)
+    again = RotationSchedule("jittered", 3, jitter=0.3, seed=9)
+    assert again.next_rotation(1, 0.0) == times[0]
+
+def test_rotation_schedule_rejects_bad_options():
+    with pytest.raises(ValueError):
+        RotationSchedule("sometimes", 3)
+    with pytest.raises(ValueError):
+        RotationSchedule("jittered", 3, jitter=0.5)
+
+def test_exposure_tracker_books_per_period():
+    per_period = {}
+    tracker = ExposureTracker(10, per_period)
+    tracker.book(0.25, 2.5)
+    assert per_period == pytest.approx({0: 7.5, 1: 10.0, 2: 5.0})
+    tracker.book(2.75, 3.0)
+    assert per_period[2] == pytest.approx(7.5)
+
+def test_exposure_tracker_merges_overlapping_intervals():
+    per_period = {}
+    tracker = ExposureTracker(1, per_period)
+    tracker.open(0.2)
+    tracker.open(0.4)
+    tracker.close(0.6)
+    tracker.close(0.9)
+    tracker.open(1.5)
+    tracker.flush(1.75)
+    assert per_period == pytest.approx({0: 0.7, 1: 0.25})
+
+def test_event_scheduler_runs_in_time_order():
+    events = EventScheduler()
+    seen = []
+    events.on("x", seen.append)
+    for t, name in ((2.0, "c"), (0.5, "a"), (1.0, "b"), (5.0, "late")):
+        events.schedule(t, "x", name)
+    events.run(3.0)
+    assert seen == ["a", "b", "c"]
+    assert events.now == 3.0
+
+@pytest.mark.parametrize("engine", ["vectorized", "python"])
+def test_period_engines_reject_off_lockstep_schedules(engine):
+    config = SimulationConfig(mode="montecarlo", attack_engine=engine, rotation_schedule="staggered")
+    with pytest.raises(ValueError):
+        make_attack_engine(config, seed=1)
+
+@pytest.mark.parametrize("schedule", ["staggered", "jittered"])
+def test_off_lockstep_se_matches_spread(schedule):
+    results = [run_experiment(SimulationConfig(mode="montecarlo", attack_engine="event", rotation_schedule=schedule,
+                                               rotation_jitter=0.4, p=0.003, attack_periods=1000, seed=seed))
+               for seed in range(150)]
+    assert results[0]["C_Risk_SE"] > 0
+    spread = np.std([r["C_Risk"] for r in results], ddof=1)
+    reported = np.mean([r["C_Risk_SE"] for r in results])
+    assert 0.85 < reported / spread < 1.2
@@ -0,0 +1,45 @@
+from source.grid_sweep import ResultStream, GridSpec
+
+def stream_with(tmp_path, fmt, content):
+    path = tmp_path / f"grid.{fmt}"
+    path.write_bytes(content)
+    return ResultStream(str(path), fmt, axes=["T"]), path
+
+def test_drops_partial_last_line(tmp_path):
+    stream, path = stream_with(tmp_path, "jsonl", b'{"point": "a"}\n{"point": "b"}\n{"point": "c", "C_R')
+    assert stream.completed() == {"a", "b"}
+    assert path.read_bytes() == b'{"point": "a"}\n{"point": "b"}\n'
+
+def test_complete_file_untouched(tmp_path):
+    content = b'{"point": "a"}\n{"point": "b"}\n'
+    stream, path = stream_with(tmp_path, "jsonl", content)
+    assert stream.completed() == {"a", "b"}
+    assert path.read_bytes() == content
+
+def test_single_partial_line(tmp_path):
+    stream, path = stream_with(tmp_path, "jsonl", b'{"point": "a", "C_Ri')
+    assert stream.completed() == set()
+    assert path.read_bytes() == b""
+
+def test_partial_line_longer_than_scan_block(tmp_path):
+    head = b'{"point": "a"}\n'
+    stream, path = stream_with(tmp_path, "jsonl", head + b'{"point": "b", "pad": "' + b"x" * 200000)
+    assert stream.completed() == {"a"}
+    assert path.read_bytes() == head
+
+def test_csv_resume_appends_after_header(tmp_path):
+    stream, path = stream_with(tmp_path, "csv", b"point,index,T\nx,0,10\ny,1,2")
+    assert stream.completed() == {"x"}
+    stream.open()
+    stream.write({"point": "z", "index": 2, "T": 30})
+    stream.close()
+    assert ResultStream(str(path), "csv", axes=["T"]).completed() == {"x", "z"}
+    assert path.read_text().count("point,index,T") == 1
+
+def test_point_seeds_do_not_depend_on_progress():
+    spec = GridSpec({"T": [10, 20], "M": [3, 6]}, seed=7)
+    points = list(spec.points())
+    assert len(points) == spec.size() == 4
+    seeds = [spec.config_for(i, params).seed for i, params in points]
+    assert len(set(seeds)) == 4
+    assert spec.config_for(*points[3]).seed == seeds[3]
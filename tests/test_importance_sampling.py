@@ -0,0 +1,76 @@
+import math
+import numpy as np
+import pytest
+from source.simulation_engine import SimulationConfig, run_experiment
+from source.attack_engine import (
+    tilted_log_weights, dependent_log_weights, leakage_std_error, effective_sample_size,
+    first_compromise_times,
+)
+from source import analytical_model
+
+CONFIGS = {
+    "flat": {},
+    "refresh": dict(dist_rotation="refresh", rekey_every=5),
+    "revocation_full": dict(revocation="full"),
+}
+
+def test_untilted_weights_are_one():
+    times = np.array([[0.2, 3.0], [1.5, 0.9]])
+    assert np.allclose(tilted_log_weights(times, 0.1, 0.1), 0.0)
+
+def test_tilted_weights_match_density_ratio():
+    lam, tilt = 0.05, 0.8
+    times = np.array([[0.3, 2.0]])
+    # Node 1 falls at 0.3, node 2 survives the period (censored)
+    expected = math.log(lam * math.exp(-lam * 0.3) / (tilt * math.exp(-tilt * 0.3))) + (tilt - lam)
+    assert tilted_log_weights(times, lam, tilt)[0] == pytest.approx(expected)
+
+def test_weights_have_unit_mean():
+    rng = np.random.default_rng(1)
+    lam, tilt = 0.05, 0.6
+    log_w = tilted_log_weights(first_compromise_times(rng, tilt, 200000, 6), lam, tilt)
+    assert np.exp(log_w).mean() == pytest.approx(1.0, abs=0.02)
+
+def test_dependent_weights_span_the_epoch_or_previous_period():
+    log_w = np.array([1.0, 2.0, 3.0, 4.0, 5.0])
+    # Without revocation: cumulative within epochs of 2 periods
+    assert list(dependent_log_weights(log_w, 2, None)) == [1.0, 3.0, 3.0, 7.0, 5.0]
+    # With revocation: this period plus the previous one inside an epoch
+    assert list(dependent_log_weights(log_w, 2, 0.1)) == [1.0, 3.0, 3.0, 7.0, 5.0]
+    assert list(dependent_log_weights(log_w, 5, 0.1)) == [1.0, 3.0, 5.0, 7.0, 9.0]
+
+def test_leakage_std_error_uses_blocks():
+    values = np.array([1.0, 3.0, 0.0, 4.0, 2.0, 2.0])
+    per_period = {"periods": 6, "x": values.sum(), "x_sq": float(np.square(values).sum())}
+    assert leakage_std_error(per_period, "x") == pytest.approx(values.std(ddof=1) / math.sqrt(6))
+    blocks = values.reshape(3, 2).sum(axis=1)
+    blocked = {"periods": 6, "x": values.sum(), "x_sq": float(np.square(blocks).sum()), "x_block": 2}
+    assert leakage_std_error(blocked, "x") == pytest.approx(blocks.std(ddof=1) / math.sqrt(3) / 2)
+
+def test_effective_sample_size():
+    assert effective_sample_size({"d_weight_sum": 10.0, "d_weight_sq": 10.0}) == 10.0
+    assert effective_sample_size({"d_weight_sum": 2.0, "d_weight_sq": 4.0}) == 1.0
+    assert effective_sample_size({}) is None
+
+@pytest.mark.parametrize("engine", ["vectorized", "python"])
+@pytest.mark.parametrize("name", list(CONFIGS))
+def test_importance_agrees_with_plain_and_model(engine, name):
+    kwargs = dict(mode="montecarlo", p=0.001, seed=5, **CONFIGS[name])
+    tilted = run_experiment(SimulationConfig(attack_engine=engine, attack_periods=3000,
+                                             attack_sampling="importance", **kwargs))
+    plain = run_experiment(SimulationConfig(attack_periods=30000, **kwargs))
+    model = analytical_model.evaluate(SimulationConfig(**kwargs))
+    assert tilted["D_IS_ESS"] > 100
+    assert abs(tilted["D_Risk"] - model["D_Risk"]) <= 4 * tilted["D_Risk_SE"]
+    assert abs(tilted["D_Risk"] - plain["D_Risk"]) <= 4 * math.hypot(tilted["D_Risk_SE"], plain["D_Risk_SE"])
+    lo, hi = tilted["D_Risk_CI"]
+    assert lo < tilted["D_Risk"] < hi
+
+@pytest.mark.parametrize("name", list(CONFIGS))
+def test_reported_se_matches_spread_across_seeds(name):
+    results = [run_experiment(SimulationConfig(mode="montecarlo", p=0.001, attack_periods=1000, seed=seed,
+                                               attack_sampling="importance", **CONFIGS[name]))
+               for seed in range(100)]
+    spread = np.std([r["D_Risk"] for r in results], ddof=1)
+    reported = np.mean([r["D_Risk_SE"] for r in results])
+    assert 0.75 < reported / spread < 1.33
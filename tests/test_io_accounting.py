@@ -0,0 +1,47 @@
+import os
+import pytest
+from source.simulation_engine import SimulationConfig, run_experiment
+from source.storage import make_storage
+from source.io_accounting import AccountingStorage, node_label, file_kind
+
+def measured_run(tmp_path, **kwargs):
+    config = SimulationConfig(M=3, total_certs=6, total_periods=2, attack_periods=10, seed=5,
+                              measure_io=True, **kwargs)
+    config.base_dir = str(tmp_path)
+    return config, run_experiment(config, run_id_suffix="io")
+
+def test_labels_and_kinds():
+    key = os.path.join("run", "storage", "node_2", "certs", "user_7.pem")
+    assert node_label(key) == "node_2"
+    assert file_kind(key) == "cert"
+    assert node_label(os.path.join("run", "ca", "root.pem")) == "shared"
+    assert file_kind(os.path.join("run", "node_1", "crl", "c.crl.pem")) == "crl"
+
+def test_record_counts_cert_replicas_per_node():
+    storage = AccountingStorage(make_storage("memory"))
+    for node in (1, 2):
+        storage.write(os.path.join("node_" + str(node), "user_0.pem"), b"x" * 10)
+    storage.write(os.path.join("ca", "root.pem"), b"y" * 4)
+    total = storage.stats()["total"]
+    assert total["cert_replicas"] == 2
+    assert total["node_messages"] == 2
+    assert total["files_written"] == 3
+    assert total["bytes_written"] == 24
+
+def test_flat_run_matches_certs_per_node_times_m(tmp_path):
+    config, res = measured_run(tmp_path)
+    periods = config.total_periods
+    central = res["io"]["centralized"]
+    assert central["cert_replicas"] == config.certs_per_node * config.M * periods
+    assert central["modeled_replicas"] == central["cert_replicas"]
+    dist = res["io"]["distributed"]
+    assert dist["cert_replicas"] == config.total_certs * config.M * periods
+    assert dist["modeled_replicas"] == dist["cert_replicas"]
+    assert central["modeled_crl_entries"] == dist["modeled_crl_entries"] == 0
+
+def test_crl_cost_kept_out_of_modeled_replicas(tmp_path):
+    config, res = measured_run(tmp_path, revocation="full", p=0.5, detection_delay=0.0)
+    for arch in ("centralized", "distributed"):
+        io = res["io"][arch]
+        assert io["modeled_replicas"] == io["cert_replicas"], arch
+    assert sum(res["io"][arch]["modeled_crl_entries"] for arch in ("centralized", "distributed")) > 0
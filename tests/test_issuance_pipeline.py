@@ -0,0 +1,39 @@
+import threading
+import pytest
+from source.issuance_pipeline import IssuancePipeline
+
+def run_pipeline(pipeline, count, supply=None, sign=None, persist=None):
+    return pipeline.run(((i, f"User_{i}") for i in range(count)),
+                        supply or (lambda cert_id, name: name),
+                        sign or (lambda cert_id, csr: csr.upper()),
+                        persist or (lambda cert_id, cert: None))
+
+def test_persists_every_item_once_on_the_caller():
+    pipeline = IssuancePipeline(supply_workers=3, sign_workers=3, queue_size=4)
+    persisted = {}
+    caller = threading.current_thread()
+
+    def persist(cert_id, cert):
+        assert threading.current_thread() is caller
+        persisted[cert_id] = cert
+
+    assert run_pipeline(pipeline, 500, persist=persist) == 500
+    assert persisted == {i: f"USER_{i}" for i in range(500)}
+    stats = pipeline.stats()
+    assert stats["certs"] == 500
+    assert all(stage["max_queue_depth"] <= 4 for stage in stats["stages"].values())
+
+@pytest.mark.parametrize("stage", ["supply", "sign", "persist"])
+def test_raises_first_stage_error(stage):
+    def fail(cert_id, value):
+        if cert_id == 20:
+            raise RuntimeError(stage)
+        return value
+
+    pipeline = IssuancePipeline(supply_workers=2, sign_workers=2, queue_size=2)
+    threads = threading.active_count()
+    with pytest.raises(RuntimeError, match=stage):
+        # Far more items than the queues hold: a stuck stage would hang here
+        run_pipeline(pipeline, 10 ** 6, **{stage: fail})
+    # Every stage thread was joined
+    assert threading.active_count() == threads
@@ -0,0 +1,34 @@
+import pytest
+from source.parallel import aggregate_replicas, spawn_seeds, task_seed
+from source.attack_engine import confidence_interval
+
+def replica(c_risk, c_se, d_risk, d_se, ess):
+    return {"C_Risk": c_risk, "C_Total": c_risk + 1, "D_Risk": d_risk, "D_Total": d_risk + 2,
+            "C_Risk_SE": c_se, "D_Risk_SE": d_se,
+            "C_Risk_CI": confidence_interval(c_risk, c_se), "D_Risk_CI": confidence_interval(d_risk, d_se),
+            "D_IS_ESS": ess}
+
+def test_task_seed_matches_spawn_seeds():
+    seeds = spawn_seeds(7, 5)
+    assert [task_seed(7, i) for i in range(5)] == seeds
+
+def test_aggregate_keeps_se_and_ci_consistent():
+    replicas = [replica(1.0, 0.3, 2.0, 0.1, 100), replica(3.0, 0.4, 4.0, 0.2, 50)]
+    res = aggregate_replicas(replicas)
+    assert res["replicas"] == 2
+    assert res["C_Risk"] == pytest.approx(2.0)
+    assert res["C_Total"] == pytest.approx(3.0)
+    # SE of the mean of two independent estimates
+    assert res["C_Risk_SE"] == pytest.approx(0.5 / 2)
+    assert res["D_Risk_SE"] == pytest.approx(0.05 ** 0.5 / 2)
+    for metric in ("C_Risk", "D_Risk"):
+        assert res[metric + "_CI"] == pytest.approx(confidence_interval(res[metric], res[metric + "_SE"]))
+    assert res["C_Risk_Replica_SE"] == pytest.approx(1.0)
+    assert res["D_IS_ESS"] == 150
+
+def test_aggregate_single_replica_unchanged():
+    only = replica(1.0, 0.3, 2.0, 0.1, 100)
+    res = aggregate_replicas([only])
+    assert res["C_Risk_SE"] == pytest.approx(0.3)
+    assert res["C_Risk_CI"] == pytest.approx(only["C_Risk_CI"])
+    assert "C_Risk_Replica_SE" not in res
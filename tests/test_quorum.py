@@ -0,0 +1,36 @@
+from types import SimpleNamespace
+import pytest
+from source.quorum import QuorumScheduler, QUORUM_POLICIES, SLOW_MIN_SAMPLES
+
+def session(latencies):
+    return SimpleNamespace(node_ids=sorted(latencies), certs_signed=1, node_latencies=latencies)
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        QuorumScheduler(range(1, 6), 3, policy="nearest")
+
+@pytest.mark.parametrize("policy", QUORUM_POLICIES[1:])
+def test_compromised_nodes_left_out(policy):
+    scheduler = QuorumScheduler(range(1, 6), 3, policy=policy, seed=1)
+    scheduler.set_compromised([2, 4])
+    for _ in range(4):
+        assert scheduler.select()[0] == [1, 3, 5]
+
+def test_skips_counted_once_per_node_and_period():
+    scheduler = QuorumScheduler(range(1, 6), 2, policy="round_robin")
+    for nid in range(1, 6):
+        for _ in range(SLOW_MIN_SAMPLES):
+            scheduler.record(session({nid: 10.0 if nid == 5 else 1.0}))
+    assert scheduler.slow_nodes() == {5}
+
+    scheduler.set_compromised([1])
+    # Update quorums and the CRL signing quorum of the same period
+    scheduler.select(2)
+    scheduler.select()
+    assert scheduler.skipped_compromised == 1
+    assert scheduler.skipped_slow == 1
+
+    scheduler.set_compromised([1, 2])
+    scheduler.select()
+    assert scheduler.skipped_compromised == 3
+    assert scheduler.skipped_slow == 2
@@ -0,0 +1,42 @@
+import os
+import pytest
+from source.storage import STORAGE_BACKENDS, make_storage
+from source.io_accounting import AccountingStorage
+from source.replication import ReplicationStore
+
+NODES = range(1, 5)
+CERTS = [os.urandom(600) for _ in range(8)]
+
+def replicate_all(tmp_path, backend, mode):
+    root = tmp_path / f"{backend}_{mode}"
+    storage = AccountingStorage(make_storage(backend, path=str(root / "store.sqlite")))
+    store = ReplicationStore(str(root / "storage"), NODES, mode=mode, storage=storage)
+    with storage.transaction():
+        for j, data in enumerate(CERTS):
+            store.replicate(f"user_{j}.pem", data)
+        store.commit()
+    return store, storage
+
+@pytest.mark.parametrize("backend", STORAGE_BACKENDS)
+def test_hardlink_never_writes_more_than_copy(tmp_path, backend):
+    _, copy_storage = replicate_all(tmp_path, backend, "copy")
+    _, link_storage = replicate_all(tmp_path, backend, "hardlink")
+    copied = copy_storage.stats()["total"]["bytes_written"]
+    linked = link_storage.stats()["total"]["bytes_written"]
+    assert linked <= copied
+
+@pytest.mark.parametrize("backend", STORAGE_BACKENDS)
+@pytest.mark.parametrize("mode", ["copy", "hardlink", "manifest"])
+def test_every_node_reads_every_cert(tmp_path, backend, mode):
+    store, _ = replicate_all(tmp_path, backend, mode)
+    for node_id in NODES:
+        for j, data in enumerate(CERTS):
+            assert store.read(node_id, f"user_{j}.pem") == data
+    assert store.stats()["logical_replicas"] == len(NODES) * len(CERTS)
+
+def test_hardlink_without_link_support_copies(tmp_path):
+    store, _ = replicate_all(tmp_path, "sqlite", "hardlink")
+    stats = store.stats()
+    assert stats["copies"]
+    assert stats["links_created"] == 0
+    assert stats["bytes_written"] == sum(len(data) for data in CERTS) * len(NODES)
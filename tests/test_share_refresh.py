@@ -0,0 +1,25 @@
+from source.sss import ShamirSecretSharing
+from source.ca_core import CACore
+from source.storage import MemoryStorage
+from source.distributed_manager import DistributedManager
+
+def root_public_numbers(manager):
+    return CACore.load_cert(manager.storage.read(manager.cert_path)).public_key().public_numbers()
+
+def test_refresh_keeps_root_key_and_breaks_old_shares():
+    manager = DistributedManager(storage_dir="dist", n=5, k=3, storage=MemoryStorage())
+    manager.initialize_ca()
+    root = root_public_numbers(manager)
+    old = manager.collect_shares(range(1, 6))
+    secret = ShamirSecretSharing.combine(old[:3])
+    assert CACore.int_to_private_key(secret).public_key().public_numbers() == root
+
+    assert manager.refresh_shares() == 5 * 4
+    new = manager.collect_shares(range(1, 6))
+    assert [s[1] for s in new] != [s[1] for s in old]
+    assert root_public_numbers(manager) == root
+    assert ShamirSecretSharing.combine(new[:3]) == secret
+    assert ShamirSecretSharing.combine(new[2:]) == secret
+    # A quorum mixing shares from both sides of the refresh is useless
+    assert ShamirSecretSharing.combine(old[:2] + new[2:3]) != secret
+    assert ShamirSecretSharing.combine(old[:1] + new[3:5]) != secret
@@ -0,0 +1,48 @@
+import os
+from source.sss import ShamirSecretSharing, CURVE_ORDER, batch_mod_inverse, mod_inverse, lagrange_weights
+
+def random_secret():
+    return int.from_bytes(os.urandom(31), "big")
+
+def test_batch_mod_inverse_matches_mod_inverse():
+    values = [1, 2, 3, 12345, CURVE_ORDER - 1, 2 ** 200 + 7]
+    inverses = batch_mod_inverse(values, CURVE_ORDER)
+    assert inverses == [mod_inverse(v, CURVE_ORDER) for v in values]
+    for v, inv in zip(values, inverses):
+        assert (v * inv) % CURVE_ORDER == 1
+    assert batch_mod_inverse([], CURVE_ORDER) == []
+
+def test_lagrange_weights_sum_to_one_at_zero():
+    # Interpolating the constant polynomial 1 must give 1
+    for quorum in ((1, 2), (1, 3, 5), (2, 4, 5, 6)):
+        assert sum(lagrange_weights(quorum, 0, CURVE_ORDER)) % CURVE_ORDER == 1
+
+def test_combine_many_matches_combine():
+    secrets_in = [random_secret() for _ in range(5)]
+    sharings = [ShamirSecretSharing.split(secret, 5, 3) for secret in secrets_in]
+    quorum = [2, 3, 5]
+    rows = [[dict(shares)[x] for x in quorum] for shares in sharings]
+    assert ShamirSecretSharing.combine_many(quorum, rows) == secrets_in
+    for secret, shares in zip(secrets_in, sharings):
+        assert ShamirSecretSharing.combine([s for s in shares if s[0] in quorum]) == secret
+
+def test_fewer_than_k_shares_do_not_recover():
+    secret = random_secret()
+    shares = ShamirSecretSharing.split(secret, 5, 3)
+    assert ShamirSecretSharing.combine(shares[:3]) == secret
+    assert ShamirSecretSharing.combine(shares[:2]) != secret
+
+def test_split_many_combine_many_round_trip():
+    secrets_in = [0, 1, 42, CURVE_ORDER - 1] + [random_secret() for _ in range(4)]
+    n, k = 6, 3
+    matrix = ShamirSecretSharing.split_many(secrets_in, n, k)
+    assert matrix.num_secrets == len(secrets_in)
+    for quorum in ([1, 2, 3], [2, 4, 6], [6, 5, 1]):
+        rows = [[matrix.node_row(x)[j] for x in quorum] for j in range(len(secrets_in))]
+        assert ShamirSecretSharing.combine_many(quorum, rows) == secrets_in
+    for j, secret in enumerate(secrets_in):
+        assert ShamirSecretSharing.combine(matrix.shares_for(j)[:k]) == secret
+
+def test_split_many_uses_fresh_coefficients_per_secret():
+    matrix = ShamirSecretSharing.split_many([7, 7], 4, 2)
+    assert matrix.shares_for(0) != matrix.shares_for(1)